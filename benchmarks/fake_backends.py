@@ -0,0 +1,83 @@
+"""
+ベンチマーク用の擬似 Google Drive / Google Sheets バックエンド
+
+GoogleDriveManager / GoogleSheetsManager と同じメソッドを持ち、ネットワークに出ずに応答する。
+"""
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Any
+
+class FakeDriveManager:
+    """GoogleDriveManager の擬似実装（動画名ごとに決まったサイズ・チェックサムのファイルを返す）"""
+
+    def __init__(self, video_size: int = 2 * 1024 * 1024, latency: float = 0.0):
+        """初期化"""
+        self.video_size = video_size
+        self.latency = latency
+        self.service = object()  # 初期化済みとして扱わせる
+        self._lock = threading.Lock()
+        self.stats = {'searches': 0, 'metadata': 0, 'range_reads': 0, 'bytes_read': 0}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def search_videos_by_name(self, name_query: str, folder_id: str = None) -> List[Dict[str, Any]]:
+        """動画名で検索（常にその名前の動画が1件見つかる）"""
+        self._count('searches')
+        self._wait()
+        return [{
+            'id': f"drive_{hashlib.sha1(name_query.encode('utf-8')).hexdigest()[:16]}",
+            'name': name_query,
+            'size': f"{self.video_size / (1024 * 1024):.1f} MB"
+        }]
+
+    def get_file_metadata(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """転送用のファイル情報"""
+        self._count('metadata')
+        self._wait()
+        return {
+            'id': file_id,
+            'name': f"{file_id}.mp4",
+            'size': self.video_size,
+            'md5Checksum': hashlib.md5(file_id.encode('utf-8')).hexdigest(),
+            'mime_type': 'video/mp4',
+            'modified_time': ''
+        }
+
+    def read_range(self, file_id: str, start: int, end: int) -> bytes:
+        """指定範囲のバイト列"""
+        self._count('range_reads')
+        self._count('bytes_read', end - start)
+        self._wait()
+        return b'\0' * (end - start)
+
+class FakeSheetsManager:
+    """GoogleSheetsManager の擬似実装（メモリ上のシート）"""
+
+    def __init__(self, rows: List[Dict[str, Any]], latency: float = 0.0):
+        """初期化"""
+        self.rows = rows
+        self.latency = latency
+        self.statuses = {}
+        self.stats = {'reads': 0, 'status_updates': 0}
+
+    def read_campaign_data(self, spreadsheet_url: str) -> List[Dict[str, Any]]:
+        """シートの全行を読み込み"""
+        self.stats['reads'] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [dict(row) for row in self.rows]
+
+    def update_campaign_status(self, spreadsheet_url: str, campaign_name: str, status: str, campaign_id: str = None):
+        """1行のステータスを更新"""
+        self.stats['status_updates'] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        self.statuses[campaign_name] = status
+        return True
@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+"""
+負荷テスト用のローカル擬似 Graph API サーバー
+
+本物のクォータを消費せず、実オブジェクトも作らずに MetaAdsClient の出稿経路を計測するためのもの。
+標準ライブラリのみで動作する。
+
+    python benchmarks/fake_graph_server.py --port 8765 --latency 0.05 --error-rate 0.01
+
+クライアント側は META_GRAPH_API_URL=http://127.0.0.1:8765/v19.0 を設定すると接続先が切り替わる。
+"""
+import argparse
+import email
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+# {result=name:$.id} 形式のバッチ内参照
+RESULT_REFERENCE = re.compile(r"\{result=([^:}]+):\$\.([A-Za-z_]+)\}")
+
+# 作成系エンドポイントとオブジェクト種別
+CREATE_EDGES = {
+    'campaigns': 'campaign',
+    'adsets': 'adset',
+    'adcreatives': 'adcreative',
+    'ads': 'ad'
+}
+
+class FakeGraphError(Exception):
+    """擬似サーバーが返す Graph API エラー"""
+
+    def __init__(self, http_status: int, code: int, message: str, subcode: int = None, is_transient: bool = False):
+        super().__init__(message)
+        self.http_status = http_status
+        self.body = {'error': {
+            'message': message,
+            'type': 'OAuthException' if code in (4, 17, 32, 613) else 'FacebookApiException',
+            'code': code,
+            'error_subcode': subcode,
+            'is_transient': is_transient,
+            'fbtrace_id': f"fake{random.randint(0, 10 ** 8)}"
+        }}
+
+class FakeGraphState:
+    """擬似サーバーのオブジェクト・利用率・統計"""
+
+    def __init__(self, num_accounts: int = 60, num_pages: int = 5, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, quota: int = 0, window: float = 60.0, usage_pct: float = 0.0):
+        """初期化
+
+        quota は window 秒あたりに広告アカウントごとに許可する呼び出し数（0 なら無制限）。
+        usage_pct は利用率ヘッダーに常に上乗せする値。
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota = quota
+        self.window = window
+        self.usage_pct = usage_pct
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count(120000000000000)
+        self._objects = {}  # object_id -> fields
+        self._edges = defaultdict(list)  # (account_id, object_type) -> [object_id]
+        self._calls = defaultdict(deque)  # account_id（None はアプリ全体）-> 呼び出し時刻
+        self._upload_sessions = {}  # upload_session_id -> {'video_id', 'file_size', 'received'}
+        self.stats = defaultdict(int)
+
+        self.accounts = [
+            {'id': f"act_{1000 + i}", 'account_id': str(1000 + i), 'name': f"Fake Account {i + 1}", 'account_status': 1}
+            for i in range(num_accounts)
+        ]
+        self.pages = [
+            {'id': str(5000 + i), 'name': f"Fake Page {i + 1}", 'category': 'Product/Service'}
+            for i in range(num_pages)
+        ]
+
+    def new_id(self) -> str:
+        """新しいオブジェクトID"""
+        with self._lock:
+            return str(next(self._ids))
+
+    def store(self, object_id: str, fields: Dict[str, Any], account_id: str = None, object_type: str = None):
+        """オブジェクトを保存（account_id・object_type を指定するとアカウントのエッジ一覧にも載せる）"""
+        with self._lock:
+            self._objects[object_id] = fields
+            if account_id and object_type:
+                self._edges[(account_id, object_type)].append(object_id)
+
+    def list_edge(self, account_id: str, object_type: str) -> List[Dict[str, Any]]:
+        """アカウントのエッジ一覧（作成順）"""
+        with self._lock:
+            return [self._objects[object_id] for object_id in self._edges.get((account_id, object_type), [])]
+
+    def lookup(self, object_id: str) -> Optional[Dict[str, Any]]:
+        """オブジェクトを取得"""
+        with self._lock:
+            return self._objects.get(object_id)
+
+    def count(self, key: str, amount: int = 1):
+        """統計を加算"""
+        with self._lock:
+            self.stats[key] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        """統計のスナップショット"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['objects'] = len(self._objects)
+            return stats
+
+    def reset(self):
+        """オブジェクト・利用率・統計を初期化"""
+        with self._lock:
+            self._objects.clear()
+            self._edges.clear()
+            self._calls.clear()
+            self._upload_sessions.clear()
+            self.stats.clear()
+
+    def record_call(self, account_id: Optional[str]) -> float:
+        """呼び出しを記録して現在の利用率(%)を返す（クォータ超過時はレート制限エラー）"""
+        now = time.time()
+        with self._lock:
+            calls = self._calls[account_id]
+            calls.append(now)
+            while calls and now - calls[0] > self.window:
+                calls.popleft()
+            pct = self.usage_pct + (len(calls) * 100.0 / self.quota if self.quota else 0.0)
+
+        if self.quota and pct > 100:
+            self.count('throttled')
+            if account_id:
+                raise FakeGraphError(400, 80004, "There have been too many calls to this ad-account.", 2446079)
+            raise FakeGraphError(400, 4, "Application request limit reached")
+        return pct
+
+    def usage_headers(self, account_id: Optional[str]) -> Dict[str, str]:
+        """利用率ヘッダー"""
+        now = time.time()
+        with self._lock:
+            app_calls = len([t for t in self._calls[None] if now - t <= self.window])
+            account_calls = len([t for t in self._calls[account_id] if now - t <= self.window]) if account_id else 0
+
+        app_pct = min(100, int(self.usage_pct + (app_calls * 100.0 / self.quota if self.quota else 0)))
+        headers = {'X-App-Usage': json.dumps({'call_count': app_pct, 'total_cputime': app_pct // 2, 'total_time': app_pct // 2})}
+
+        if account_id:
+            account_pct = min(100, int(self.usage_pct + (account_calls * 100.0 / self.quota if self.quota else 0)))
+            headers['X-Ad-Account-Usage'] = json.dumps({
+                'acc_id_util_pct': account_pct,
+                'reset_time_duration': int(self.window) if account_pct >= 100 else 0
+            })
+            headers['X-Business-Use-Case-Usage'] = json.dumps({
+                account_id.replace('act_', ''): [{
+                    'type': 'ads_management',
+                    'call_count': account_pct,
+                    'total_cputime': account_pct // 2,
+                    'total_time': account_pct // 2,
+                    'estimated_time_to_regain_access': 0
+                }]
+            })
+        return headers
+
+    def simulate_latency(self):
+        """設定された遅延を再現"""
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def maybe_fail(self):
+        """設定された確率で一時的なエラーを発生させる"""
+        if self.error_rate and random.random() < self.error_rate:
+            self.count('injected_errors')
+            raise FakeGraphError(500, 2, "An unexpected error has occurred. Please retry your request later.",
+                                 is_transient=True)
+
+    # --- アップロードセッション ---
+
+    def start_upload(self, account_id: str, file_size: int) -> Dict[str, Any]:
+        """動画アップロードセッションを開始"""
+        video_id = self.new_id()
+        session_id = self.new_id()
+        chunk_size = min(file_size, 4 * 1024 * 1024)
+        with self._lock:
+            self._upload_sessions[session_id] = {'video_id': video_id, 'account_id': account_id,
+                                                 'file_size': file_size, 'received': 0, 'chunk_size': chunk_size}
+        return {'upload_session_id': session_id, 'video_id': video_id,
+                'start_offset': '0', 'end_offset': str(chunk_size)}
+
+    def transfer_chunk(self, session_id: str, start_offset: int, chunk: bytes) -> Dict[str, Any]:
+        """チャンクを受け取り、次に送る範囲を返す"""
+        with self._lock:
+            session = self._upload_sessions.get(session_id)
+            if not session:
+                raise FakeGraphError(400, 6000, "There was a problem uploading your video file.", 1363019)
+            if start_offset != session['received']:
+                raise FakeGraphError(400, 6001, "Start offset mismatch.", 1363037)
+            session['received'] += len(chunk)
+            start = session['received']
+            end = min(start + session['chunk_size'], session['file_size'])
+        self.count('video_bytes', len(chunk))
+        return {'start_offset': str(start), 'end_offset': str(end)}
+
+    def finish_upload(self, session_id: str, title: str) -> Dict[str, Any]:
+        """アップロードセッションを完了"""
+        with self._lock:
+            session = self._upload_sessions.pop(session_id, None)
+        if not session or session['received'] != session['file_size']:
+            raise FakeGraphError(400, 6000, "There was a problem uploading your video file.", 1363019)
+        self.store(session['video_id'], {
+            'id': session['video_id'],
+            'title': title,
+            'account_id': session['account_id'].replace('act_', ''),
+            'status': {'video_status': 'ready'}
+        })
+        return {'success': True}
+
+class FakeGraphHandler(BaseHTTPRequestHandler):
+    """擬似 Graph API のリクエストハンドラー"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeGraph/1.0'
+
+    def log_message(self, format, *args):
+        """アクセスログは出力しない"""
+
+    @property
+    def state(self) -> FakeGraphState:
+        return self.server.state
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def _handle(self, method: str):
+        """リクエストを振り分けて応答"""
+        parsed = urlparse(self.path)
+        params = dict(parse_qsl(parsed.query))
+        body = self._read_body()
+        params.update(body)
+        path = re.sub(r'^/v\d+\.\d+', '', parsed.path).strip('/')
+
+        # 計測用エンドポイント
+        if path == '__stats':
+            return self._respond(200, self.state.snapshot())
+        if path == '__reset':
+            self.state.reset()
+            return self._respond(200, {'success': True})
+
+        self.state.count('http_requests')
+        account_id = self._account_of(path)
+        headers = {}
+        try:
+            self.state.simulate_latency()
+            self.state.record_call(None)
+            if account_id:
+                self.state.record_call(account_id)
+            headers = self.state.usage_headers(account_id)
+            self.state.maybe_fail()
+
+            if path == '' and method == 'POST' and 'batch' in params:
+                result = self._batch(json.loads(params['batch']))
+            else:
+                result = self._dispatch(method, path, params, self._base_url())
+        except FakeGraphError as e:
+            self.state.count('errors')
+            return self._respond(e.http_status, e.body, headers or self.state.usage_headers(account_id))
+
+        self._respond(200, result, headers)
+
+    def _dispatch(self, method: str, path: str, params: Dict[str, Any], base_url: str) -> Any:
+        """1リクエスト（またはバッチ内の1オペレーション）を処理"""
+        self.state.count(f"{method} {self._endpoint_name(path)}")
+        parts = path.split('/')
+
+        if method == 'GET' and path == 'me':
+            return self._expand_me(params, base_url)
+        if method == 'GET' and path == 'me/adaccounts':
+            accounts = self.state.accounts
+            if 'adspixels' in params.get('fields', ''):
+                accounts = [dict(account, adspixels=self._pixels()) for account in accounts]
+            return self._paged(accounts, params, base_url, path)
+        if method == 'GET' and path == 'me/accounts':
+            return self._paged(self.state.pages, params, base_url, path)
+        if method == 'GET' and len(parts) == 2 and parts[1] in ('pixels', 'adspixels'):
+            return self._pixels()
+
+        if method == 'GET' and len(parts) == 2 and parts[1] in CREATE_EDGES:
+            fields = ['id'] + [field for field in params.get('fields', '').split(',') if field]
+            items = [
+                {key: obj[key] for key in fields if key in obj}
+                for obj in self.state.list_edge(parts[0], CREATE_EDGES[parts[1]])
+            ]
+            return self._paged(items, params, base_url, path)
+        if method == 'POST' and len(parts) == 2 and parts[1] in CREATE_EDGES:
+            return self._create(parts[0], CREATE_EDGES[parts[1]], params)
+        if method == 'POST' and len(parts) == 2 and parts[1] == 'advideos':
+            return self._advideos(parts[0], params)
+
+        if method == 'GET' and len(parts) == 1 and parts[0]:
+            obj = self.state.lookup(parts[0])
+            if obj is None:
+                raise FakeGraphError(400, 100, f"Unsupported get request. Object with ID '{parts[0]}' does not exist", 33)
+            fields = params.get('fields')
+            if fields:
+                return {key: obj[key] for key in ['id'] + fields.split(',') if key in obj}
+            return obj
+        if method == 'POST' and len(parts) == 1 and parts[0]:
+            obj = self.state.lookup(parts[0])
+            if obj is None:
+                raise FakeGraphError(400, 100, f"Object with ID '{parts[0]}' does not exist", 33)
+            obj.update({key: value for key, value in params.items() if key != 'access_token'})
+            return {'success': True}
+
+        raise FakeGraphError(400, 100, f"Unknown path components: /{path}", 2500)
+
+    def _pixels(self) -> Dict[str, Any]:
+        """データセット（ピクセル）一覧"""
+        return {'data': [{'id': str(9000 + i), 'name': f"Fake Dataset {i + 1}"} for i in range(2)]}
+
+    def _expand_me(self, params: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+        """me?fields=adaccounts.limit(N){...},accounts.limit(N){...} のフィールド展開"""
+        fields = params.get('fields', '')
+        result = {'id': 'fake_user'}
+
+        for edge, items in (('adaccounts', self.state.accounts), ('accounts', self.state.pages)):
+            match = re.search(rf"(?:^|,){edge}(?:\.limit\((\d+)\))?(?:\{{((?:[^{{}}]|\{{[^{{}}]*\}})*)\}})?", fields)
+            if not match:
+                continue
+            sub_fields = match.group(2) or 'id'
+            if edge == 'adaccounts' and 'adspixels' in sub_fields:
+                items = [dict(item, adspixels=self._pixels()) for item in items]
+            result[edge] = self._paged(items, {'limit': match.group(1) or 25, 'fields': sub_fields},
+                                       base_url, f"me/{edge}")
+        return result
+
+    def _create(self, account_id: str, object_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """キャンペーン・広告セット・クリエイティブ・広告を作成"""
+        if not params.get('name'):
+            raise FakeGraphError(400, 100, "Invalid parameter: name is required", 1487301)
+        if object_type == 'adset' and not self.state.lookup(str(params.get('campaign_id'))):
+            raise FakeGraphError(400, 100, "Invalid parameter: campaign_id does not exist", 1885014)
+        if object_type == 'ad' and not self.state.lookup(str(params.get('adset_id'))):
+            raise FakeGraphError(400, 100, "Invalid parameter: adset_id does not exist", 1885014)
+
+        object_id = self.state.new_id()
+        fields = {key: value for key, value in params.items() if key != 'access_token'}
+        fields.update({
+            'id': object_id,
+            'account_id': account_id.replace('act_', ''),
+            'status': fields.get('status') or 'ACTIVE',
+            'effective_status': fields.get('status') or 'ACTIVE'
+        })
+        self.state.store(object_id, fields, account_id, object_type)
+        self.state.count(f"created_{object_type}")
+        return {'id': object_id}
+
+    def _advideos(self, account_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """分割アップロード（start/transfer/finish）"""
+        phase = params.get('upload_phase')
+        if phase == 'start':
+            return self.state.start_upload(account_id, int(params['file_size']))
+        if phase == 'transfer':
+            chunk = params.get('video_file_chunk') or b''
+            return self.state.transfer_chunk(params['upload_session_id'], int(params['start_offset']), chunk)
+        if phase == 'finish':
+            return self.state.finish_upload(params['upload_session_id'], params.get('title', ''))
+        raise FakeGraphError(400, 100, "Invalid parameter: upload_phase", 1363030)
+
+    def _batch(self, operations: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """バッチリクエストを順に処理（{result=...} 参照と depends_on に対応）"""
+        if len(operations) > 50:
+            raise FakeGraphError(400, 100, "Too many requests in batch message. Maximum batch size is 50", 1690094)
+
+        self.state.count('batch_requests')
+        self.state.count('batch_operations', len(operations))
+        results = {}  # name -> 応答ボディ（成功時のみ）
+        failed = set()
+        responses = []
+
+        for operation in operations:
+            name = operation.get('name')
+            depends_on = operation.get('depends_on')
+            if depends_on and depends_on in failed:
+                # 依存先が失敗したオペレーションは実行しない
+                failed.add(name)
+                responses.append(None)
+                continue
+
+            method = operation.get('method', 'GET').upper()
+            relative_url = operation.get('relative_url', '')
+            path, _, query = relative_url.partition('?')
+            params = dict(parse_qsl(query))
+            params.update(dict(parse_qsl(operation.get('body', ''))))
+
+            try:
+                params = {key: self._resolve(value, results) for key, value in params.items()}
+                account_id = self._account_of(path)
+                if account_id:
+                    self.state.record_call(account_id)
+                headers = self.state.usage_headers(account_id)
+                self.state.maybe_fail()
+                body = self._dispatch(method, re.sub(r'^/?v\d+\.\d+', '', path).strip('/'), params, self._base_url())
+                if name:
+                    results[name] = body
+                responses.append({'code': 200, 'headers': self._header_list(headers), 'body': json.dumps(body)})
+            except FakeGraphError as e:
+                self.state.count('errors')
+                if name:
+                    failed.add(name)
+                responses.append({'code': e.http_status, 'headers': [], 'body': json.dumps(e.body)})
+
+        return responses
+
+    def _resolve(self, value: str, results: Dict[str, Any]) -> str:
+        """バッチ内参照を先行オペレーションの結果で置き換える"""
+        def replace(match):
+            name, field = match.group(1), match.group(2)
+            if name not in results:
+                raise FakeGraphError(400, 100, f"Unresolved batch reference: {name}", 1487390)
+            return str(results[name].get(field, ''))
+        return RESULT_REFERENCE.sub(replace, value)
+
+    def _paged(self, items: List[Dict[str, Any]], params: Dict[str, Any], base_url: str, path: str) -> Dict[str, Any]:
+        """カーソル形式のページング"""
+        limit = int(params.get('limit') or 25)
+        offset = int(params.get('after') or 0)
+        page = items[offset:offset + limit]
+        result = {'data': page, 'paging': {'cursors': {'before': str(offset), 'after': str(offset + len(page))}}}
+        if offset + limit < len(items):
+            next_params = {key: value for key, value in params.items() if not isinstance(value, bytes)}
+            next_params['after'] = str(offset + limit)
+            result['paging']['next'] = f"{base_url}/{path}?{urlencode(next_params)}"
+        return result
+
+    def _read_body(self) -> Dict[str, Any]:
+        """フォーム・multipart のボディを読み込み"""
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        raw = self.rfile.read(length)
+        content_type = self.headers.get('Content-Type', '')
+
+        if content_type.startswith('multipart/form-data'):
+            message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + raw)
+            fields = {}
+            for part in message.get_payload():
+                field_name = part.get_param('name', header='content-disposition')
+                payload = part.get_payload(decode=True)
+                fields[field_name] = payload if part.get_filename() else payload.decode('utf-8')
+            return fields
+
+        if content_type.startswith('application/json'):
+            return json.loads(raw.decode('utf-8'))
+        return dict(parse_qsl(raw.decode('utf-8')))
+
+    def _respond(self, status: int, body: Any, headers: Dict[str, str] = None):
+        """JSON を返す"""
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _base_url(self) -> str:
+        """ページングの next に使うベースURL"""
+        host, port = self.server.server_address[:2]
+        version = re.match(r'^/(v\d+\.\d+)', self.path)
+        return f"http://{host}:{port}" + (f"/{version.group(1)}" if version else '')
+
+    @staticmethod
+    def _account_of(path: str) -> Optional[str]:
+        """パスに含まれる広告アカウントID"""
+        match = re.match(r'^/?(?:v\d+\.\d+/)?(act_\d+)', path)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _endpoint_name(path: str) -> str:
+        """統計用にIDを伏せたエンドポイント名"""
+        return re.sub(r'(act_)?\d+', '{id}', path) or '/'
+
+    @staticmethod
+    def _header_list(headers: Dict[str, str]) -> List[Dict[str, str]]:
+        """バッチ応答のヘッダー形式"""
+        return [{'name': key, 'value': value} for key, value in headers.items()]
+
+class FakeGraphServer:
+    """擬似 Graph API サーバーをバックグラウンドスレッドで起動するラッパー"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **options):
+        """初期化（port=0 の場合は空きポートを使用）"""
+        self.httpd = ThreadingHTTPServer((host, port), FakeGraphHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = FakeGraphState(**options)
+        self._thread = None
+
+    @property
+    def state(self) -> FakeGraphState:
+        return self.httpd.state
+
+    @property
+    def url(self) -> str:
+        """META_GRAPH_API_URL に設定するURL"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v19.0"
+
+    def start(self) -> 'FakeGraphServer':
+        """バックグラウンドで起動"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-graph-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='負荷テスト用のローカル擬似 Graph API サーバー')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='各リクエストの遅延（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='遅延に加えるランダムな揺らぎの最大値（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='一時的なエラーを返す確率 (0-1)')
+    parser.add_argument('--quota', type=int, default=0, help='window 秒あたりのアカウントごとの呼び出し上限（0で無制限）')
+    parser.add_argument('--window', type=float, default=60.0, help='利用率を計算する時間幅（秒）')
+    parser.add_argument('--usage-pct', type=float, default=0.0, help='利用率ヘッダーに上乗せする値(%%)')
+    parser.add_argument('--accounts', type=int, default=60, help='広告アカウント数')
+    parser.add_argument('--pages', type=int, default=5, help='Facebookページ数')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """擬似サーバーを起動"""
+    args = parse_args(argv)
+    server = FakeGraphServer(
+        args.host, args.port,
+        num_accounts=args.accounts, num_pages=args.pages,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        quota=args.quota, window=args.window, usage_pct=args.usage_pct
+    )
+    print(f"🚀 擬似 Graph API サーバーを起動しました: {server.url}")
+    print(f"📌 META_GRAPH_API_URL={server.url} を設定してクライアントを起動してください")
+    print(f"📊 統計: {server.url.rsplit('/', 1)[0]}/__stats")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 擬似サーバーを終了します")
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
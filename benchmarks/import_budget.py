@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+起動時の import 時間の予算チェック
+
+CLI（src.cli）と WebUI が起動時に読み込むモジュールを別プロセスで import し、
+所要時間が予算内であること、重いSDK（facebook_business / googleapiclient / gspread / pandas）が
+初回使用まで読み込まれていないことを確認する。予算超過時は終了コード 1 を返す。
+テスト・CIからは実行されない手動のチェックのため、起動時の import を変更したときに実行する。
+
+    python benchmarks/import_budget.py --budget 0.5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Any
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCHMARK_DIR)
+
+# 起動時に読み込まれてはいけない（初回使用時に読み込む）モジュール
+HEAVY_MODULES = ['facebook_business', 'googleapiclient', 'gspread', 'pandas']
+
+# 計測対象: 名前 -> import するモジュール
+TARGETS = {
+    'cli': ['src.cli'],
+    'web': [
+        'src.meta_client', 'src.template_manager', 'src.google_drive_manager', 'src.logger',
+        'src.bulk_launcher', 'src.launch_journal', 'src.video_transfer'
+    ]
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'seconds': elapsed, 'heavy': heavy}}))
+"""
+
+def slowest_imports(stderr: str, count: int = 10) -> List[Dict[str, Any]]:
+    """-X importtime の出力から累積時間の大きい import を抽出"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            entries.append({'module': name.strip(), 'ms': int(cumulative) / 1000.0})
+        except ValueError:
+            continue
+    return sorted(entries, key=lambda entry: entry['ms'], reverse=True)[:count]
+
+def measure(modules: List[str]) -> Dict[str, Any]:
+    """新しいプロセスでモジュールを import して計測"""
+    code = PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import に失敗しました: {completed.stderr.strip().splitlines()[-1:]}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['slowest'] = slowest_imports(completed.stderr)
+    return result
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="起動時の import 時間の予算チェック")
+    parser.add_argument('--budget', type=float, default=0.5, help="1ターゲットあたりの import 時間の上限（秒）")
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    args = parser.parse_args()
+
+    failed = False
+    for target in args.targets:
+        result = measure(TARGETS[target])
+        ok = result['seconds'] <= args.budget and not result['heavy']
+        failed = failed or not ok
+
+        print(f"{'✅' if ok else '❌'} {target}: {result['seconds'] * 1000:.0f} ms (予算 {args.budget * 1000:.0f} ms)")
+        if result['heavy']:
+            print(f"   起動時に読み込まれた重いモジュール: {', '.join(result['heavy'])}")
+        if not ok:
+            for entry in result['slowest']:
+                print(f"   {entry['ms']:8.1f} ms  {entry['module']}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+一括出稿のエンドツーエンド・スループット計測
+
+擬似 Graph API サーバーと擬似 Drive / Sheets に対して CSV・テンプレート一括・シート連携の
+各フローを実行し、行/秒、チェーンごとのレイテンシ (p50/p95/p99)、1行あたりのAPI呼び出し数、
+ピークRSSを JSON で保存する。
+
+    python benchmarks/run_benchmarks.py --sizes 10 100 1000 --latency 0.05
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/20250101-120000.json
+
+ピークRSSを正しく測るため、各フロー・行数の組み合わせは別プロセスで実行する。
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Dict, List, Any
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, BENCHMARK_DIR)
+
+FLOWS = ['csv', 'template', 'sheet']
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+NUM_VIDEOS = 5  # 行に割り当てる動画の種類（同じ動画は2回目以降アップロードせず再利用される）
+
+def percentile(values: List[float], pct: float) -> float:
+    """パーセンタイル（最近傍法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+def build_rows(count: int) -> List[Dict[str, Any]]:
+    """CSV／シートと同じ列の入力行"""
+    start = datetime.now().strftime('%Y-%m-%d')
+    end = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
+    return [
+        {
+            'キャンペーン名': f"bench_{i:05d}",
+            '予算(円/日)': 1000,
+            '開始日': start,
+            '終了日': end,
+            '見出し': f"ベンチマーク見出し {i}",
+            '説明文': 'ベンチマーク用の説明文',
+            'URL': f"https://example.com/bench/{i}",
+            '動画名': f"bench_video_{i % NUM_VIDEOS}"
+        }
+        for i in range(count)
+    ]
+
+class TimedClient:
+    """launch_chain / launch_chains の所要時間を記録する MetaAdsClient のラッパー
+
+    launch_chains でまとめて作成した行は、その呼び出しの所要時間を各行のレイテンシとする。
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def launch_chain(self, spec):
+        started = time.perf_counter()
+        try:
+            return self.client.launch_chain(spec)
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - started)
+
+    def launch_chains(self, specs):
+        started = time.perf_counter()
+        try:
+            return self.client.launch_chains(specs)
+        finally:
+            with self._lock:
+                self.latencies.extend([time.perf_counter() - started] * len(specs))
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+def _server_request(graph_url: str, path: str, method: str = 'GET') -> Dict[str, Any]:
+    """擬似サーバーの計測用エンドポイントを呼び出す"""
+    root = graph_url.rstrip('/').rsplit('/', 1)[0]
+    request = urllib.request.Request(f"{root}/{path}", data=b'' if method == 'POST' else None, method=method)
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+def run_worker(flow: str, size: int, graph_url: str, work_dir: str, accounts: int, sheets_latency: float) -> Dict[str, Any]:
+    """1つのフロー・行数を計測（子プロセス内で実行）"""
+    # Config はインポート時に環境変数を読むため、先に接続先を設定する
+    os.environ.update({
+        'META_GRAPH_API_URL': graph_url,
+        'META_ACCESS_TOKEN': 'benchmark-token',
+        'BUSINESS_MANAGER_ID': 'benchmark-business',
+        'CACHE_DIR': os.path.join(work_dir, 'cache'),
+        'VIDEO_UPLOAD_STATE_DIR': os.path.join(work_dir, 'uploads')
+    })
+
+    import resource
+    from src.meta_client import MetaAdsClient
+    from src.logger import AdLogger
+    from src.bulk_launcher import BulkLauncher, row_to_task
+    from src.launch_journal import LaunchJournal
+    from src.template_manager import TemplateManager
+    from fake_backends import FakeDriveManager, FakeSheetsManager
+
+    client = TimedClient(MetaAdsClient())
+    ad_logger = AdLogger(log_file=os.path.join(work_dir, 'logs', 'ad_campaigns.log'))
+    drive_manager = FakeDriveManager()
+    launcher = BulkLauncher(client, logger=ad_logger, drive_manager=drive_manager)
+    account_ids = [f"act_{1000 + i}" for i in range(accounts)]
+    rows = build_rows(size)
+
+    _server_request(graph_url, '__reset', 'POST')
+    started = time.perf_counter()
+
+    if flow == 'csv':
+        # WebUI の CSV 一括作成と同じ読み込み経路
+        import pandas as pd
+        csv_file = os.path.join(work_dir, 'campaigns.csv')
+        pd.DataFrame(rows).to_csv(csv_file, index=False, encoding='utf-8-sig')
+        df = pd.read_csv(csv_file, encoding='utf-8-sig')
+        records = df.astype(object).where(pd.notna(df), None).to_dict('records')
+        tasks = [row_to_task(row, account_ids[i % accounts]) for i, row in enumerate(records)]
+        results = list(launcher.run(tasks))
+
+    elif flow == 'template':
+        # WebUI のテンプレート一括作成と同じ組み立て
+        template_manager = TemplateManager(template_dir=os.path.join(work_dir, 'templates'))
+        template = template_manager.create_default_template()
+        template_manager.save_template(template)
+        tasks = []
+        for i, row in enumerate(rows):
+            applied = template_manager.apply_template(template['template_name'], {
+                'campaign_name': row['キャンペーン名'],
+                'product_name': f"商品{i}",
+                'current_date': datetime.now().strftime('%Y-%m-%d')
+            })
+            tasks.append({
+                'label': row['キャンペーン名'],
+                'template_name': template['template_name'],
+                'spec': template_manager.build_chain_spec(account_ids[i % accounts], applied)
+            })
+        results = list(launcher.run(tasks))
+
+    elif flow == 'sheet':
+        # CLI のシート一括作成と同じ経路（ジャーナル記録・行ごとのステータス更新を含む）
+        sheets_manager = FakeSheetsManager(rows, latency=sheets_latency)
+        spreadsheet_url = 'https://docs.google.com/spreadsheets/d/benchmark'
+        campaigns = sheets_manager.read_campaign_data(spreadsheet_url)
+        tasks = [row_to_task(row, account_ids[i % accounts]) for i, row in enumerate(campaigns)]
+        journal = LaunchJournal(
+            LaunchJournal.job_id_for(spreadsheet_url, [task['spec'] for task in tasks]),
+            journal_dir=os.path.join(work_dir, 'jobs')
+        )
+        results = []
+        for result in launcher.run(tasks, journal=journal):
+            results.append(result)
+            sheets_manager.update_campaign_status(
+                spreadsheet_url, result['label'], '完了' if result['success'] else 'エラー'
+            )
+
+    else:
+        raise ValueError(f"不明なフロー: {flow}")
+
+    elapsed = time.perf_counter() - started
+    stats = _server_request(graph_url, '__stats')
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_bytes = peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+    # バッチ内の各オペレーションも Meta 側では1呼び出しとして数えられる
+    graph_calls = stats.get('http_requests', 0) - stats.get('batch_requests', 0) + stats.get('batch_operations', 0)
+    succeeded = sum(1 for result in results if result['success'])
+
+    return {
+        'flow': flow,
+        'rows': size,
+        'accounts': accounts,
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(size / elapsed, 2) if elapsed else None,
+        'chain_latency_ms': {
+            'p50': round(percentile(client.latencies, 50) * 1000, 1),
+            'p95': round(percentile(client.latencies, 95) * 1000, 1),
+            'p99': round(percentile(client.latencies, 99) * 1000, 1)
+        },
+        'http_requests_per_row': round(stats.get('http_requests', 0) / size, 3),
+        'api_calls_per_row': round(graph_calls / size, 3),
+        'throttled': stats.get('throttled', 0),
+        'video_bytes_uploaded': stats.get('video_bytes', 0),
+        'peak_rss_mb': round(peak_rss_bytes / (1024 * 1024), 1)
+    }
+
+def git_revision() -> str:
+    """計測対象のコミット"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+def compare(current: Dict[str, Any], previous_file: str):
+    """前回の結果との差分を表示"""
+    with open(previous_file, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+
+    baseline = {(item['flow'], item['rows']): item for item in previous.get('results', [])}
+    print(f"\n📊 前回 ({previous['meta'].get('revision')}) との比較:")
+    for item in current['results']:
+        before = baseline.get((item['flow'], item['rows']))
+        if not before or not before.get('rows_per_second') or not item.get('rows_per_second'):
+            continue
+        change = (item['rows_per_second'] - before['rows_per_second']) / before['rows_per_second'] * 100
+        mark = '⚠️' if change < -10 else '✅'
+        print(f"{mark} {item['flow']:<8} {item['rows']:>6}行: {before['rows_per_second']:.1f} → "
+              f"{item['rows_per_second']:.1f} 行/秒 ({change:+.1f}%), "
+              f"p95 {before['chain_latency_ms']['p95']} → {item['chain_latency_ms']['p95']} ms")
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='一括出稿のスループット計測')
+    parser.add_argument('--flows', nargs='+', choices=FLOWS, default=FLOWS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES)
+    parser.add_argument('--accounts', type=int, default=1, help='行を振り分ける広告アカウント数')
+    parser.add_argument('--latency', type=float, default=0.05, help='擬似 Graph API の応答遅延（秒）')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--quota', type=int, default=0, help='擬似 Graph API のアカウントごとの呼び出し上限')
+    parser.add_argument('--sheets-latency', type=float, default=0.05, help='擬似 Sheets のステータス更新の遅延（秒）')
+    parser.add_argument('--output', help='結果の保存先（省略時は benchmarks/results/<日時>.json）')
+    parser.add_argument('--compare', help='比較する前回の結果ファイル')
+    parser.add_argument('--verbose', action='store_true', help='子プロセスのログを表示')
+    parser.add_argument('--worker', nargs=2, metavar=('FLOW', 'ROWS'), help=argparse.SUPPRESS)
+    parser.add_argument('--graph-url', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """計測を実行して結果を保存"""
+    args = parse_args(argv)
+
+    if args.worker:
+        result = run_worker(args.worker[0], int(args.worker[1]), args.graph_url, args.work_dir,
+                            args.accounts, args.sheets_latency)
+        print(json.dumps(result))
+        return
+
+    from fake_graph_server import FakeGraphServer
+
+    results = []
+    with FakeGraphServer(num_accounts=max(args.accounts, 1), latency=args.latency, jitter=args.jitter,
+                         error_rate=args.error_rate, quota=args.quota) as server:
+        print(f"🚀 擬似 Graph API サーバー: {server.url}")
+        for size in args.sizes:
+            for flow in args.flows:
+                print(f"⏱️  {flow} {size}行 を計測中...", flush=True)
+                with tempfile.TemporaryDirectory(prefix='bench_') as work_dir:
+                    completed = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), '--worker', flow, str(size),
+                         '--graph-url', server.url, '--work-dir', work_dir,
+                         '--accounts', str(args.accounts), '--sheets-latency', str(args.sheets_latency)],
+                        cwd=work_dir, stdout=subprocess.PIPE,
+                        stderr=None if args.verbose else subprocess.DEVNULL
+                    )
+                if completed.returncode != 0:
+                    print(f"❌ {flow} {size}行 の計測に失敗しました (終了コード {completed.returncode})")
+                    continue
+
+                result = json.loads(completed.stdout.decode('utf-8').strip().splitlines()[-1])
+                results.append(result)
+                print(f"   {result['rows_per_second']} 行/秒, p50/p95/p99 = "
+                      f"{result['chain_latency_ms']['p50']}/{result['chain_latency_ms']['p95']}/"
+                      f"{result['chain_latency_ms']['p99']} ms, API {result['api_calls_per_row']} 回/行, "
+                      f"RSS {result['peak_rss_mb']} MB")
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'options': {
+                'accounts': args.accounts, 'latency': args.latency, 'jitter': args.jitter,
+                'error_rate': args.error_rate, 'quota': args.quota, 'sheets_latency': args.sheets_latency
+            }
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(BENCHMARK_DIR, 'results', f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 結果を保存しました: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+一括出稿エンジン
+"""
+import logging
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Iterator
+
+from .config import Config
+from .meta_client import ChainLaunchError, STEP_ENDPOINTS, chain_object_ids
+from .rate_limiter import get_usage_throttle
+from .preflight import validate_specs
+from .video_transfer import get_video_transfer
+
+logger = logging.getLogger(__name__)
+
+def _budget_amount(value: Any) -> Any:
+    """予算のセルを数値に変換（数値でなければそのまま残し、事前検証でその行のエラーにする）"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return 1000.0
+    try:
+        return float(str(value).replace(',', ''))
+    except ValueError:
+        return value
+
+def row_to_task(row: Dict[str, Any], account_id: str) -> Dict[str, Any]:
+    """CSV／スプレッドシートの1行を出稿タスクに変換
+
+    列名は WebUI のサンプルCSV・Google Sheets の入力シートと共通。
+    """
+    campaign_name = str(row.get('キャンペーン名', '')).strip()
+
+    # 動画名・動画名2・動画名3 ... の列（2本以上なら同じ広告セットに動画ごとの広告を作成）
+    video_columns = sorted(
+        (column for column in row if re.fullmatch(r'動画名\d*', str(column))),
+        key=lambda column: int(column[3:] or 1)
+    )
+    video_names = [str(row[column]).strip() for column in video_columns if str(row.get(column) or '').strip()]
+
+    task = {
+        'label': campaign_name,
+        'row': row,
+        'video_name': video_names[0] if video_names else None,  # Google Drive 上の動画名
+        'spec': {
+            'account_id': account_id,
+            'campaign_name': campaign_name,
+            'budget_amount': _budget_amount(row.get('予算(円/日)')),
+            'budget_type': 'daily',
+            'ad_set_name': campaign_name,
+            'start_time': str(row.get('開始日') or datetime.now().strftime('%Y-%m-%d')),
+            'end_time': str(row.get('終了日') or (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')),
+            'creative_name': f"{campaign_name}_Creative",
+            'headline': row.get('見出し', ''),
+            'description': row.get('説明文', ''),
+            'url': row.get('URL', ''),
+            'video_id': None,
+            'ad_name': f"{campaign_name}_1"
+        }
+    }
+    if len(video_names) > 1:
+        task['video_names'] = video_names
+        task['spec']['ads'] = [{} for _ in video_names]
+    return task
+
+def account_result_table(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """一括出稿の結果を広告アカウントごとの一覧表に整形（アカウントID順）"""
+    table = []
+    for result in sorted(results, key=lambda item: (item['task']['spec']['account_id'], item['index'])):
+        created = result['result'] or {}
+        table.append({
+            '広告アカウント': result['task']['spec']['account_id'],
+            'キャンペーン名': result['task']['spec']['campaign_name'],
+            '結果': 'スキップ' if result.get('skipped') else ('成功' if result['success'] else 'エラー'),
+            'キャンペーンID': created.get('campaign', {}).get('id', ''),
+            '広告ID': ', '.join(chain_object_ids(created)['ad_ids']) if created else '',
+            'エラー': result['error'] or ''
+        })
+    return table
+
+class BulkLauncher:
+    """出稿チェーンをワーカープールで並列実行する一括出稿エンジン"""
+
+    def __init__(self, client, logger=None, drive_manager=None,
+                 max_workers: int = None, max_per_account: int = None, chains_per_request: int = None):
+        """初期化"""
+        self.client = client
+        self.ad_logger = logger
+        self.drive_manager = drive_manager
+        self.max_workers = max_workers or Config.BULK_MAX_WORKERS
+        self.max_per_account = max_per_account or Config.BULK_MAX_PER_ACCOUNT
+        self.chains_per_request = max(1, chains_per_request or Config.BULK_CHAINS_PER_REQUEST)
+        self.throttle = get_usage_throttle()
+        self.video_transfer = get_video_transfer(drive_manager) if drive_manager else None
+
+        # Google Drive クライアントはスレッドセーフでないため、検索は直列化してキャッシュする
+        self._video_lock = threading.Lock()
+        self._video_cache = {}
+
+    def run(self, tasks: List[Dict[str, Any]], journal=None,
+            preflight: Dict[int, List[Dict[str, str]]] = None) -> Iterator[Dict[str, Any]]:
+        """タスクを並列実行し、完了した順に結果を返すジェネレータ
+
+        各タスクは {'label', 'spec', 'video_name'(任意)} を持つ辞書。
+        spec に drive_file_id、またはタスクに video_name があれば、Drive の動画を Meta に転送して使う。
+        結果は {'index', 'label', 'task', 'success', 'result', 'error', 'skipped'}。
+        呼び出し側のスレッドで結果を受け取るため、Streamlit の進捗表示をそのまま更新できる。
+        journal（LaunchJournal）を渡すと作成済みIDを記録し、完了済みの行はスキップ、
+        途中で止まった行は作成済みのステップから再開する。
+        preflight に呼び出し側で表示済みの validate_specs の結果（tasks の番号ごと）を渡すと、
+        入力検査を繰り返さずにその結果で該当行を弾く。
+        """
+        # 広告アカウントごとの待ち行列
+        queues = defaultdict(deque)
+        pending = []
+        for index, task in enumerate(tasks):
+            if journal and journal.is_done(journal.row_key(index, task)):
+                yield self._skipped_result(index, task, journal)
+                continue
+            pending.append(index)
+
+        # 入力誤りのある行は、API を呼ぶ前に全行まとめて弾く
+        specs = [self._spec_with_journal(index, tasks[index], journal) for index in pending]
+        if preflight is None:
+            invalid = {
+                pending[position]: errors for position, errors in validate_specs(specs).items()
+            }
+        else:
+            invalid = {index: preflight[index] for index in pending if index in preflight}
+        for index in list(invalid):
+            yield self._rejected_result(
+                index, tasks[index], ' / '.join(error['message'] for error in invalid[index])
+            )
+        specs = [spec for index, spec in zip(pending, specs) if index not in invalid]
+        pending = [index for index in pending if index not in invalid]
+
+        # ターゲティングの名前は全行分を重複なしでまとめて検索し、見つからない行は弾く
+        unresolved = {pending[position]: message for position, message in self.client.resolve_targeting(specs).items()}
+        for index in unresolved:
+            yield self._rejected_result(index, tasks[index], unresolved[index])
+        specs = [spec for index, spec in zip(pending, specs) if index not in unresolved]
+        pending = [index for index in pending if index not in unresolved]
+
+        # 既存キャンペーン・前の行と名前が重複する行は、動画転送や作成の前にローカルで弾く
+        duplicates = {pending[position] for position in self.client.find_duplicate_names(specs)}
+        for index in pending:
+            if index in duplicates:
+                yield self._rejected_result(
+                    index, tasks[index], f"同じ名前のキャンペーンが既に存在します: {tasks[index]['spec']['campaign_name']}"
+                )
+            else:
+                queues[tasks[index]['spec']['account_id']].append(index)
+
+        # 動画の検索・転送はワーカーで行ごとに並列に行い、準備できた行は広告アカウントごとに
+        # launch_chains でまとめて（1回のバッチリクエストに複数チェーンを詰めて）作成する
+        ready = {}  # account_id -> [(index, spec), ...]
+        preparing = defaultdict(int)
+        in_flight = defaultdict(int)
+        futures = {}  # future -> ('prepare', index, account_id) または ('launch', [index, ...], account_id)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while queues or ready or futures:
+                # 全体・アカウント単位の上限内でタスクを投入
+                # 利用率が上限に近いアカウントは投入を見送り、他のアカウントを先に進める
+                next_dispatch = None
+                for account_id in list(dict.fromkeys(list(ready) + list(queues))):
+                    delay = self.throttle.delay_for(account_id)
+                    if delay > 0:
+                        next_dispatch = min(next_dispatch or delay, delay)
+                        continue
+
+                    # 準備できた行は、まとめる数に達したか、そのアカウントの準備待ちがなくなったら送る
+                    group = ready.get(account_id, [])
+                    while (group and len(futures) < self.max_workers
+                           and in_flight[account_id] < self.max_per_account
+                           and (len(group) >= self.chains_per_request
+                                or (not queues.get(account_id) and not preparing[account_id]))):
+                        items, group = group[:self.chains_per_request], group[self.chains_per_request:]
+                        future = executor.submit(self._launch_group, items, tasks, journal)
+                        futures[future] = ('launch', [index for index, _ in items], account_id)
+                        in_flight[account_id] += 1
+                    if group:
+                        ready[account_id] = group
+                    else:
+                        ready.pop(account_id, None)
+
+                    queue = queues.get(account_id)
+                    while (queue and len(futures) < self.max_workers
+                           and in_flight[account_id] < self.max_per_account):
+                        index = queue.popleft()
+                        future = executor.submit(self._prepare_task, index, tasks[index], journal)
+                        futures[future] = ('prepare', index, account_id)
+                        preparing[account_id] += 1
+                        in_flight[account_id] += 1
+                    if queue is not None and not queue:
+                        del queues[account_id]
+
+                if not futures:
+                    if next_dispatch:
+                        time.sleep(next_dispatch)
+                    continue
+
+                done, _ = wait(futures, timeout=next_dispatch, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, indices, account_id = futures.pop(future)
+                    in_flight[account_id] -= 1
+                    if kind == 'prepare':
+                        preparing[account_id] -= 1
+                        try:
+                            ready.setdefault(account_id, []).append((indices, future.result()))
+                        except Exception as e:
+                            yield self._collect_result(indices, tasks[indices], e)
+                        continue
+
+                    try:
+                        outcomes = future.result()
+                    except Exception as e:
+                        outcomes = [e] * len(indices)
+                    for index, outcome in zip(indices, outcomes):
+                        yield self._collect_result(index, tasks[index], outcome)
+
+    def launch_one(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """1件のタスクを実行して結果を返す"""
+        return next(self.run([task]))
+
+    def _spec_with_journal(self, index: int, task: Dict[str, Any], journal=None) -> Dict[str, Any]:
+        """ジャーナルに記録された作成済みステップを existing_ids に反映した spec"""
+        spec = dict(task['spec'])
+        if journal:
+            existing_ids = journal.completed_steps(journal.row_key(index, task))
+            if existing_ids:
+                spec['existing_ids'] = existing_ids
+        return spec
+
+    def _prepare_task(self, index: int, task: Dict[str, Any], journal=None) -> Dict[str, Any]:
+        """ワーカースレッドで1行分の動画を検索・転送し、作成に使う spec を返す"""
+        spec = self._spec_with_journal(index, task, journal)
+        row_key = journal.row_key(index, task) if journal else None
+
+        if spec.get('existing_ids'):
+            logger.info(f"作成済みのステップから再開します: {task['label']} ({', '.join(spec['existing_ids'])})")
+
+        # エラーが続いて送信を止めているアカウントは、動画の転送もせずにすぐ失敗させる
+        remaining_steps = [step for step in STEP_ENDPOINTS if not (spec.get('existing_ids') or {}).get(step)]
+        blocked = remaining_steps and self.client.circuit_blocked_reason(spec['account_id'], remaining_steps)
+        if blocked:
+            if journal:
+                journal.mark_failed(row_key, blocked)
+            raise ChainLaunchError(blocked, step=remaining_steps[0], created=dict(spec.get('existing_ids') or {}))
+
+        try:
+            if task.get('video_name') and not task.get('video_names') and not spec.get('video_id') and not spec.get('drive_file_id'):
+                spec['drive_file_id'] = self._find_drive_file_id(task['video_name'])
+
+            if spec.get('drive_file_id') and not spec.get('video_id'):
+                spec['video_id'] = self._transfer_video(spec['drive_file_id'], spec['account_id'])
+
+            # 複数の動画は、広告ごとに Drive から探して転送する
+            if spec.get('ads'):
+                video_names = task.get('video_names') or []
+                ads = []
+                for position, entry in enumerate(spec['ads']):
+                    entry = dict(entry)
+                    if position < len(video_names) and not entry.get('video_id') and not entry.get('drive_file_id'):
+                        entry['drive_file_id'] = self._find_drive_file_id(video_names[position])
+                    if entry.get('drive_file_id') and not entry.get('video_id'):
+                        entry['video_id'] = self._transfer_video(entry['drive_file_id'], spec['account_id'])
+                    ads.append(entry)
+                spec['ads'] = ads
+        except Exception as e:
+            if journal:
+                journal.mark_failed(row_key, str(e))
+            raise
+
+        return spec
+
+    def _launch_group(self, items: List[Any], tasks: List[Dict[str, Any]], journal=None) -> List[Any]:
+        """同じ広告アカウントの準備済みの行を launch_chains でまとめて作成
+
+        items は [(index, spec), ...]。戻り値は同じ順序の、作成結果の辞書または ChainLaunchError のリスト。
+        """
+        try:
+            outcomes = self.client.launch_chains([spec for _, spec in items], validated=True)
+        except Exception as e:
+            if journal:
+                for index, _ in items:
+                    journal.mark_failed(journal.row_key(index, tasks[index]), str(e))
+            raise
+
+        if journal:
+            for (index, _), outcome in zip(items, outcomes):
+                row_key = journal.row_key(index, tasks[index])
+                if isinstance(outcome, ChainLaunchError):
+                    journal.record_steps(row_key, outcome.created)
+                    journal.mark_failed(row_key, str(outcome))
+                else:
+                    journal.record_steps(row_key, {step: outcome[step]['id'] for step in outcome})
+                    journal.mark_done(row_key, outcome)
+        return outcomes
+
+    def _transfer_video(self, drive_file_id: str, account_id: str) -> str:
+        """Google Drive の動画を Meta に転送して動画IDを返す"""
+        if not self.video_transfer:
+            raise RuntimeError("Google Drive が設定されていないため動画を転送できません")
+        return self.video_transfer.transfer(drive_file_id, account_id)
+
+    def _find_drive_file_id(self, video_name: str) -> Optional[str]:
+        """動画名から Google Drive のファイルIDを検索（完全一致を優先）"""
+        if not self.drive_manager:
+            return None
+
+        with self._video_lock:
+            if video_name in self._video_cache:
+                return self._video_cache[video_name]
+
+            video_id = None
+            videos = self.drive_manager.search_videos_by_name(video_name)
+            if videos:
+                video_id = videos[0]['id']
+                for video in videos:
+                    if video['name'].lower() == video_name.lower():
+                        video_id = video['id']
+                        break
+
+            self._video_cache[video_name] = video_id
+            return video_id
+
+    def _rejected_result(self, index: int, task: Dict[str, Any], message: str) -> Dict[str, Any]:
+        """作成前に弾いた行の結果"""
+        logger.error(f"一括出稿エラー: {task['label']} - {message}")
+        if self.ad_logger:
+            self.ad_logger.log_campaign_creation({
+                'account_id': task['spec']['account_id'],
+                'campaign_name': task['label']
+            }, False, message)
+        return {
+            'index': index,
+            'label': task['label'],
+            'task': task,
+            'success': False,
+            'result': None,
+            'error': message,
+            'skipped': False
+        }
+
+    def _skipped_result(self, index: int, task: Dict[str, Any], journal) -> Dict[str, Any]:
+        """前回の実行で完了済みの行の結果"""
+        logger.info(f"完了済みのためスキップします: {task['label']}")
+        return {
+            'index': index,
+            'label': task['label'],
+            'task': task,
+            'success': True,
+            'result': journal.done_result(journal.row_key(index, task)),
+            'error': None,
+            'skipped': True
+        }
+
+    def _collect_result(self, index: int, task: Dict[str, Any], outcome: Any) -> Dict[str, Any]:
+        """完了した行の結果（作成結果の辞書または例外）を整理してログに記録"""
+        account_id = task['spec']['account_id']
+
+        if isinstance(outcome, Exception):
+            logger.error(f"一括出稿エラー: {task['label']} - {outcome}")
+            if self.ad_logger:
+                self.ad_logger.log_campaign_creation({
+                    'account_id': account_id,
+                    'campaign_name': task['label']
+                }, False, str(outcome))
+            return {
+                'index': index,
+                'label': task['label'],
+                'task': task,
+                'success': False,
+                'result': None,
+                'error': str(outcome),
+                'skipped': False
+            }
+
+        if self.ad_logger:
+            self.ad_logger.log_campaign_creation({
+                'account_id': account_id,
+                **chain_object_ids(outcome),
+                'template_used': task.get('template_name', 'Bulk')
+            }, True)
+
+        return {
+            'index': index,
+            'label': task['label'],
+            'task': task,
+            'success': True,
+            'result': outcome,
+            'error': None,
+            'skipped': False
+        }
@@ -0,0 +1,146 @@
+"""
+広告アカウント・エンドポイントごとのサーキットブレーカー
+"""
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from .config import Config
+from .retry_policy import FATAL
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'  # 通常どおり送信する
+OPEN = 'open'  # 送信せずにすぐ失敗させる
+HALF_OPEN = 'half_open'  # 試しに1件だけ送信する
+
+# 行ごとの入力誤りを示すエラーコード（アカウントの異常ではないため数えない。100: 無効なパラメータ）
+ROW_ERROR_CODES = {100}
+
+def _normalize_account_id(account_id: str) -> str:
+    """'act_' 接頭辞の有無に関わらず同じキーになるよう正規化"""
+    account_id = str(account_id)
+    return account_id if account_id.startswith('act_') else f"act_{account_id}"
+
+def counts_as_failure(kind: str, code: Any = None) -> bool:
+    """ブレーカーの失敗として数えるエラーか
+
+    再試行で回復しうるエラー・応答のない通信エラー・行ごとの入力誤りは数えない。
+    """
+    if kind != FATAL or code is None:
+        return False
+    try:
+        return int(code) not in ROW_ERROR_CODES
+    except (TypeError, ValueError):
+        return False
+
+class CircuitOpenError(Exception):
+    """ブレーカーが開いているため送信しなかったことを表す例外"""
+
+    def __init__(self, message, account_id=None, endpoint=None):
+        super().__init__(message)
+        self.account_id = account_id
+        self.endpoint = endpoint
+
+class CircuitBreaker:
+    """(広告アカウント, エンドポイント) ごとに致命的なエラーを数え、連続したら送信を止めるブレーカー
+
+    停止中・支払いに問題があるアカウントへの作成は毎回遅れて失敗し、ワーカーを占有する。
+    連続して致命的なエラーになったら開いて以降の送信をすぐに失敗させ、一定時間後に
+    半開きにして1件だけ試す。成功すれば閉じ、失敗すればもう一度開く。
+    他のアカウントの送信には影響しない。
+    """
+
+    def __init__(self, failure_threshold: int = None, cooldown: float = None):
+        """初期化"""
+        self.failure_threshold = max(1, failure_threshold or Config.CIRCUIT_FAILURE_THRESHOLD)
+        self.cooldown = cooldown if cooldown is not None else Config.CIRCUIT_COOLDOWN
+        self._lock = threading.Lock()
+        self._circuits: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def _circuit(self, account_id: str, endpoint: str) -> Dict[str, Any]:
+        """状態を取得（呼び出し側でロックを保持）"""
+        key = (_normalize_account_id(account_id), endpoint)
+        if key not in self._circuits:
+            self._circuits[key] = {
+                'state': CLOSED, 'failures': 0, 'opened_at': None, 'reason': None, 'probing': False
+            }
+        return self._circuits[key]
+
+    def allow(self, account_id: str, endpoint: str) -> bool:
+        """送信してよいか（半開きなら試行の1件だけを許可）"""
+        with self._lock:
+            circuit = self._circuit(account_id, endpoint)
+            if circuit['state'] == CLOSED:
+                return True
+
+            if circuit['state'] == OPEN:
+                if time.time() - circuit['opened_at'] < self.cooldown:
+                    return False
+                circuit['state'] = HALF_OPEN
+                logger.info(f"ブレーカーを半開きにして試行します: {account_id} / {endpoint}")
+
+            if circuit['probing']:
+                return False
+            circuit['probing'] = True
+            return True
+
+    def is_open(self, account_id: str, endpoint: str) -> bool:
+        """試行枠を使わずに、送信を止めている最中かを確認"""
+        with self._lock:
+            circuit = self._circuit(account_id, endpoint)
+            if circuit['state'] == OPEN:
+                return time.time() - circuit['opened_at'] < self.cooldown
+            return circuit['state'] == HALF_OPEN and circuit['probing']
+
+    def reason(self, account_id: str, endpoint: str) -> Optional[str]:
+        """開いた原因のエラーメッセージ"""
+        with self._lock:
+            return self._circuit(account_id, endpoint)['reason']
+
+    def record_success(self, account_id: str, endpoint: str):
+        """成功を記録（半開きなら閉じる）"""
+        with self._lock:
+            circuit = self._circuit(account_id, endpoint)
+            if circuit['state'] != CLOSED:
+                logger.info(f"ブレーカーを閉じました: {account_id} / {endpoint}")
+            circuit.update({'state': CLOSED, 'failures': 0, 'opened_at': None, 'reason': None, 'probing': False})
+
+    def record_failure(self, account_id: str, endpoint: str, reason: str):
+        """致命的なエラーを記録（しきい値に達した・半開きの試行が失敗したら開く）"""
+        with self._lock:
+            circuit = self._circuit(account_id, endpoint)
+            circuit['failures'] += 1
+            circuit['probing'] = False
+            if circuit['state'] == HALF_OPEN or circuit['failures'] >= self.failure_threshold:
+                if circuit['state'] != OPEN:
+                    logger.warning(
+                        f"ブレーカーを開きました: {account_id} / {endpoint} "
+                        f"({self.cooldown:.0f}秒間送信を止めます): {reason}"
+                    )
+                circuit.update({'state': OPEN, 'opened_at': time.time(), 'reason': reason})
+
+    def release(self, account_id: str, endpoint: str):
+        """結果が判断に使えなかった試行の枠を返す（状態は変えない）"""
+        with self._lock:
+            self._circuit(account_id, endpoint)['probing'] = False
+
+    def open_circuits(self) -> Dict[Tuple[str, str], str]:
+        """送信を止めている (アカウント, エンドポイント) と原因"""
+        with self._lock:
+            return {
+                key: circuit['reason'] for key, circuit in self._circuits.items()
+                if circuit['state'] != CLOSED
+            }
+
+_circuit_breaker = None
+_circuit_breaker_lock = threading.Lock()
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """プロセス全体で共有するブレーカーを取得"""
+    global _circuit_breaker
+    with _circuit_breaker_lock:
+        if _circuit_breaker is None:
+            _circuit_breaker = CircuitBreaker()
+        return _circuit_breaker
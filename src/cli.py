@@ -3,11 +3,15 @@ CLI インターフェース
 """
 import sys
 from datetime import datetime, timedelta
-from .meta_client import MetaAdsClient
+from .meta_client import MetaAdsClient, ChainLaunchError, chain_object_ids
 from .logger import AdLogger
 from .template_manager import TemplateManager
 from .google_sheets_manager import GoogleSheetsManager
 from .google_drive_manager import GoogleDriveManager
+from .bulk_launcher import BulkLauncher, row_to_task, account_result_table
+from .preflight import validate_specs, error_table
+from .launch_journal import LaunchJournal
+from .insights_exporter import InsightsExporter, default_output_path
 
 class MetaAdsCLI:
     """Meta広告自動出稿システム CLI"""
@@ -171,11 +175,14 @@ class MetaAdsCLI:
         print("\n📋 作成方法を選択してください:")
         print("1. テンプレートを使用（クイック出稿）")
         print("2. 手動で詳細設定")
+        print("3. テンプレートを複数アカウントに一括展開")
         
-        method_choice = input("選択 (1-2, デフォルト: 1): ").strip() or '1'
+        method_choice = input("選択 (1-3, デフォルト: 1): ").strip() or '1'
         
         if method_choice == '1':
             return self.quick_campaign_creation()
+        elif method_choice == '3':
+            return self.fanout_campaign_creation()
         else:
             return self.manual_campaign_creation()
     
@@ -214,6 +221,13 @@ class MetaAdsCLI:
             print(f"❌ テンプレート適用エラー: {e}")
             return False
         
+        # 同名のキャンペーンがあれば入力を続ける前に中止する
+        try:
+            self.client.check_campaign_name(account['id'], template_data['campaign']['name_template'])
+        except ChainLaunchError as e:
+            print(f"❌ {e}")
+            return False
+        
         # 4. 設定確認とカスタマイズ
         print("\n📋 テンプレート設定:")
         print("-" * 50)
@@ -251,6 +265,114 @@ class MetaAdsCLI:
         # 6. 作成実行
         return self.execute_campaign_creation(account, template_data)
     
+    def select_ad_accounts(self):
+        """広告アカウントの複数選択"""
+        print("📋 広告アカウント一覧を取得中...")
+        
+        try:
+            accounts = self.client.get_ad_accounts()
+        except Exception as e:
+            print(f"❌ アカウント取得エラー: {e}")
+            self.logger.log_account_access({}, False, str(e))
+            return []
+        
+        if not accounts:
+            print("❌ 利用可能な広告アカウントが見つかりません。")
+            return []
+        
+        print("\n📋 利用可能な広告アカウント:")
+        print("-" * 50)
+        
+        for i, account in enumerate(accounts, 1):
+            status_emoji = "✅" if account['status'] == 1 else "⚠️"
+            print(f"{i}. {status_emoji} {account['name']} (ID: {account['id']})")
+        
+        while True:
+            choice = input(f"\n展開先のアカウントをカンマ区切りで選択してください (1-{len(accounts)}, all で全て): ").strip().lower()
+            if choice == 'all':
+                selected_accounts = accounts
+            else:
+                try:
+                    numbers = [int(number) for number in choice.split(',') if number.strip()]
+                except ValueError:
+                    print("❌ 数値を入力してください。")
+                    continue
+                if not numbers or any(not 1 <= number <= len(accounts) for number in numbers):
+                    print("❌ 無効な選択です。")
+                    continue
+                selected_accounts = [accounts[number - 1] for number in dict.fromkeys(numbers)]
+            
+            print(f"✅ 選択されたアカウント: {', '.join(account['name'] for account in selected_accounts)}")
+            return selected_accounts
+    
+    def fanout_campaign_creation(self):
+        """1つのテンプレートを複数の広告アカウントに並列展開"""
+        print("\n🌐 複数アカウント展開モード")
+        
+        template_name = self.select_template()
+        
+        accounts = self.select_ad_accounts()
+        if not accounts:
+            return False
+        
+        print("\n📝 基本情報を入力してください:")
+        print("-" * 40)
+        
+        campaign_name = input("キャンペーン名: ").strip()
+        if not campaign_name:
+            print("❌ キャンペーン名は必須です。")
+            return False
+        
+        variables = {
+            'campaign_name': campaign_name,
+            'product_name': input("商品名 (オプション): ").strip() or "商品",
+            'current_date': datetime.now().strftime('%Y-%m-%d')
+        }
+        
+        try:
+            template_data = self.template_manager.apply_template(template_name, variables)
+        except Exception as e:
+            print(f"❌ テンプレート適用エラー: {e}")
+            return False
+        
+        print("\n🔧 設定をカスタマイズしますか？ (y/N): ", end="")
+        if input().strip().lower() == 'y':
+            template_data = self.customize_template_settings(template_data)
+        
+        print("\n📋 最終確認:")
+        print("-" * 50)
+        print(f"展開先アカウント: {len(accounts)}件")
+        print(f"キャンペーン名: {template_data['campaign']['name_template']}")
+        print(f"予算: {template_data['ad_set']['budget']}円/日 (アカウントごと)")
+        print(f"期間: {template_data['ad_set']['start_time']} ～ {template_data['ad_set']['end_time']}")
+        
+        confirm = input(f"\n{len(accounts)}件のアカウントに作成しますか？ (y/N): ").strip().lower()
+        if confirm != 'y':
+            print("❌ 作成をキャンセルしました。")
+            return False
+        
+        tasks = self.template_manager.build_fanout_tasks(
+            template_name, [account['id'] for account in accounts], template_data=template_data
+        )
+        preflight = self.print_preflight_report(tasks)
+        launcher = BulkLauncher(self.client, logger=self.logger, drive_manager=self.drive_manager)
+        journal = LaunchJournal(LaunchJournal.job_id_for([task['spec'] for task in tasks]))
+        
+        # アカウントごとの同時実行数の上限内で並列に作成する
+        results = []
+        for completed, result in enumerate(launcher.run(tasks, journal=journal, preflight=preflight), 1):
+            results.append(result)
+            mark = "❌" if not result['success'] else ("⏭️" if result['skipped'] else "✅")
+            print(f"{mark} ({completed}/{len(tasks)}) {result['label']}")
+        
+        print("\n📊 アカウント別の結果:")
+        print("-" * 50)
+        for row in account_result_table(results):
+            detail = f"キャンペーンID {row['キャンペーンID']}" if row['キャンペーンID'] else row['エラー']
+            print(f"{row['広告アカウント']}: {row['結果']} {detail}")
+        
+        return all(result['success'] for result in results)
+    
     def customize_template_settings(self, template_data):
         """テンプレート設定のカスタマイズ"""
         print("\n🔧 カスタマイズ項目:")
@@ -390,52 +512,22 @@ class MetaAdsCLI:
         try:
             print("\n🔄 広告を作成中...")
             
-            # キャンペーン作成
-            campaign = self.client.create_campaign(
-                account['id'],
-                template_data['campaign']['name_template'],
-                template_data['campaign']['objective']
-            )
+            # キャンペーン→広告セット→クリエイティブ→広告を1回のバッチで作成
+            chain_spec = self.template_manager.build_chain_spec(account['id'], template_data)
+            result = self.client.launch_chain(chain_spec)
+            campaign = result['campaign']
+            ad_set = result['ad_set']
+            creative = result['creative']
+            ad = result['ad']
             print(f"✅ キャンペーン作成完了: {campaign['id']}")
-            
-            # 広告セット作成
-            ad_set = self.client.create_ad_set(
-                account['id'],
-                campaign['id'],
-                template_data['ad_set']['name_template'],
-                template_data['ad_set']['budget'],
-                template_data['ad_set']['start_time'],
-                template_data['ad_set']['end_time']
-            )
             print(f"✅ 広告セット作成完了: {ad_set['id']}")
-            
-            # クリエイティブ作成
-            creative = self.client.create_ad_creative(
-                account['id'],
-                template_data['creative']['name_template'],
-                template_data['creative']['headline_template'],
-                template_data['creative']['description_template'],
-                template_data['creative']['url_template'],
-                template_data['creative'].get('video_id')
-            )
             print(f"✅ クリエイティブ作成完了: {creative['id']}")
-            
-            # 広告作成
-            ad = self.client.create_ad(
-                account['id'],
-                ad_set['id'],
-                creative['id'],
-                template_data['ad']['name_template']
-            )
             print(f"✅ 広告作成完了: {ad['id']}")
             
             # ログ記録
             self.logger.log_campaign_creation({
                 'account_id': account['id'],
-                'campaign_id': campaign['id'],
-                'ad_set_id': ad_set['id'],
-                'creative_id': creative['id'],
-                'ad_id': ad['id'],
+                **chain_object_ids(result),
                 'template_used': template_data.get('template_name', 'Manual')
             }, True)
             
@@ -443,7 +535,7 @@ class MetaAdsCLI:
             print(f"📊 キャンペーンID: {campaign['id']}")
             print(f"📊 広告ID: {ad['id']}")
             print("⚠️  広告は一時停止状態で作成されました。")
-            print("   配信を開始するには、Meta広告マネージャーで手動で有効化してください。")
+            print("   配信を開始するには、メニューの「配信ステータス一括変更」で有効化してください。")
             
             # テンプレート保存オプション
             print("\n💾 この設定をテンプレートとして保存しますか？ (y/N): ", end="")
@@ -480,6 +572,121 @@ class MetaAdsCLI:
             if not log['success'] and log.get('error'):
                 print(f"   エラー: {log['error']}")
     
+    def bulk_status_change(self):
+        """作成履歴のキャンペーン・広告セット・広告を一括で有効化/停止"""
+        print("\n🔁 配信ステータス一括変更")
+        print("-" * 50)
+        
+        launched = self.logger.get_launched_objects()
+        if not launched:
+            print("作成済みのキャンペーンが見つかりません。")
+            return
+        
+        for i, item in enumerate(launched, 1):
+            print(f"{i}. {item['timestamp'][:19]} - {item['account_id']} / キャンペーンID: {item['campaign_id']}")
+        
+        choice = input(f"\n対象を選択してください (カンマ区切り 1-{len(launched)}, all で全て): ").strip().lower()
+        if choice == 'all':
+            targets = launched
+        else:
+            try:
+                targets = [launched[int(number) - 1] for number in choice.split(',') if number.strip()]
+            except (ValueError, IndexError):
+                print("❌ 無効な選択です。")
+                return
+        if not targets:
+            print("❌ 対象が選択されていません。")
+            return
+        
+        print("\n1. 有効化 (ACTIVE)")
+        print("2. 一時停止 (PAUSED)")
+        status = {'1': 'ACTIVE', '2': 'PAUSED'}.get(input("選択 (1-2): ").strip())
+        if not status:
+            print("❌ 無効な選択です。")
+            return
+        
+        confirm = input(f"\n{len(targets)}件のキャンペーンを {status} にしますか？ (y/N): ").strip().lower()
+        if confirm != 'y':
+            print("❌ 変更をキャンセルしました。")
+            return
+        
+        errors = self.client.update_statuses(targets, status)
+        failed = {object_id: error for object_id, error in errors.items() if error}
+        self.logger.log_status_change({
+            'status': status,
+            'campaign_ids': [item['campaign_id'] for item in targets],
+            'failed_ids': list(failed)
+        }, not failed, f"{len(failed)}件の更新に失敗" if failed else None)
+        
+        for object_id, error in failed.items():
+            print(f"❌ {object_id}: {error}")
+        print(f"\n🎉 ステータス変更完了: 成功 {len(errors) - len(failed)}件, エラー {len(failed)}件")
+    
+    def export_insights(self):
+        """複数アカウントのインサイトを Parquet ファイルに出力"""
+        print("\n📈 インサイト出力")
+        
+        accounts = self.select_ad_accounts()
+        if not accounts:
+            return
+        
+        print("\n📋 集計単位:")
+        print("1. 広告 (デフォルト)")
+        print("2. 広告セット")
+        print("3. キャンペーン")
+        level = {'2': 'adset', '3': 'campaign'}.get(input("選択 (1-3): ").strip(), 'ad')
+        
+        since = input("開始日 (YYYY-MM-DD, 空欄で昨日1日分): ").strip()
+        time_range = None
+        if since:
+            until = input(f"終了日 (YYYY-MM-DD, デフォルト: {since}): ").strip() or since
+            time_range = {'since': since, 'until': until}
+        
+        output_path = default_output_path(level)
+        print(f"\n⏳ {len(accounts)}件のアカウントのレポートを作成中...")
+        
+        try:
+            summary = InsightsExporter(self.client).export(
+                [account['id'] for account in accounts], output_path, level=level, time_range=time_range
+            )
+        except ImportError:
+            print("❌ Parquet 出力には pyarrow が必要です。pip install pyarrow を実行してください。")
+            return
+        except Exception as e:
+            print(f"❌ インサイト出力エラー: {e}")
+            return
+        
+        for account_id, result in sorted(summary['accounts'].items()):
+            if result['success']:
+                print(f"✅ {account_id}: {result['rows']}行")
+            else:
+                print(f"❌ {account_id}: {result['error']}")
+        print(f"\n🎉 インサイト出力完了: {summary['output']} ({summary['rows']}行)")
+    
+    def sync_local_mirror(self):
+        """ローカルミラーを差分同期してステータス別の件数を表示"""
+        print("\n🗄️ ローカルミラー同期")
+        
+        accounts = self.select_ad_accounts()
+        if not accounts:
+            return
+        
+        print(f"\n⏳ {len(accounts)}件のアカウントを同期中（前回以降の更新分のみ）...")
+        results = self.client.sync_mirror(
+            [account['id'] for account in accounts], launched=self.logger.get_launched_objects()
+        )
+        for account_id, counts in results.items():
+            if 'error' in counts:
+                print(f"❌ {account_id}: {counts['error']}")
+            else:
+                print(f"✅ {account_id}: " + ", ".join(f"{object_type} {count}件" for object_type, count in counts.items()))
+        
+        print("\n📊 ステータス別の件数:")
+        print("-" * 50)
+        for account in accounts:
+            for row in self.client.mirror.status_summary(account['id']):
+                print(f"{row['account_id']} / {row['type']} / {row['status'] or '-'}: {row['count']}件")
+    
     def manage_templates(self):
         """テンプレート管理"""
         while True:
@@ -611,6 +818,12 @@ class MetaAdsCLI:
             targeting['genders'] = [2]
         else:
             targeting['genders'] = [1, 2]
+        
+        # 興味・関心、行動、地域は名前で指定（出稿時にIDへ変換）
+        for field, label in (('interests', '興味・関心'), ('behaviors', '行動'), ('locations', '地域')):
+            names = input(f"{label}（カンマ区切りの名前, 空欄で変更なし）: ").strip()
+            if names:
+                targeting[field] = [name.strip() for name in names.split(',') if name.strip()]
     
     def customize_creative(self, creative):
         """クリエイティブ設定のカスタマイズ"""
@@ -754,6 +967,7 @@ class MetaAdsCLI:
             print("- 説明文")
             print("- URL")
             print("- 動画名 (Google Driveから検索)")
+            print("- 動画名2, 動画名3 (任意: 同じ広告セットに動画ごとの広告を追加)")
             print("\n💡 シートに入力後、'4. シートからデータ読み込み' で処理できます")
     
     def create_template_setting_sheet(self):
@@ -834,83 +1048,63 @@ class MetaAdsCLI:
         
         print(f"\n✅ {len(campaigns)}件のキャンペーンデータを読み込みました")
         
-        # 各キャンペーンを処理
-        for i, campaign in enumerate(campaigns, 1):
-            print(f"\n📝 キャンペーン {i}/{len(campaigns)}: {campaign.get('キャンペーン名', '')}")
-            
-            # 動画検索
-            video_name = campaign.get('動画名', '')
-            video_id = None
-            if video_name:
-                video_id = self.search_video_by_name(video_name)
-                if video_id:
-                    print(f"✅ 動画が見つかりました: {video_name}")
-                else:
-                    print(f"⚠️ 動画が見つかりません: {video_name}")
+        # アカウント選択（全行共通）
+        account = self.select_ad_account()
+        if not account:
+            return
+        
+        tasks = [row_to_task(campaign, account['id']) for campaign in campaigns]
+        for i, task in enumerate(tasks, 1):
+            video_names = task.get('video_names') or ([task['video_name']] if task['video_name'] else [])
+            video_info = f" / 動画: {', '.join(video_names)}" if video_names else ""
+            print(f"{i}. {task['label']}{video_info}")
+        
+        preflight = self.print_preflight_report(tasks)
+        
+        confirm = input(f"\nこれら{len(campaigns)}件のキャンペーンを作成しますか？ (y/N): ").strip().lower()
+        if confirm != 'y':
+            print("❌ 作成をキャンセルしました。")
+            return
+        
+        # 一括出稿エンジンで並列作成し、完了した行から順にステータスを更新
+        launcher = BulkLauncher(self.client, logger=self.logger, drive_manager=self.drive_manager)
+        
+        # 同じシート・同じ内容のジョブは前回のジャーナルから再開できる
+        job_id = LaunchJournal.job_id_for(spreadsheet_url, [task['spec'] for task in tasks])
+        journal = LaunchJournal(job_id)
+        summary = journal.summary()
+        if summary['done'] or summary['partial']:
+            print(f"\n🔁 前回のジョブが見つかりました: 完了済み {summary['done']}件, 途中 {summary['partial']}件")
+            resume = input("前回の中断から再開しますか？ (Y/n): ").strip().lower()
+            if resume == 'n':
+                journal = LaunchJournal(f"{job_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}")
+        
+        success_count = 0
+        for completed, result in enumerate(launcher.run(tasks, journal=journal, preflight=preflight), 1):
+            if result['skipped']:
+                success_count += 1
+                print(f"⏭️ ({completed}/{len(tasks)}) {result['label']}: 前回作成済みのためスキップ")
+                status = '完了'
+            elif result['success']:
+                success_count += 1
+                print(f"✅ ({completed}/{len(tasks)}) {result['label']}: キャンペーンID {result['result']['campaign']['id']}")
+                status = '完了'
+            else:
+                print(f"❌ ({completed}/{len(tasks)}) {result['label']}: {result['error']}")
+                status = 'エラー'
             
-            # キャンペーン作成の確認
-            confirm = input("このキャンペーンを作成しますか？ (y/N): ").strip().lower()
-            if confirm == 'y':
-                success = self.create_campaign_from_sheet_data(campaign, video_id)
-                if success:
-                    # ステータスを更新
-                    self.sheets_manager.update_campaign_status(
-                        spreadsheet_url, 
-                        campaign.get('キャンペーン名', ''), 
-                        '完了'
-                    )
-                else:
-                    self.sheets_manager.update_campaign_status(
-                        spreadsheet_url, 
-                        campaign.get('キャンペーン名', ''), 
-                        'エラー'
-                    )
+            self.sheets_manager.update_campaign_status(spreadsheet_url, result['label'], status)
+        
+        print(f"\n🎉 一括作成完了: 成功 {success_count}件, エラー {len(tasks) - success_count}件")
     
-    def create_campaign_from_sheet_data(self, campaign_data, video_id=None):
-        """シートデータからキャンペーンを作成"""
-        try:
-            # アカウント選択
-            account = self.select_ad_account()
-            if not account:
-                return False
-            
-            # テンプレートデータを構築
-            template_data = {
-                'campaign': {
-                    'name_template': campaign_data.get('キャンペーン名', ''),
-                    'objective': campaign_data.get('目的', 'LINK_CLICKS'),
-                    'status': 'PAUSED'
-                },
-                'ad_set': {
-                    'name_template': f"{campaign_data.get('キャンペーン名', '')}_AdSet",
-                    'budget': float(campaign_data.get('予算(円/日)', 1000)),
-                    'start_time': campaign_data.get('開始日', datetime.now().strftime('%Y-%m-%d')),
-                    'end_time': campaign_data.get('終了日', (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')),
-                    'targeting': {
-                        'geo_locations': {'countries': ['JP']},
-                        'age_min': 18,
-                        'age_max': 65
-                    }
-                },
-                'creative': {
-                    'name_template': f"{campaign_data.get('キャンペーン名', '')}_Creative",
-                    'headline_template': campaign_data.get('見出し', ''),
-                    'description_template': campaign_data.get('説明文', ''),
-                    'url_template': campaign_data.get('URL', ''),
-                    'video_id': video_id
-                },
-                'ad': {
-                    'name_template': f"{campaign_data.get('キャンペーン名', '')}_Ad",
-                    'status': 'PAUSED'
-                }
-            }
-            
-            # キャンペーン作成実行
-            return self.execute_campaign_creation(account, template_data)
-            
-        except Exception as e:
-            print(f"❌ キャンペーン作成エラー: {e}")
-            return False
+    def print_preflight_report(self, tasks):
+        """入力誤りのある行をまとめて表示し、検査結果を返す（BulkLauncher.run に渡して該当行は作成しない）"""
+        report = validate_specs([task['spec'] for task in tasks])
+        if report:
+            print(f"\n⚠️ {len(report)}件の行に入力エラーがあります（これらの行は作成しません）:")
+            for row in error_table(report, [task['label'] for task in tasks]):
+                print(f"  {row['行']}行目 {row['キャンペーン名']}: {row['エラー']}")
+        return report
     
     def manage_videos(self):
         """動画管理"""
@@ -1021,19 +1215,6 @@ class MetaAdsCLI:
             print(f"   URL: {video['web_view_link']}")
             print()
     
-    def search_video_by_name(self, video_name):
-        """動画名で動画IDを検索"""
-        videos = self.drive_manager.search_videos_by_name(video_name)
-        if videos:
-            # 完全一致を優先
-            for video in videos:
-                if video['name'].lower() == video_name.lower():
-                    return video['id']
-            
-            # 完全一致がない場合は最初の結果を返す
-            return videos[0]['id']
-        return None
-    
     def run(self):
         """メイン実行ループ"""
         self.display_welcome()
@@ -1045,9 +1226,12 @@ class MetaAdsCLI:
             print("3. Google Sheets連携")
             print("4. 動画管理")
             print("5. 最近のログ表示")
-            print("6. 終了")
+            print("6. 配信ステータス一括変更")
+            print("7. インサイト出力")
+            print("8. ローカルミラー同期・確認")
+            print("9. 終了")
             
-            choice = input("\n選択してください (1-6): ").strip()
+            choice = input("\n選択してください (1-9): ").strip()
             
             if choice == '1':
                 self.create_campaign_flow()
@@ -1060,6 +1244,12 @@ class MetaAdsCLI:
             elif choice == '5':
                 self.show_recent_logs()
             elif choice == '6':
+                self.bulk_status_change()
+            elif choice == '7':
+                self.export_insights()
+            elif choice == '8':
+                self.sync_local_mirror()
+            elif choice == '9':
                 print("👋 システムを終了します。")
                 break
             else:
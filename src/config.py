@@ -16,6 +16,27 @@ class Config:
     APP_ID = os.getenv('APP_ID')
     APP_SECRET = os.getenv('APP_SECRET')
     
+    # Graph API 設定（ローカルの擬似サーバーで負荷テストする場合は接続先を上書きする）
+    GRAPH_API_URL = os.getenv('META_GRAPH_API_URL', 'https://graph.facebook.com/v19.0')
+    GRAPH_VIDEO_URL = os.getenv(  # 動画アップロード用
+        'META_GRAPH_VIDEO_URL', GRAPH_API_URL.replace('://graph.facebook.com', '://graph-video.facebook.com')
+    )
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '20'))  # コネクションプールのサイズ
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))  # 接続タイムアウト（秒）
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))  # 読み取りタイムアウト（秒）
+    HTTP_PAGING_DEADLINE = float(os.getenv('HTTP_PAGING_DEADLINE', '120'))  # 複数ページ取得の合計制限時間（秒）
+    
+    # キャッシュ設定
+    CACHE_DIR = os.getenv('CACHE_DIR', 'data/cache')
+    DIRECTORY_BOOTSTRAP_PAGE_SIZE = int(os.getenv('DIRECTORY_BOOTSTRAP_PAGE_SIZE', '500'))  # 一括取得時の1ページあたりの広告アカウント数
+    DIRECTORY_CACHE_TTL = float(os.getenv('DIRECTORY_CACHE_TTL', '3600'))  # アカウント・ページ・データセットの有効期限（秒）
+    NAME_INDEX_TTL = float(os.getenv('NAME_INDEX_TTL', '3600'))  # キャンペーン名インデックスの再構築間隔（秒）
+    CREATIVE_CACHE_VERIFY_TTL = float(os.getenv('CREATIVE_CACHE_VERIFY_TTL', '3600'))  # 再利用するクリエイティブの存在確認間隔（秒）
+    TARGETING_CACHE_TTL = float(os.getenv('TARGETING_CACHE_TTL', '604800'))  # ターゲティング名の検索結果の有効期限（秒）
+    TARGETING_NOT_FOUND_TTL = float(os.getenv('TARGETING_NOT_FOUND_TTL', '86400'))  # 見つからなかった名前の有効期限（秒）
+    TARGETING_LOCALE = os.getenv('TARGETING_LOCALE', 'ja_JP')  # ターゲティング名の検索に使う言語
+    TARGETING_MAX_WORKERS = int(os.getenv('TARGETING_MAX_WORKERS', '4'))  # ターゲティング名の同時検索数
+    
     # アプリケーション設定
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'logs/meta_ads.log')
@@ -24,6 +45,44 @@ class Config:
     DEFAULT_CAMPAIGN_OBJECTIVE = 'LINK_CLICKS'
     DEFAULT_AD_STATUS = 'PAUSED'  # 安全のため最初は停止状態
     
+    # 動画転送設定
+    VIDEO_UPLOAD_STATE_DIR = os.getenv('VIDEO_UPLOAD_STATE_DIR', 'data/uploads')  # 転送途中のアップロードセッション
+    VIDEO_PREFETCH_CHUNKS = int(os.getenv('VIDEO_PREFETCH_CHUNKS', '2'))  # アップロード中に先読みするチャンク数
+    VIDEO_CHUNK_TIMEOUT = float(os.getenv('VIDEO_CHUNK_TIMEOUT', '300'))  # チャンク送信の読み取りタイムアウト（秒）
+    VIDEO_INDEX_VERIFY_TTL = float(os.getenv('VIDEO_INDEX_VERIFY_TTL', '86400'))  # 再利用する動画の存在確認間隔（秒）
+    VIDEO_READY_POLL_INTERVAL = float(os.getenv('VIDEO_READY_POLL_INTERVAL', '2'))  # 動画の処理状況の初回確認間隔（秒）
+    VIDEO_READY_MAX_POLL_INTERVAL = float(os.getenv('VIDEO_READY_MAX_POLL_INTERVAL', '15'))  # 確認間隔の上限（秒）
+    VIDEO_READY_TIMEOUT = float(os.getenv('VIDEO_READY_TIMEOUT', '600'))  # 動画の処理完了を待つ制限時間（秒）
+    
+    # インサイト出力設定
+    INSIGHTS_EXPORT_DIR = os.getenv('INSIGHTS_EXPORT_DIR', 'data/insights')  # 出力ファイルの保存先
+    INSIGHTS_MAX_WORKERS = int(os.getenv('INSIGHTS_MAX_WORKERS', '10'))  # 同時に処理するレポート数
+    INSIGHTS_POLL_INTERVAL = float(os.getenv('INSIGHTS_POLL_INTERVAL', '2'))  # レポート状況の初回確認間隔（秒）
+    INSIGHTS_MAX_POLL_INTERVAL = float(os.getenv('INSIGHTS_MAX_POLL_INTERVAL', '30'))  # 確認間隔の上限（秒）
+    INSIGHTS_TIMEOUT = float(os.getenv('INSIGHTS_TIMEOUT', '1800'))  # 1レポートの完了・取得の制限時間（秒）
+    INSIGHTS_PAGE_SIZE = int(os.getenv('INSIGHTS_PAGE_SIZE', '500'))  # 結果取得の1ページあたりの行数
+    INSIGHTS_ROW_GROUP_SIZE = int(os.getenv('INSIGHTS_ROW_GROUP_SIZE', '10000'))  # 書き込み単位の行数
+    
+    # 一括出稿設定
+    BULK_MAX_WORKERS = int(os.getenv('BULK_MAX_WORKERS', '8'))  # 同時実行ワーカー数
+    BULK_MAX_PER_ACCOUNT = int(os.getenv('BULK_MAX_PER_ACCOUNT', '4'))  # 広告アカウントごとの同時実行数
+    BULK_CHAINS_PER_REQUEST = int(os.getenv('BULK_CHAINS_PER_REQUEST', '12'))  # 1回の作成でまとめて送る行数（1行4件で上限50件に収まる数）
+    
+    # 再試行設定
+    RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '4'))  # 一時的なエラー時の最大試行回数
+    RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '1'))  # バックオフの基準秒数
+    RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '30'))  # バックオフの最大秒数
+    
+    # サーキットブレーカー設定（広告アカウント・エンドポイントごと）
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3'))  # 送信を止めるまでの連続エラー数
+    CIRCUIT_COOLDOWN = float(os.getenv('CIRCUIT_COOLDOWN', '300'))  # 送信を止めてから試行を再開するまでの秒数
+    
+    # API利用率に基づくスロットリング設定
+    THROTTLE_SLOWDOWN_PCT = float(os.getenv('THROTTLE_SLOWDOWN_PCT', '75'))  # この利用率(%)から送信間隔を広げる
+    THROTTLE_PAUSE_PCT = float(os.getenv('THROTTLE_PAUSE_PCT', '95'))  # この利用率(%)で送信を停止
+    THROTTLE_MAX_DELAY = float(os.getenv('THROTTLE_MAX_DELAY', '5'))  # 減速時の最大待機秒数
+    THROTTLE_PAUSE_SECONDS = float(os.getenv('THROTTLE_PAUSE_SECONDS', '60'))  # 停止時の最小待機秒数
+    
     @classmethod
     def validate_config(cls):
         """設定値の検証"""
@@ -0,0 +1,111 @@
+"""
+広告クリエイティブの内容ハッシュによる再利用キャッシュ
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Any
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# 内容が同じでも名前が異なるだけのクリエイティブは同一とみなす
+IGNORED_CREATIVE_FIELDS = {'name'}
+
+def _normalize(value: Any) -> Any:
+    """ハッシュ計算用に値を正規化（文字列の前後空白を除去し、キー順を固定）"""
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in sorted(value.items()) if item not in (None, '')}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+def creative_key(account_id: str, creative_params: Dict[str, Any]) -> str:
+    """広告アカウントとクリエイティブ内容から決まるキー"""
+    account_id = str(account_id)
+    account_id = account_id if account_id.startswith('act_') else f"act_{account_id}"
+    content = {key: value for key, value in creative_params.items() if key not in IGNORED_CREATIVE_FIELDS}
+    payload = json.dumps([account_id, _normalize(content)], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class CreativeCache:
+    """クリエイティブ内容のハッシュから作成済みクリエイティブIDを引くキャッシュ
+
+    エントリは {'creative_id', 'account_id', 'verified_at'}。
+    verified_at は最後にアカウント上で存在を確認した時刻で、再利用前の再確認の要否に使う。
+    """
+
+    def __init__(self, cache_file: str):
+        """初期化"""
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._entries = self._load()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """キャッシュされたエントリを取得"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry else None
+
+    def put(self, key: str, creative_id: str, account_id: str):
+        """作成したクリエイティブを保存"""
+        with self._lock:
+            self._entries[key] = {'creative_id': creative_id, 'account_id': account_id, 'verified_at': time.time()}
+            self._save()
+
+    def mark_verified(self, key: str):
+        """アカウント上での存在確認時刻を更新"""
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]['verified_at'] = time.time()
+                self._save()
+
+    def forget(self, key: str):
+        """使えなくなったクリエイティブを破棄"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def lock_for(self, key: str) -> threading.Lock:
+        """同じ内容のクリエイティブを同時に作成しないためのキー単位のロック"""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _load(self) -> Dict[str, Any]:
+        """ディスクからキャッシュを読み込み"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"クリエイティブキャッシュ読み込みエラー: {e}")
+        return {}
+
+    def _save(self):
+        """ディスクにキャッシュを書き込み（呼び出し側でロックを保持）"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"クリエイティブキャッシュ書き込みエラー: {e}")
+
+_creative_caches = {}
+_creative_caches_lock = threading.Lock()
+
+def get_creative_cache(fingerprint: str) -> CreativeCache:
+    """アクセストークンごとにプロセス全体で共有するクリエイティブキャッシュを取得"""
+    with _creative_caches_lock:
+        if fingerprint not in _creative_caches:
+            cache_file = os.path.join(Config.CACHE_DIR, f"creatives_{fingerprint}.json")
+            _creative_caches[fingerprint] = CreativeCache(cache_file)
+        return _creative_caches[fingerprint]
@@ -0,0 +1,143 @@
+"""
+広告アカウント・Facebookページ・データセットのディレクトリキャッシュ
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Any, Callable
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+def token_fingerprint(access_token: Optional[str]) -> str:
+    """アクセストークンを識別する短いハッシュ（トークン自体は保存しない）"""
+    return hashlib.sha256((access_token or '').encode('utf-8')).hexdigest()[:16]
+
+class AccountDirectory:
+    """TTL付きでディスクに永続化し、期限切れ時はバックグラウンドで更新するキャッシュ
+
+    期限切れのエントリは古い値をそのまま返しつつ裏で取り直すため、
+    画面の再描画ごとに Graph API を待つことはない。
+    """
+
+    def __init__(self, cache_file: str, ttl: float = None, empty_ttl: float = None):
+        """初期化
+
+        empty_ttl を指定すると、loader が返した空の値（見つからなかった結果）もその有効期限で保存し、
+        期限切れ後は次の取得時に取り直す。
+        """
+        self.cache_file = cache_file
+        self.ttl = ttl if ttl is not None else Config.DIRECTORY_CACHE_TTL
+        self.empty_ttl = empty_ttl
+
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._refreshing = set()
+        self._entries = self._load()
+
+    def get(self, key: str, loader: Callable[[], Any], refresh: bool = False) -> Any:
+        """キャッシュから値を取得（未取得なら loader で取得して保存）"""
+        entry = self._entries.get(key)
+
+        if entry is None or refresh:
+            return self._load_entry(key, loader, force=refresh)
+
+        if self.empty_ttl is not None and not entry['value']:
+            if time.time() - entry['fetched_at'] > self.empty_ttl:
+                return self._load_entry(key, loader, force=True)
+            return entry['value']
+
+        if time.time() - entry['fetched_at'] > self.ttl:
+            self._refresh_in_background(key, loader)
+
+        return entry['value']
+
+    def put(self, key: str, value: Any, allow_empty: bool = False):
+        """取得済みの値を保存
+
+        取得失敗時の空結果をキャッシュしないよう、空の値は allow_empty=True のときだけ保存する。
+        """
+        if not value and not allow_empty:
+            return
+        with self._lock:
+            self._entries[key] = {'value': value, 'fetched_at': time.time()}
+            self._save()
+
+    def invalidate(self, key: str = None):
+        """キャッシュを破棄（key 省略時はすべて）"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._save()
+
+    def _load_entry(self, key: str, loader: Callable[[], Any], force: bool = False) -> Any:
+        """同じキーの同時取得をまとめて1回だけ loader を呼ぶ"""
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            entry = self._entries.get(key)
+            if entry is not None and not force:
+                return entry['value']
+
+            value = loader()
+            self.put(key, value, allow_empty=self.empty_ttl is not None)
+            return value
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Any]):
+        """期限切れのエントリをバックグラウンドで更新"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._load_entry(key, loader, force=True)
+                logger.info(f"ディレクトリキャッシュを更新しました: {key}")
+            except Exception as e:
+                logger.warning(f"ディレクトリキャッシュ更新エラー ({key}): {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"directory-refresh-{key}", daemon=True).start()
+
+    def _load(self) -> Dict[str, Any]:
+        """ディスクからキャッシュを読み込み"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"ディレクトリキャッシュ読み込みエラー: {e}")
+        return {}
+
+    def _save(self):
+        """ディスクにキャッシュを書き込み（呼び出し側でロックを保持）"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"ディレクトリキャッシュ書き込みエラー: {e}")
+
+_directories = {}
+_directories_lock = threading.Lock()
+
+def get_directory(access_token: str = None) -> AccountDirectory:
+    """アクセストークンごとにプロセス全体で共有するディレクトリキャッシュを取得"""
+    fingerprint = token_fingerprint(access_token or Config.META_ACCESS_TOKEN)
+    with _directories_lock:
+        if fingerprint not in _directories:
+            cache_file = os.path.join(Config.CACHE_DIR, f"directory_{fingerprint}.json")
+            _directories[fingerprint] = AccountDirectory(cache_file)
+        return _directories[fingerprint]
@@ -0,0 +1,111 @@
+"""
+アカウント・トークンごとに有効なエンドポイントを学習するルーター
+"""
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Callable
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+class EndpointRouter:
+    """候補エンドポイントのうち成功したものを記憶し、次回から直接呼び出すクラス"""
+
+    def __init__(self, cache_file: str):
+        """初期化"""
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._routes = self._load()
+
+    def fetch(self, route_key: str, candidates: List[str], fetch_fn: Callable[[str], List[Any]]) -> List[Any]:
+        """学習済みのエンドポイントがあればそれを、なければ全候補を並列に試して結果を返す
+
+        fetch_fn は候補を受け取って結果のリストを返し、失敗時は例外を送出する関数。
+        """
+        learned = self._routes.get(route_key)
+        if learned in candidates:
+            try:
+                return fetch_fn(learned)
+            except Exception as e:
+                logger.warning(f"学習済みエンドポイント {learned} でエラー: {e}")
+                self.forget(route_key)
+
+        return self._probe(route_key, candidates, fetch_fn)
+
+    def forget(self, route_key: str):
+        """学習済みのエンドポイントを破棄"""
+        with self._lock:
+            if self._routes.pop(route_key, None) is not None:
+                self._save()
+
+    def _probe(self, route_key: str, candidates: List[str], fetch_fn: Callable[[str], List[Any]]) -> List[Any]:
+        """全候補を並列に試し、最初に空でない結果を返したエンドポイントを採用"""
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        futures = {executor.submit(fetch_fn, candidate): candidate for candidate in candidates}
+        succeeded = []
+
+        try:
+            for future in as_completed(futures):
+                candidate = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"エンドポイント {candidate} でエラー: {e}")
+                    continue
+
+                if result:
+                    self._remember(route_key, candidate)
+                    return result
+                succeeded.append(candidate)
+        finally:
+            # 残りの候補の応答は待たない
+            executor.shutdown(wait=False)
+
+        if succeeded:
+            # どれも空だった場合は優先順位の高い成功エンドポイントを記憶する
+            self._remember(route_key, min(succeeded, key=candidates.index))
+        else:
+            logger.warning(f"すべてのエンドポイントが失敗しました: {route_key}")
+        return []
+
+    def _remember(self, route_key: str, candidate: str):
+        """成功したエンドポイントを記憶"""
+        with self._lock:
+            if self._routes.get(route_key) != candidate:
+                self._routes[route_key] = candidate
+                self._save()
+        logger.info(f"エンドポイントを学習しました: {route_key} -> {candidate}")
+
+    def _load(self) -> Dict[str, str]:
+        """ディスクから学習結果を読み込み"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"エンドポイント学習結果の読み込みエラー: {e}")
+        return {}
+
+    def _save(self):
+        """ディスクに学習結果を書き込み（呼び出し側でロックを保持）"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self._routes, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"エンドポイント学習結果の書き込みエラー: {e}")
+
+_router = None
+_router_lock = threading.Lock()
+
+def get_endpoint_router() -> EndpointRouter:
+    """プロセス全体で共有するルーターを取得"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = EndpointRouter(os.path.join(Config.CACHE_DIR, 'endpoint_routes.json'))
+        return _router
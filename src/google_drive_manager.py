@@ -1,21 +1,34 @@
 """
 Google Drive動画管理システム
 """
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 import os
+import threading
 from typing import Dict, List, Optional, Any
 import re
 
+from .sdk_session import get_google_credentials, GOOGLE_DRIVE_SCOPES
+
 class GoogleDriveManager:
     """Google Drive動画管理クラス"""
     
     def __init__(self, credentials_file=None):
         """初期化"""
         self.credentials_file = credentials_file or os.getenv('GOOGLE_CREDENTIALS_FILE')
-        self.service = None
-        self.initialize_service()
+        self.credentials = None
+        self._service = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._media_session = None
+        self._media_session_lock = threading.Lock()
+    
+    @property
+    def service(self):
+        """Google Drive API サービス（初回アクセス時に初期化）"""
+        with self._init_lock:
+            if not self._initialized:
+                self._initialized = True
+                self.initialize_service()
+        return self._service
     
     def initialize_service(self):
         """Google Drive API サービスを初期化"""
@@ -25,17 +38,14 @@ class GoogleDriveManager:
                 print("   GOOGLE_CREDENTIALS_FILE 環境変数を設定してください。")
                 return False
             
-            # スコープを設定
-            scope = ['https://www.googleapis.com/auth/drive.readonly']
+            from googleapiclient.discovery import build
             
-            # 認証情報を読み込み
-            creds = Credentials.from_service_account_file(
-                self.credentials_file, 
-                scopes=scope
-            )
+            # 認証情報を読み込み（プロセス内で共有）
+            creds = get_google_credentials(self.credentials_file, GOOGLE_DRIVE_SCOPES)
             
             # サービスを初期化
-            self.service = build('drive', 'v3', credentials=creds)
+            self.credentials = creds
+            self._service = build('drive', 'v3', credentials=creds)
             print("✅ Google Drive サービスが初期化されました")
             return True
             
@@ -50,6 +60,8 @@ class GoogleDriveManager:
                 print("❌ Google Drive サービスが初期化されていません")
                 return []
             
+            from googleapiclient.errors import HttpError
+            
             # 検索クエリを構築
             search_query = "mimeType contains 'video/'"
             
@@ -105,6 +117,8 @@ class GoogleDriveManager:
             if not self.service:
                 return None
             
+            from googleapiclient.errors import HttpError
+            
             file_info = self.service.files().get(
                 fileId=video_id,
                 fields="id, name, size, createdTime, modifiedTime, webViewLink, webContentLink, parents"
@@ -128,12 +142,69 @@ class GoogleDriveManager:
             print(f"❌ 動画取得エラー: {e}")
             return None
     
+    def get_file_metadata(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """転送用のファイル情報を取得（サイズはバイト数、md5Checksum を含む）"""
+        try:
+            if not self.service:
+                return None
+            
+            from googleapiclient.errors import HttpError
+            
+            file_info = self.service.files().get(
+                fileId=file_id,
+                fields="id, name, size, md5Checksum, mimeType, modifiedTime"
+            ).execute()
+            
+            return {
+                'id': file_info['id'],
+                'name': file_info['name'],
+                'size': int(file_info.get('size', 0)),
+                'md5Checksum': file_info.get('md5Checksum'),
+                'mime_type': file_info.get('mimeType', ''),
+                'modified_time': file_info.get('modifiedTime', '')
+            }
+            
+        except HttpError as error:
+            print(f"❌ ファイル情報取得エラー: {error}")
+            return None
+        except Exception as e:
+            print(f"❌ ファイル情報取得エラー: {e}")
+            return None
+    
+    def read_range(self, file_id: str, start: int, end: int) -> bytes:
+        """ファイルの [start, end) の範囲だけをダウンロード（失敗時は例外を送出）
+        
+        googleapiclient のサービスはスレッドセーフでないため、認証済みの requests セッションで
+        Range 指定のダウンロードを行う。
+        """
+        if not self.service:
+            raise RuntimeError("Google Drive サービスが初期化されていません")
+        
+        with self._media_session_lock:
+            if self._media_session is None:
+                from google.auth.transport.requests import AuthorizedSession
+                self._media_session = AuthorizedSession(self.credentials)
+        
+        response = self._media_session.get(
+            f"https://www.googleapis.com/drive/v3/files/{file_id}",
+            params={'alt': 'media'},
+            headers={'Range': f"bytes={start}-{end - 1}"},
+            timeout=(10, 120)
+        )
+        response.raise_for_status()
+        
+        if len(response.content) != end - start:
+            raise IOError(f"Google Drive から想定外のサイズを受信しました ({len(response.content)} / {end - start} バイト)")
+        return response.content
+    
     def list_folders(self, parent_folder_id: str = None) -> List[Dict[str, Any]]:
         """フォルダ一覧を取得"""
         try:
             if not self.service:
                 return []
             
+            from googleapiclient.errors import HttpError
+            
             # 検索クエリを構築
             search_query = "mimeType = 'application/vnd.google-apps.folder'"
             
@@ -174,6 +245,8 @@ class GoogleDriveManager:
             if not self.service:
                 return None
             
+            from googleapiclient.errors import HttpError
+            
             file_info = self.service.files().get(
                 fileId=video_id,
                 fields="webContentLink"
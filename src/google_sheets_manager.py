@@ -1,21 +1,31 @@
 """
 Google Sheets連携管理システム
 """
-import gspread
-from google.oauth2.service_account import Credentials
-import pandas as pd
 from typing import Dict, List, Optional, Any
 import os
+import threading
 from datetime import datetime
 
+from .sdk_session import get_google_credentials, GOOGLE_SHEETS_SCOPES
+
 class GoogleSheetsManager:
     """Google Sheets連携管理クラス"""
     
     def __init__(self, credentials_file=None):
         """初期化"""
         self.credentials_file = credentials_file or os.getenv('GOOGLE_CREDENTIALS_FILE')
-        self.client = None
-        self.initialize_client()
+        self._client = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """Google Sheets クライアント（初回アクセス時に初期化）"""
+        with self._init_lock:
+            if not self._initialized:
+                self._initialized = True
+                self.initialize_client()
+        return self._client
     
     def initialize_client(self):
         """Google Sheets クライアントを初期化"""
@@ -25,20 +35,13 @@ class GoogleSheetsManager:
                 print("   GOOGLE_CREDENTIALS_FILE 環境変数を設定してください。")
                 return False
             
-            # スコープを設定
-            scope = [
-                'https://www.googleapis.com/auth/spreadsheets',
-                'https://www.googleapis.com/auth/drive'
-            ]
+            import gspread
             
-            # 認証情報を読み込み
-            creds = Credentials.from_service_account_file(
-                self.credentials_file, 
-                scopes=scope
-            )
+            # 認証情報を読み込み（プロセス内で共有）
+            creds = get_google_credentials(self.credentials_file, GOOGLE_SHEETS_SCOPES)
             
             # クライアントを初期化
-            self.client = gspread.authorize(creds)
+            self._client = gspread.authorize(creds)
             print("✅ Google Sheets クライアントが初期化されました")
             return True
             
@@ -68,13 +71,14 @@ class GoogleSheetsManager:
             headers = [
                 "キャンペーン名", "商品名", "目的", "予算(円/日)", 
                 "開始日", "終了日", "見出し", "説明文", "URL", 
-                "動画名", "動画ID", "ステータス", "作成日時"
+                "動画名", "動画ID", "ステータス", "作成日時",
+                "動画名2", "動画名3"  # 複数の動画は同じ広告セットに動画ごとの広告として作成
             ]
             
             worksheet.append_row(headers)
             
             # フォーマット設定
-            worksheet.format('A1:M1', {
+            worksheet.format('A1:O1', {
                 'backgroundColor': {'red': 0.2, 'green': 0.6, 'blue': 0.9},
                 'textFormat': {'bold': True, 'foregroundColor': {'red': 1, 'green': 1, 'blue': 1}}
             })
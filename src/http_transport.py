@@ -0,0 +1,173 @@
+"""
+Graph API 用の共有HTTPトランスポート
+"""
+import logging
+import threading
+import time
+from typing import Dict, Any, Iterator
+
+from .config import Config
+from .rate_limiter import get_usage_throttle
+from .retry_policy import get_retry_policy
+
+logger = logging.getLogger(__name__)
+
+class GraphAPIError(Exception):
+    """Graph API がエラーを返したことを表す例外"""
+
+    def __init__(self, message, code=None, subcode=None, http_status=None, error=None):
+        super().__init__(message)
+        self.code = code  # Graph API エラーコード
+        self.subcode = subcode  # エラーサブコード
+        self.http_status = http_status  # HTTPステータス（通信エラー時は None）
+        self.error = error or {}  # Graph API のエラー情報
+
+    @property
+    def is_transient(self) -> bool:
+        """Graph API が一時的なエラーと明示しているか"""
+        return bool(self.error.get('is_transient'))
+
+    @classmethod
+    def from_response(cls, response):
+        """エラーレスポンスから例外を生成"""
+        try:
+            error = response.json().get('error', {})
+        except ValueError:
+            error = {}
+        message = error.get('message') or f"HTTP {response.status_code}"
+        return cls(
+            message,
+            code=error.get('code'),
+            subcode=error.get('error_subcode'),
+            http_status=response.status_code,
+            error=error
+        )
+
+class GraphTransport:
+    """コネクションプール・gzip・タイムアウトを備えたプロセス共通のHTTPトランスポート"""
+
+    def __init__(self, base_url: str = None, access_token: str = None, pool_size: int = None,
+                 connect_timeout: float = None, read_timeout: float = None):
+        """初期化"""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = (base_url or Config.GRAPH_API_URL).rstrip('/')
+        self.access_token = access_token or Config.META_ACCESS_TOKEN
+        self.connect_timeout = connect_timeout or Config.HTTP_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or Config.HTTP_READ_TIMEOUT
+        self.throttle = get_usage_throttle()
+
+        pool_size = pool_size or Config.HTTP_POOL_SIZE
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+
+    def url_for(self, path: str) -> str:
+        """相対パスを完全なURLに変換（完全なURLはそのまま）"""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}" if path else self.base_url
+
+    def request(self, method: str, path: str, params: Dict[str, Any] = None, data: Dict[str, Any] = None,
+                account_id: str = None, timeout: float = None, files: Dict[str, Any] = None,
+                retry: bool = None) -> Dict[str, Any]:
+        """リクエストを送信してJSONを返す
+
+        timeout は読み取りタイムアウト（秒）。接続タイムアウトは共通設定を使用する。
+        files を指定すると multipart/form-data で送信する。
+        retry は一時的なエラー・レート制限時に再試行するか。省略時は GET のみ再試行し、
+        書き込みは冪等なもの（同じ内容の再送で重複しないもの）だけ呼び出し側で retry=True を指定する。
+        """
+        if retry is None:
+            retry = method == 'GET'
+        if not retry:
+            return self._send(method, path, params, data, account_id, timeout, files)
+        return get_retry_policy().call(
+            lambda: self._send(method, path, params, data, account_id, timeout, files),
+            account_id=account_id,
+            description=f"{method} {path.split('?')[0] or 'batch'}"
+        )
+
+    def _send(self, method: str, path: str, params: Dict[str, Any], data: Dict[str, Any],
+              account_id: str, timeout: float, files: Dict[str, Any]) -> Dict[str, Any]:
+        """1回分のリクエストを送信"""
+        url = self.url_for(path)
+        params = dict(params or {})
+        if 'access_token=' not in url:
+            if data is not None:
+                data = dict(data)
+                data.setdefault('access_token', self.access_token)
+            else:
+                params.setdefault('access_token', self.access_token)
+
+        self.throttle.acquire(account_id)
+        try:
+            response = self.session.request(
+                method, url, params=params or None, data=data, files=files,
+                timeout=(self.connect_timeout, timeout or self.read_timeout)
+            )
+        except Exception as e:
+            raise GraphAPIError(f"通信エラー: {e}") from e
+
+        self.throttle.record_headers(response.headers, account_id)
+
+        if response.status_code >= 400:
+            error = GraphAPIError.from_response(response)
+            self.throttle.record_error(error.code, account_id)
+            raise error
+
+        self.throttle.record_success(account_id)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise GraphAPIError(f"不正なレスポンス: {e}", http_status=response.status_code) from e
+
+    def get(self, path: str, params: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
+        """GETリクエスト"""
+        return self.request('GET', path, params=params, **kwargs)
+
+    def post(self, path: str, data: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
+        """POSTリクエスト"""
+        return self.request('POST', path, data=data or {}, **kwargs)
+
+    def get_paged(self, path: str, params: Dict[str, Any] = None, account_id: str = None,
+                  deadline: float = None) -> Iterator[Dict[str, Any]]:
+        """ページングをたどって data の要素を順に返す
+
+        deadline は全ページ取得の合計制限時間（秒）。超過すると TimeoutError を送出する。
+        """
+        deadline = deadline or Config.HTTP_PAGING_DEADLINE
+        started = time.monotonic()
+        url, page_params = path, params
+        page_count = 0
+
+        while url:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                raise TimeoutError(f"ページ取得が制限時間 {deadline}秒 を超えました ({page_count}ページ取得済み)")
+
+            page_count += 1
+            logger.info(f"ページ {page_count} を取得中...")
+            data = self.get(url, page_params, account_id=account_id, timeout=min(self.read_timeout, remaining))
+
+            for item in data.get('data', []):
+                yield item
+
+            # 次ページのURLには access_token を含むクエリがすべて入っている
+            url = data.get('paging', {}).get('next')
+            page_params = None
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> GraphTransport:
+    """プロセス全体で共有するトランスポートを取得"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = GraphTransport()
+        return _transport
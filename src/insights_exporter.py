@@ -0,0 +1,180 @@
+"""
+複数広告アカウントのインサイトを非同期レポートで取得して列指向ファイルに出力
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIELDS = [
+    'account_id', 'campaign_id', 'campaign_name', 'adset_id', 'adset_name', 'ad_id', 'ad_name',
+    'date_start', 'date_stop', 'impressions', 'reach', 'clicks', 'spend', 'ctr', 'cpc', 'cpm', 'actions'
+]
+
+# 数値として保存する項目（それ以外は文字列、配列・オブジェクトは JSON 文字列）
+INTEGER_FIELDS = {'impressions', 'reach', 'clicks', 'unique_clicks', 'inline_link_clicks'}
+FLOAT_FIELDS = {'spend', 'ctr', 'cpc', 'cpm', 'cpp', 'frequency', 'unique_ctr', 'inline_link_click_ctr'}
+
+class InsightsExportError(Exception):
+    """インサイトのレポート作成・取得に失敗したことを表す例外"""
+
+class InsightsExporter:
+    """広告アカウントごとに非同期レポート（AdReportRun）を作成し、結果を Parquet ファイルへ書き出すクラス
+
+    レポートの作成・完了待ち・結果の取得はアカウントごとに並列に行い、完了待ちは
+    間隔を広げながら確認する。結果はページ単位で受け取り、一定行数ごとに
+    行グループとして書き出すため、全件をメモリに保持しない。
+    """
+
+    def __init__(self, client, max_workers: int = None, poll_interval: float = None,
+                 max_poll_interval: float = None, timeout: float = None):
+        """初期化"""
+        self.client = client
+        self.transport = client.transport
+        self.max_workers = max_workers or Config.INSIGHTS_MAX_WORKERS
+        self.poll_interval = poll_interval or Config.INSIGHTS_POLL_INTERVAL
+        self.max_poll_interval = max_poll_interval or Config.INSIGHTS_MAX_POLL_INTERVAL
+        self.timeout = timeout or Config.INSIGHTS_TIMEOUT
+
+    def export(self, account_ids: List[str], output_path: str, level: str = 'ad', date_preset: str = None,
+               time_range: Dict[str, str] = None, fields: List[str] = None) -> Dict[str, Any]:
+        """インサイトを取得して output_path に書き出し、アカウントごとの結果を返す
+
+        期間は date_preset（例: 'yesterday'）または time_range（{'since', 'until'}）で指定する。
+        一部のアカウントが失敗しても他のアカウントの結果は書き出す。
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        fields = list(dict.fromkeys(['account_id'] + list(fields or DEFAULT_FIELDS)))
+        params = {'level': level, 'fields': ','.join(fields)}
+        if time_range:
+            params['time_range'] = json.dumps(time_range)
+        else:
+            params['date_preset'] = date_preset or 'yesterday'
+
+        schema = pa.schema([(field, self._arrow_type(pa, field)) for field in fields])
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        tmp_path = f"{output_path}.tmp"
+        writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+        write_lock = threading.Lock()
+
+        def write(rows):
+            table = pa.Table.from_pylist([self._convert_row(row, fields) for row in rows], schema=schema)
+            with write_lock:
+                writer.write_table(table)
+
+        accounts = {}
+        started = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(self._export_account, account_id, params, write): account_id
+                    for account_id in dict.fromkeys(account_ids)
+                }
+                for future in as_completed(futures):
+                    account_id = futures[future]
+                    try:
+                        accounts[account_id] = {'success': True, 'rows': future.result(), 'error': None}
+                    except Exception as e:
+                        logger.error(f"インサイト取得エラー ({account_id}): {e}")
+                        accounts[account_id] = {'success': False, 'rows': 0, 'error': str(e)}
+        finally:
+            writer.close()
+        os.replace(tmp_path, output_path)
+
+        total_rows = sum(result['rows'] for result in accounts.values())
+        logger.info(f"インサイト出力完了: {output_path} ({len(accounts)}アカウント, {total_rows}行, {time.time() - started:.1f}秒)")
+        return {'output': output_path, 'rows': total_rows, 'accounts': accounts}
+
+    def _export_account(self, account_id: str, params: Dict[str, Any], write) -> int:
+        """1アカウント分のレポートを作成・完了待ち・取得して書き出し、行数を返す"""
+        deadline = time.monotonic() + self.timeout
+        report_run_id = self._submit(account_id, params)
+        self._wait(report_run_id, account_id, deadline)
+
+        rows = []
+        count = 0
+        for row in self.transport.get_paged(
+            f"{report_run_id}/insights",
+            {'limit': Config.INSIGHTS_PAGE_SIZE},
+            account_id=account_id,
+            deadline=max(1.0, deadline - time.monotonic())
+        ):
+            rows.append(row)
+            if len(rows) >= Config.INSIGHTS_ROW_GROUP_SIZE:
+                write(rows)
+                count += len(rows)
+                rows = []
+        if rows:
+            write(rows)
+            count += len(rows)
+
+        logger.info(f"インサイト取得完了: {account_id} ({count}行)")
+        return count
+
+    def _submit(self, account_id: str, params: Dict[str, Any]) -> str:
+        """非同期レポートを作成"""
+        response = self.transport.post(f"{account_id}/insights", dict(params), account_id=account_id)
+        report_run_id = response.get('report_run_id')
+        if not report_run_id:
+            raise InsightsExportError(f"レポートを作成できませんでした: {response}")
+        return report_run_id
+
+    def _wait(self, report_run_id: str, account_id: str, deadline: float):
+        """レポートの完了を間隔を広げながら待機"""
+        interval = self.poll_interval
+        while True:
+            report = self.transport.get(
+                report_run_id,
+                {'fields': 'async_status,async_percent_completion'},
+                account_id=account_id
+            )
+            status = report.get('async_status')
+            if status == 'Job Completed':
+                return
+            if status in ('Job Failed', 'Job Skipped'):
+                raise InsightsExportError(f"レポートの作成に失敗しました: {report_run_id} ({status})")
+
+            if time.monotonic() + interval > deadline:
+                raise InsightsExportError(f"レポートが制限時間内に完了しませんでした: {report_run_id}")
+
+            logger.info(f"レポート作成待ち: {account_id} ({report.get('async_percent_completion', 0)}%)")
+            time.sleep(interval)
+            interval = min(interval * 2, self.max_poll_interval)
+
+    def _arrow_type(self, pa, field: str):
+        """項目の列型"""
+        if field in INTEGER_FIELDS:
+            return pa.int64()
+        if field in FLOAT_FIELDS:
+            return pa.float64()
+        return pa.string()
+
+    def _convert_row(self, row: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+        """Graph API の1行を列型に合わせて変換"""
+        converted = {}
+        for field in fields:
+            value = row.get(field)
+            if value is None or value == '':
+                converted[field] = None
+            elif field in INTEGER_FIELDS:
+                converted[field] = int(float(value))
+            elif field in FLOAT_FIELDS:
+                converted[field] = float(value)
+            elif isinstance(value, (list, dict)):
+                converted[field] = json.dumps(value, ensure_ascii=False)
+            else:
+                converted[field] = str(value)
+        return converted
+
+def default_output_path(level: str = 'ad') -> str:
+    """出力先のファイルパス（保存先ディレクトリ・日時入り）"""
+    return os.path.join(Config.INSIGHTS_EXPORT_DIR, f"insights_{level}_{time.strftime('%Y%m%d_%H%M%S')}.parquet")
@@ -0,0 +1,123 @@
+"""
+一括出稿ジョブの先行書き込みジャーナル
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+def _digest(value: Any) -> str:
+    """JSON化できる値の安定したハッシュ"""
+    payload = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class LaunchJournal:
+    """行・ステップごとに作成済みオブジェクトIDを記録するジャーナル
+
+    1ジョブ1ファイルのJSON Linesに追記し、再実行時は完了済みの行をスキップ、
+    途中で止まった行は作成済みのIDを引き継いで残りのステップから再開する。
+    """
+
+    def __init__(self, job_id: str, journal_dir: str = 'data/jobs'):
+        """初期化"""
+        self.job_id = job_id
+        self.journal_dir = journal_dir
+        self.journal_file = os.path.join(journal_dir, f"{job_id}.jsonl")
+        os.makedirs(journal_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._steps = {}  # row_key -> {step: object_id}
+        self._done = {}  # row_key -> 完了時の結果
+        self._replay()
+
+    @staticmethod
+    def job_id_for(*inputs: Any) -> str:
+        """入力内容から決まるジョブID（同じ入力の再実行は同じジャーナルを再開する）"""
+        return f"job_{_digest(inputs)[:16]}"
+
+    @staticmethod
+    def row_key(index: int, task: Dict[str, Any]) -> str:
+        """タスクを識別するキー"""
+        spec = {key: value for key, value in task['spec'].items() if key != 'existing_ids'}
+        return f"{index}:{_digest(spec)[:12]}"
+
+    def is_done(self, row_key: str) -> bool:
+        """行が完了済みか"""
+        with self._lock:
+            return row_key in self._done
+
+    def done_result(self, row_key: str) -> Optional[Dict[str, Any]]:
+        """完了済みの行の結果"""
+        with self._lock:
+            return self._done.get(row_key)
+
+    def completed_steps(self, row_key: str) -> Dict[str, str]:
+        """行の作成済みステップとID"""
+        with self._lock:
+            return dict(self._steps.get(row_key, {}))
+
+    def record_steps(self, row_key: str, created: Dict[str, str]):
+        """作成済みステップのIDを記録（記録済みのものは書き込まない）"""
+        with self._lock:
+            known = self._steps.setdefault(row_key, {})
+            for step, object_id in created.items():
+                if object_id and known.get(step) != object_id:
+                    known[step] = object_id
+                    self._append({'type': 'step', 'row': row_key, 'step': step, 'id': object_id})
+
+    def mark_done(self, row_key: str, result: Dict[str, Any]):
+        """行の完了を記録"""
+        with self._lock:
+            self._done[row_key] = result
+            self._append({'type': 'done', 'row': row_key, 'result': result})
+
+    def mark_failed(self, row_key: str, error: str):
+        """行の失敗を記録（再実行時は作成済みステップから再開される）"""
+        with self._lock:
+            self._append({'type': 'failed', 'row': row_key, 'error': error})
+
+    def summary(self) -> Dict[str, int]:
+        """完了済み・途中の行数"""
+        with self._lock:
+            partial = [key for key in self._steps if key not in self._done]
+            return {'done': len(self._done), 'partial': len(partial)}
+
+    def _append(self, record: Dict[str, Any]):
+        """レコードを追記してディスクに同期（呼び出し側でロックを保持）"""
+        record['timestamp'] = datetime.now().isoformat()
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replay(self):
+        """既存のジャーナルを読み込んで状態を復元"""
+        if not os.path.exists(self.journal_file):
+            return
+
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 書き込み途中で止まった最終行は無視する
+                    continue
+
+                if record.get('type') == 'step':
+                    self._steps.setdefault(record['row'], {})[record['step']] = record['id']
+                elif record.get('type') == 'done':
+                    self._done[record['row']] = record.get('result')
+
+        summary = self.summary()
+        logger.info(f"ジャーナルを再開します: {self.job_id} (完了 {summary['done']}件, 途中 {summary['partial']}件)")
+
+def list_journals(journal_dir: str = 'data/jobs') -> List[str]:
+    """保存されているジョブID一覧"""
+    if not os.path.exists(journal_dir):
+        return []
+    return sorted(name[:-len('.jsonl')] for name in os.listdir(journal_dir) if name.endswith('.jsonl'))
@@ -82,6 +82,23 @@ class AdLogger:
         
         self._write_to_file(log_entry)
     
+    def log_status_change(self, status_data, success=True, error_message=None):
+        """配信ステータス変更ログ"""
+        log_entry = {
+            'timestamp': datetime.now().isoformat(),
+            'action': 'status_change',
+            'success': success,
+            'data': status_data,
+            'error': error_message
+        }
+        
+        if success:
+            self.logger.info(f"ステータス変更成功: {status_data}")
+        else:
+            self.logger.error(f"ステータス変更失敗: {error_message}")
+        
+        self._write_to_file(log_entry)
+    
     def _write_to_file(self, log_entry):
         """ログファイルに書き込み"""
         try:
@@ -102,3 +119,41 @@ class AdLogger:
         except Exception as e:
             self.logger.error(f"ログ読み込みエラー: {e}")
             return []
+    
+    def get_launched_objects(self, limit=None):
+        """作成に成功したキャンペーン・広告セット・広告のIDを新しい順に取得
+
+        creative_ids / ad_ids は同じ広告セットに作成した全件（記録がない古いログは1件目のみ）。
+        """
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            self.logger.error(f"ログ読み込みエラー: {e}")
+            return []
+        
+        launched = []
+        seen = set()
+        for entry in reversed(entries):
+            data = entry.get('data') or {}
+            if entry.get('action') != 'campaign_creation' or not entry.get('success') or not data.get('campaign_id'):
+                continue
+            if data['campaign_id'] in seen:
+                continue
+            seen.add(data['campaign_id'])
+            launched.append({
+                'timestamp': entry['timestamp'],
+                'account_id': data.get('account_id'),
+                'campaign_id': data['campaign_id'],
+                'ad_set_id': data.get('ad_set_id'),
+                'creative_id': data.get('creative_id'),
+                'ad_id': data.get('ad_id'),
+                'creative_ids': data.get('creative_ids') or ([data['creative_id']] if data.get('creative_id') else []),
+                'ad_ids': data.get('ad_ids') or ([data['ad_id']] if data.get('ad_id') else []),
+                'template_used': data.get('template_used')
+            })
+            if limit and len(launched) >= limit:
+                break
+        return launched
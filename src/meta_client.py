@@ -1,22 +1,76 @@
 """
 Meta Business API クライアント
 """
+import json
 import logging
-from facebook_business import FacebookAdsApi
-from facebook_business.adobjects.business import Business
-from facebook_business.adobjects.adaccount import AdAccount
-from facebook_business.adobjects.campaign import Campaign
-from facebook_business.adobjects.adset import AdSet
-from facebook_business.adobjects.adcreative import AdCreative
-from facebook_business.adobjects.ad import Ad
-from facebook_business.exceptions import FacebookRequestError
+import re
+import time
+from urllib.parse import urlencode
 
 from .config import Config
+from .rate_limiter import get_usage_throttle
+from .http_transport import get_transport, GraphAPIError
+from .directory_cache import get_directory, token_fingerprint
+from .endpoint_router import get_endpoint_router
+from .creative_cache import get_creative_cache, creative_key
+from .sdk_session import init_facebook_api
+from .object_mirror import get_object_mirror
+from .name_index import get_name_index
+from .retry_policy import get_retry_policy, classify, classify_exception, RETRYABLE, THROTTLED, FATAL
+from .write_ledger import WriteLedger, get_write_ledger
+from .circuit_breaker import get_circuit_breaker, counts_as_failure, CircuitOpenError
+from .preflight import validate_specs
+from .targeting_resolver import get_targeting_resolver, targeting_names, TargetingResolutionError
 
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BATCH_MAX_OPERATIONS = 50  # Graph API バッチリクエスト1回あたりの上限
+
+# チェーンの各ステップの作成先エンドポイント（サーキットブレーカーの単位）
+STEP_ENDPOINTS = {
+    'campaign': 'campaigns',
+    'ad_set': 'adsets',
+    'creative': 'adcreatives',
+    'ad': 'ads'
+}
+
+def base_step(step):
+    """2件目以降の広告のステップ名（creative_2, ad_2 など）を元のステップ名に戻す"""
+    return re.sub(r'_\d+$', '', step)
+
+def chain_endpoints(steps):
+    """ステップの送信先エンドポイントを重複なしで順に返す"""
+    return list(dict.fromkeys(STEP_ENDPOINTS[base_step(step)] for step in steps))
+
+def chain_object_ids(result):
+    """チェーンの作成結果から、作成履歴（AdLogger）に記録するIDを取り出す
+
+    creative_id / ad_id は1件目、creative_ids / ad_ids は2件目以降の広告も含めた全件。
+    """
+    creative_ids = [item['id'] for step, item in result.items() if base_step(step) == 'creative']
+    ad_ids = [item['id'] for step, item in result.items() if base_step(step) == 'ad']
+    return {
+        'campaign_id': result['campaign']['id'],
+        'ad_set_id': result['ad_set']['id'],
+        'creative_id': creative_ids[0] if creative_ids else None,
+        'ad_id': ad_ids[0] if ad_ids else None,
+        'creative_ids': creative_ids,
+        'ad_ids': ad_ids
+    }
+
+class ChainLaunchError(Exception):
+    """キャンペーン→広告セット→クリエイティブ→広告の作成チェーンが途中で失敗したことを表す例外"""
+    
+    def __init__(self, message, step=None, created=None, error=None, kind=FATAL, failed=None):
+        super().__init__(message)
+        self.step = step  # 失敗したステップ（複数ある場合は最初のもの）
+        self.created = created or {}  # 作成済みステップのID
+        self.error = error or {}  # Graph API のエラー情報
+        self.kind = kind  # 再試行の可否（retry_policy の分類）
+        self.failed = failed or ({step: self.error} if step else {})  # 失敗したステップごとのエラー情報
+
 class MetaAdsClient:
     """Meta広告APIクライアント"""
     
@@ -24,62 +78,141 @@ class MetaAdsClient:
         """初期化"""
         Config.validate_config()
         
-        # Facebook Ads API初期化
-        FacebookAdsApi.init(
-            app_id=Config.APP_ID,
-            app_secret=Config.APP_SECRET,
-            access_token=Config.META_ACCESS_TOKEN
+        # Meta Business SDK は個別作成（create_*）で初めて使う時点で読み込み・初期化する
+        self._business = None
+        self.throttle = get_usage_throttle()
+        self.transport = get_transport()
+        self.directory = get_directory(Config.META_ACCESS_TOKEN)
+        self.router = get_endpoint_router()
+        self.token_fingerprint = token_fingerprint(Config.META_ACCESS_TOKEN)
+        self.creative_cache = get_creative_cache(self.token_fingerprint)
+        self.mirror = get_object_mirror(Config.META_ACCESS_TOKEN)
+        self.name_index = get_name_index(Config.META_ACCESS_TOKEN)
+        self.retry_policy = get_retry_policy()
+        self.write_ledger = get_write_ledger(Config.META_ACCESS_TOKEN)
+        self.circuit_breaker = get_circuit_breaker()
+        self.targeting_resolver = get_targeting_resolver(self.transport, Config.META_ACCESS_TOKEN)
+        logger.info("Meta Ads API クライアントが初期化されました")
+    
+    @property
+    def business(self):
+        """Business Manager（SDKオブジェクト）"""
+        if self._business is None:
+            init_facebook_api()
+            from facebook_business.adobjects.business import Business
+            self._business = Business(Config.BUSINESS_MANAGER_ID)
+        return self._business
+    
+    def _ad_account(self, account_id):
+        """広告アカウント（SDKオブジェクト）"""
+        init_facebook_api()
+        from facebook_business.adobjects.adaccount import AdAccount
+        return AdAccount(account_id)
+    
+    def get_ad_accounts(self, refresh=False):
+        """広告アカウント一覧を取得（ディレクトリキャッシュ経由）
+        
+        未取得・更新時はページとデータセットもまとめて取得する。
+        """
+        return self.directory.get('ad_accounts', self._load_directory, refresh=refresh)
+    
+    def get_conversion_datasets(self, account_id, refresh=False):
+        """コンバージョンデータセット一覧を取得（ディレクトリキャッシュ経由）"""
+        return self.directory.get(
+            f"datasets:{account_id}", lambda: self.fetch_conversion_datasets(account_id), refresh=refresh
         )
+    
+    def get_facebook_pages(self, refresh=False):
+        """Facebookページ一覧を取得（ディレクトリキャッシュ経由）"""
+        return self.directory.get('pages', self.fetch_facebook_pages, refresh=refresh)
+    
+    def _load_directory(self):
+        """一括取得を試み、失敗した場合は広告アカウントだけを個別に取得"""
+        try:
+            return self.bootstrap_directory()['ad_accounts']
+        except Exception as e:
+            logger.warning(f"一括取得に失敗したため個別に取得します: {e}")
+            return self.fetch_ad_accounts()
+    
+    def bootstrap_directory(self):
+        """広告アカウント・Facebookページ・データセットをフィールド展開で数回のリクエストにまとめて取得
         
-        self.business = Business(Config.BUSINESS_MANAGER_ID)
-        logger.info("Meta Ads API クライアントが初期化されました")
+        結果は get_ad_accounts / get_facebook_pages / get_conversion_datasets と同じ形式で
+        ディレクトリキャッシュに格納し、{'ad_accounts', 'pages', 'datasets'} として返す。
+        """
+        page_size = Config.DIRECTORY_BOOTSTRAP_PAGE_SIZE
+        fields = (
+            f"adaccounts.limit({page_size}){{id,name,account_status,adspixels{{id,name}}}},"
+            "accounts.limit(100){id,name,category}"
+        )
+        data = self.transport.get('me', {'fields': fields})
+        
+        account_list = []
+        datasets = {}
+        for account in self._expanded_edge(data.get('adaccounts')):
+            account_list.append({
+                'id': account['id'],
+                'name': account.get('name', 'Unknown'),
+                'status': account.get('account_status', 'Unknown')
+            })
+            datasets[account['id']] = [
+                {
+                    'id': dataset['id'],
+                    'name': dataset.get('name', 'Unknown'),
+                    'description': dataset.get('description', '')
+                }
+                for dataset in self._expanded_edge(account.get('adspixels'))
+            ]
+        
+        pages = [
+            {
+                'id': page['id'],
+                'name': page.get('name', 'Unknown'),
+                'category': page.get('category', '')
+            }
+            for page in self._expanded_edge(data.get('accounts'))
+        ]
+        
+        # データセットがないアカウントも「なし」としてキャッシュし、個別取得を発生させない
+        for account_id, account_datasets in datasets.items():
+            self.directory.put(f"datasets:{account_id}", account_datasets, allow_empty=True)
+        self.directory.put('pages', pages)
+        self.directory.put('ad_accounts', account_list)
+        
+        logger.info(
+            f"一括取得: 広告アカウント {len(account_list)}件, Facebookページ {len(pages)}件, "
+            f"データセット {sum(len(items) for items in datasets.values())}件"
+        )
+        return {'ad_accounts': account_list, 'pages': pages, 'datasets': datasets}
     
-    def get_ad_accounts(self):
+    def _expanded_edge(self, edge):
+        """フィールド展開されたエッジの要素を、続きのページもたどって返す"""
+        if not edge:
+            return
+        
+        for item in edge.get('data', []):
+            yield item
+        
+        next_url = edge.get('paging', {}).get('next')
+        if next_url:
+            yield from self.transport.get_paged(next_url)
+    
+    def fetch_ad_accounts(self):
         """Business Manager配下の広告アカウント一覧を取得（ページネーション対応）"""
         try:
-            # 正しいAPIエンドポイントを使用
-            import requests
-            
             # ユーザーの広告アカウントを取得する正しいエンドポイント
-            url = "https://graph.facebook.com/v19.0/me/adaccounts"
             params = {
-                'access_token': Config.META_ACCESS_TOKEN,
                 'fields': 'id,name,account_status',
                 'limit': 25  # 1ページあたりの最大数
             }
             
             account_list = []
-            next_url = None
-            page_count = 0
-            
-            while True:
-                page_count += 1
-                logger.info(f"ページ {page_count} を取得中...")
-                
-                if next_url:
-                    response = requests.get(next_url)
-                else:
-                    response = requests.get(url, params=params)
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                # アカウント情報を追加
-                for account in data.get('data', []):
-                    account_info = {
-                        'id': account['id'],
-                        'name': account.get('name', 'Unknown'),
-                        'status': account.get('account_status', 'Unknown')
-                    }
-                    account_list.append(account_info)
-                
-                # 次のページがあるかチェック
-                paging = data.get('paging', {})
-                next_url = paging.get('next')
-                
-                if not next_url:
-                    logger.info("すべてのページを取得完了")
-                    break
+            for account in self.transport.get_paged('me/adaccounts', params):
+                account_list.append({
+                    'id': account['id'],
+                    'name': account.get('name', 'Unknown'),
+                    'status': account.get('account_status', 'Unknown')
+                })
             
             logger.info(f"{len(account_list)}個の広告アカウントを取得しました")
             return account_list
@@ -90,130 +223,271 @@ class MetaAdsClient:
             logger.warning("手動でアカウントIDを設定してください")
             return []
     
-    def get_conversion_datasets(self, account_id):
+    def fetch_conversion_datasets(self, account_id):
         """コンバージョンデータセット一覧を取得"""
         try:
-            import requests
-            
-            # 複数のエンドポイントを試行
+            # 複数のエンドポイント候補（アカウントごとに成功したものを学習）
             endpoints = [
-                f"https://graph.facebook.com/v19.0/{account_id}/conversion_sources",
-                f"https://graph.facebook.com/v19.0/{account_id}/conversion_datasets",
-                f"https://graph.facebook.com/v19.0/{account_id}/pixels"
+                f"{account_id}/adspixels",
+                f"{account_id}/conversion_sources",
+                f"{account_id}/conversion_datasets",
+                f"{account_id}/pixels"
             ]
             
-            for url in endpoints:
-                try:
-                    params = {
-                        'access_token': Config.META_ACCESS_TOKEN,
-                        'fields': 'id,name,description'
+            def fetch(path):
+                data = self.transport.get(path, {'fields': 'id,name,description'}, account_id=account_id)
+                return [
+                    {
+                        'id': dataset['id'],
+                        'name': dataset.get('name', 'Unknown'),
+                        'description': dataset.get('description', '')
                     }
-                    
-                    response = requests.get(url, params=params)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    datasets = []
-                    for dataset in data.get('data', []):
-                        dataset_info = {
-                            'id': dataset['id'],
-                            'name': dataset.get('name', 'Unknown'),
-                            'description': dataset.get('description', '')
-                        }
-                        datasets.append(dataset_info)
-                    
-                    if datasets:
-                        logger.info(f"{len(datasets)}個のデータセットを取得しました")
-                        return datasets
-                        
-                except Exception as e:
-                    logger.warning(f"エンドポイント {url} でエラー: {e}")
-                    continue
+                    for dataset in data.get('data', [])
+                ]
             
-            # すべてのエンドポイントが失敗した場合
-            logger.warning("すべてのデータセット取得エンドポイントが失敗しました")
-            return []
+            datasets = self.router.fetch(f"{self.token_fingerprint}:datasets:{account_id}", endpoints, fetch)
+            logger.info(f"{len(datasets)}個のデータセットを取得しました")
+            return datasets
             
         except Exception as e:
             logger.error(f"データセット取得エラー: {e}")
             return []
     
-    def get_facebook_pages(self):
+    def fetch_facebook_pages(self):
         """Facebookページ一覧を取得"""
         try:
-            import requests
-            
-            # 複数のエンドポイントを試行
+            # 複数のエンドポイント候補（トークンごとに成功したものを学習）
             endpoints = [
-                "https://graph.facebook.com/v19.0/me/accounts",
-                "https://graph.facebook.com/v19.0/me/pages",
-                f"https://graph.facebook.com/v19.0/{Config.BUSINESS_MANAGER_ID}/owned_pages"
+                "me/accounts",
+                "me/pages",
+                f"{Config.BUSINESS_MANAGER_ID}/owned_pages"
             ]
             
-            for url in endpoints:
-                try:
-                    params = {
-                        'access_token': Config.META_ACCESS_TOKEN,
-                        'fields': 'id,name,category'
+            def fetch(path):
+                params = {'fields': 'id,name,category'}
+                
+                # 特定のエンドポイント用のパラメータ
+                if path == 'me/accounts':
+                    params['type'] = 'page'
+                
+                data = self.transport.get(path, params)
+                return [
+                    {
+                        'id': page['id'],
+                        'name': page.get('name', 'Unknown'),
+                        'category': page.get('category', '')
                     }
-                    
-                    # 特定のエンドポイント用のパラメータ
-                    if 'me/accounts' in url:
-                        params['type'] = 'page'
-                    elif 'owned_pages' in url:
-                        params['access_token'] = Config.META_ACCESS_TOKEN
-                    
-                    response = requests.get(url, params=params)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    pages = []
-                    for page in data.get('data', []):
-                        page_info = {
-                            'id': page['id'],
-                            'name': page.get('name', 'Unknown'),
-                            'category': page.get('category', '')
-                        }
-                        pages.append(page_info)
-                    
-                    if pages:
-                        logger.info(f"{len(pages)}個のFacebookページを取得しました")
-                        return pages
-                        
-                except Exception as e:
-                    logger.warning(f"エンドポイント {url} でエラー: {e}")
-                    continue
+                    for page in data.get('data', [])
+                ]
             
-            # すべてのエンドポイントが失敗した場合
-            logger.warning("すべてのFacebookページ取得エンドポイントが失敗しました")
-            return []
+            pages = self.router.fetch(f"{self.token_fingerprint}:pages", endpoints, fetch)
+            logger.info(f"{len(pages)}個のFacebookページを取得しました")
+            return pages
             
         except Exception as e:
             logger.error(f"Facebookページ取得エラー: {e}")
             return []
     
+    def _build_campaign_params(self, campaign_name, budget_amount, budget_type='daily'):
+        """キャンペーン作成パラメータを構築（売上目的固定）"""
+        campaign_data = {
+            'name': campaign_name,
+            'objective': 'OUTCOME_SALES',  # 売上固定
+            'status': Config.DEFAULT_AD_STATUS,
+            'special_ad_categories': [],  # 特別な広告カテゴリなし
+            'buying_type': 'AUCTION',  # オークション固定
+            'bid_strategy': 'LOWEST_COST_WITHOUT_CAP'  # 最大数量または最高金額固定
+        }
+        
+        # 予算設定
+        if budget_type == 'daily':
+            campaign_data['daily_budget'] = int(budget_amount * 100)  # セント単位
+        else:
+            campaign_data['lifetime_budget'] = int(budget_amount * 100)  # セント単位
+        
+        return campaign_data
+    
+    def _build_ad_set_params(self, campaign_id, ad_set_name, start_time, end_time=None, dataset_id=None, targeting=None,
+                             dynamic_creative=False):
+        """広告セット作成パラメータを構築（固定設定多数）
+        
+        targeting（IDに変換済みのもの）を省略した場合は日本全体を配信地域とする。
+        dynamic_creative=True の場合はダイナミッククリエイティブ用の広告セットにする。
+        """
+        # 固定設定（キャンペーンで予算を設定しているため、広告セットでは予算を設定しない）
+        ad_set_data = {
+            'name': ad_set_name,
+            'campaign_id': campaign_id,
+            'start_time': start_time,
+            'status': Config.DEFAULT_AD_STATUS,
+            'billing_event': 'IMPRESSIONS',  # 固定
+            'optimization_goal': 'OFFSITE_CONVERSIONS',  # オフサイトコンバージョン固定
+            'attribution_spec': [{'event_type': 'CLICK_THROUGH', 'window_days': 7}],  # クリックスルー固定
+            'targeting': targeting or {
+                'geo_locations': {
+                    'countries': ['JP']  # 日本（テンプレートでの指定がない場合）
+                }
+            },
+            # Advantage+配置はフィールドが存在しないため未設定（ダイナミッククリエイティブは下で指定）
+            'bid_strategy': 'LOWEST_COST_WITHOUT_CAP'  # 最大数量または最高金額固定
+        }
+        
+        # 終了日時が設定されている場合のみ追加
+        if end_time:
+            ad_set_data['end_time'] = end_time
+        
+        if dynamic_creative:
+            ad_set_data['is_dynamic_creative'] = True
+        
+        # データセット指定（conversion_specsフィールドが存在しないため現状は未使用）
+        
+        return ad_set_data
+    
+    def _build_ad_creative_params(self, account_id, ad_creative_name, headline, description, url, video_id=None, page_id=None):
+        """広告クリエイティブ作成パラメータを構築（固定設定多数）"""
+        creative_data = {
+            'name': ad_creative_name,
+            'title': headline,
+            'body': description,
+            'object_url': url,
+            'call_to_action_type': 'LEARN_MORE',  # コールトゥアクション固定（詳しくはこちら）
+            'link_type': 'WEBSITE',  # ウェブサイト固定
+            'display_url': url,  # ディスプレイリンク（ウェブサイトのURLと同じ）
+            'multi_share_optimized': True,  # 複数広告主の広告オン固定
+            'creative_type': 'VIDEO' if video_id else 'IMAGE',  # 動画または画像固定
+            'source_type': 'MANUAL_UPLOAD'  # 手動アップロード固定
+        }
+        
+        # Facebookページが指定されている場合
+        if page_id:
+            creative_data['page_id'] = page_id
+        
+        # 動画がある場合は追加
+        if video_id:
+            creative_data['object_story_spec'] = {
+                'page_id': page_id or account_id,
+                'video_data': {
+                    'video_id': video_id,
+                    'title': headline,
+                    'description': description,
+                    'call_to_action': {
+                        'type': 'LEARN_MORE',
+                        'value': {
+                            'link': url
+                        }
+                    }
+                }
+            }
+        
+        return creative_data
+    
+    def _build_dynamic_creative_params(self, account_id, ad_creative_name, variants, page_id=None):
+        """ダイナミッククリエイティブ（asset_feed_spec）の作成パラメータを構築
+        
+        variants の見出し・説明文・URL・動画の組み合わせを、1つのクリエイティブ内で Meta が配信しながら最適化する。
+        """
+        video_ids = variants.get('video_ids') or []
+        asset_feed_spec = {
+            'titles': [{'text': headline} for headline in variants['headlines']],
+            'bodies': [{'text': description} for description in variants['descriptions']],
+            'link_urls': [{'website_url': url, 'display_url': url} for url in variants['urls']],
+            'call_to_action_types': ['LEARN_MORE'],  # コールトゥアクション固定（詳しくはこちら）
+            'ad_formats': ['SINGLE_VIDEO' if video_ids else 'SINGLE_IMAGE']
+        }
+        if video_ids:
+            asset_feed_spec['videos'] = [{'video_id': video_id} for video_id in video_ids]
+        
+        return {
+            'name': ad_creative_name,
+            'object_story_spec': {'page_id': page_id or account_id},
+            'asset_feed_spec': asset_feed_spec
+        }
+    
+    def _chain_variants(self, spec):
+        """チェーン仕様のバリエーション（ダイナミッククリエイティブでなければ None）
+        
+        spec['variants'] で省略したリストは、spec の見出し・説明文・URL・動画の1件で補う。
+        """
+        variants = spec.get('variants')
+        if not variants:
+            return None
+        
+        def values(key, fallback):
+            items = [item for item in (variants.get(key) or []) if item]
+            if not items and fallback:
+                items = [fallback]
+            return list(dict.fromkeys(items))
+        
+        return {
+            'headlines': values('headlines', spec.get('headline')),
+            'descriptions': values('descriptions', spec.get('description')),
+            'urls': values('urls', spec.get('url')),
+            'video_ids': values('video_ids', spec.get('video_id'))
+        }
+    
+    def _chain_ads(self, spec):
+        """チェーンで作成する広告ごとの (ステップ名の接尾辞, 広告の spec) の一覧
+        
+        1件目は creative / ad、2件目以降は creative_2 / ad_2 ... として作成する。
+        """
+        campaign_name = spec['campaign_name']
+        base = {key: value for key, value in spec.items() if key != 'ads'}
+        entries = spec.get('ads') or [{}]
+        
+        ads = []
+        for number, entry in enumerate(entries, 1):
+            ad_spec = dict(base, **{key: value for key, value in entry.items() if value is not None})
+            if number == 1:
+                ad_spec['creative_name'] = entry.get('creative_name') or spec.get('creative_name') or f"{campaign_name}_Creative"
+                ad_spec['ad_name'] = entry.get('ad_name') or spec.get('ad_name') or f"{campaign_name}_1"
+                ads.append(('', ad_spec))
+            else:
+                ad_spec['creative_name'] = entry.get('creative_name') or f"{campaign_name}_Creative_{number}"
+                ad_spec['ad_name'] = entry.get('ad_name') or f"{campaign_name}_{number}"
+                ads.append((f"_{number}", ad_spec))
+        return ads
+    
+    def _chain_creative_params(self, spec):
+        """チェーン仕様からクリエイティブの作成パラメータを構築（バリエーションがあればダイナミッククリエイティブ）"""
+        campaign_name = spec['campaign_name']
+        creative_name = spec.get('creative_name') or f"{campaign_name}_Creative"
+        variants = self._chain_variants(spec)
+        if variants:
+            return self._build_dynamic_creative_params(spec['account_id'], creative_name, variants, spec.get('page_id'))
+        
+        return self._build_ad_creative_params(
+            spec['account_id'],
+            creative_name,
+            spec['headline'],
+            spec['description'],
+            spec['url'],
+            spec.get('video_id'),
+            spec.get('page_id')
+        )
+    
+    def _build_ad_params(self, ad_set_id, creative_id, ad_name):
+        """広告作成パラメータを構築"""
+        return {
+            'name': ad_name,
+            'adset_id': ad_set_id,
+            'creative': {'creative_id': creative_id},
+            'status': Config.DEFAULT_AD_STATUS
+        }
+    
     def create_campaign(self, account_id, campaign_name, budget_amount, budget_type='daily'):
         """キャンペーンを作成（売上目的固定）"""
+        from facebook_business.exceptions import FacebookRequestError
+        
+        self._ensure_new_campaign_name(account_id, campaign_name)
         try:
-            account = AdAccount(account_id)
-            
-            # 固定設定
-            campaign_data = {
-                Campaign.Field.name: campaign_name,
-                Campaign.Field.objective: 'OUTCOME_SALES',  # 売上固定
-                Campaign.Field.status: Config.DEFAULT_AD_STATUS,
-                Campaign.Field.special_ad_categories: [],  # 特別な広告カテゴリなし
-                Campaign.Field.buying_type: 'AUCTION',  # オークション固定
-                Campaign.Field.bid_strategy: 'LOWEST_COST_WITHOUT_CAP'  # 最大数量または最高金額固定
-            }
+            account = self._ad_account(account_id)
+            campaign_data = self._build_campaign_params(campaign_name, budget_amount, budget_type)
             
-            # 予算設定
-            if budget_type == 'daily':
-                campaign_data[Campaign.Field.daily_budget] = budget_amount * 100  # セント単位
-            else:
-                campaign_data[Campaign.Field.lifetime_budget] = budget_amount * 100  # セント単位
-            
-            campaign = account.create_campaign(params=campaign_data)
+            # レート制限で拒否された場合だけ再試行する（作成済みの可能性があるエラーは重複を避けて再試行しない）
+            campaign = self._sdk_create(
+                account_id, 'campaign', 'キャンペーン作成', lambda: account.create_campaign(params=campaign_data)
+            )
+            self.name_index.reserve(account_id, campaign_name)
             logger.info(f"キャンペーン作成成功: {campaign['id']} - {campaign_name} (予算: {budget_amount}円)")
             
             return {
@@ -229,52 +503,20 @@ class MetaAdsClient:
             logger.error(f"キャンペーン作成エラー: {e}")
             raise
     
-    def create_ad_set(self, account_id, campaign_id, ad_set_name, budget, start_time, end_time=None, dataset_id=None):
-        """広告セットを作成（固定設定多数）"""
+    def create_ad_set(self, account_id, campaign_id, ad_set_name, budget, start_time, end_time=None, dataset_id=None,
+                      targeting=None):
+        """広告セットを作成（固定設定多数。targeting には興味・関心などを名前で書ける）"""
+        from facebook_business.exceptions import FacebookRequestError
+        
         try:
-            account = AdAccount(account_id)
-            
-            # 固定設定（キャンペーンで予算を設定しているため、広告セットでは予算を設定しない）
-            ad_set_data = {
-                AdSet.Field.name: ad_set_name,
-                AdSet.Field.campaign_id: campaign_id,
-                # AdSet.Field.daily_budget: budget * 100,  # キャンペーンで予算を設定しているため削除
-                AdSet.Field.start_time: start_time,
-                AdSet.Field.status: Config.DEFAULT_AD_STATUS,
-                AdSet.Field.billing_event: 'IMPRESSIONS',  # 固定
-                AdSet.Field.optimization_goal: 'OFFSITE_CONVERSIONS',  # オフサイトコンバージョン固定
-                AdSet.Field.attribution_spec: [{'event_type': 'CLICK_THROUGH', 'window_days': 7}],  # クリックスルー固定
-                AdSet.Field.targeting: {
-                    'geo_locations': {
-                        'countries': ['JP']  # 日本固定
-                    }
-                },
-                # AdSet.Field.placement: ['facebook', 'instagram', 'messenger', 'audience_network'],  # Advantage+配置オン固定（フィールドが存在しないためコメントアウト）
-                # AdSet.Field.dynamic_creative: False,  # ダイナミッククリエイティブオフ固定（フィールドが存在しないためコメントアウト）
-                AdSet.Field.bid_strategy: 'LOWEST_COST_WITHOUT_CAP'  # 最大数量または最高金額固定
-            }
+            account = self._ad_account(account_id)
+            ad_set_data = self._build_ad_set_params(
+                campaign_id, ad_set_name, start_time, end_time, dataset_id, self.targeting_resolver.resolve(targeting)
+            )
             
-            # 終了日時が設定されている場合のみ追加
-            if end_time:
-                ad_set_data[AdSet.Field.end_time] = end_time
-            
-            # データセットが指定されている場合のみ追加
-            if dataset_id:
-                # conversion_specsフィールドが存在しないためコメントアウト
-                # ad_set_data[AdSet.Field.conversion_specs] = [{
-                #     'conversion_type': 'WEBSITE',
-                #     'conversion_dataset_id': dataset_id
-                # }]
-                pass
-            else:
-                # デフォルトのウェブサイトコンバージョン
-                # conversion_specsフィールドが存在しないためコメントアウト
-                # ad_set_data[AdSet.Field.conversion_specs] = [{
-                #     'conversion_type': 'WEBSITE'
-                # }]
-                pass
-            
-            ad_set = account.create_ad_set(params=ad_set_data)
+            ad_set = self._sdk_create(
+                account_id, 'ad_set', '広告セット作成', lambda: account.create_ad_set(params=ad_set_data)
+            )
             logger.info(f"広告セット作成成功: {ad_set['id']} - {ad_set_name}")
             
             return {
@@ -284,55 +526,37 @@ class MetaAdsClient:
                 'budget': budget
             }
             
-        except FacebookRequestError as e:
+        except (FacebookRequestError, TargetingResolutionError) as e:
             logger.error(f"広告セット作成エラー: {e}")
             raise
     
     def create_ad_creative(self, account_id, ad_creative_name, headline, description, url, video_id=None, page_id=None):
         """広告クリエイティブを作成（固定設定多数）"""
+        from facebook_business.exceptions import FacebookRequestError
+        
         try:
-            account = AdAccount(account_id)
-            
-            # 固定設定
-            creative_data = {
-                AdCreative.Field.name: ad_creative_name,
-                AdCreative.Field.title: headline,
-                AdCreative.Field.body: description,
-                AdCreative.Field.object_url: url,
-                AdCreative.Field.call_to_action_type: 'LEARN_MORE',  # コールトゥアクション固定（詳しくはこちら）
-                AdCreative.Field.link_type: 'WEBSITE',  # ウェブサイト固定
-                AdCreative.Field.display_url: url,  # ディスプレイリンク（ウェブサイトのURLと同じ）
-                AdCreative.Field.multi_share_optimized: True,  # 複数広告主の広告オン固定
-                AdCreative.Field.creative_type: 'VIDEO' if video_id else 'IMAGE',  # 動画または画像固定
-                AdCreative.Field.source_type: 'MANUAL_UPLOAD'  # 手動アップロード固定
-            }
+            account = self._ad_account(account_id)
+            creative_data = self._build_ad_creative_params(
+                account_id, ad_creative_name, headline, description, url, video_id, page_id
+            )
             
-            # Facebookページが指定されている場合
-            if page_id:
-                creative_data[AdCreative.Field.page_id] = page_id
-            
-            # 動画がある場合は追加
-            if video_id:
-                creative_data[AdCreative.Field.object_story_spec] = {
-                    'page_id': page_id or account_id,
-                    'video_data': {
-                        'video_id': video_id,
-                        'title': headline,
-                        'description': description,
-                        'call_to_action': {
-                            'type': 'LEARN_MORE',
-                            'value': {
-                                'link': url
-                            }
-                        }
-                    }
-                }
-            
-            creative = account.create_ad_creative(params=creative_data)
-            logger.info(f"広告クリエイティブ作成成功: {creative['id']} - {ad_creative_name}")
+            # 同じ内容のクリエイティブが作成済みならそれを再利用する
+            key = creative_key(account_id, creative_data)
+            with self.creative_cache.lock_for(key):
+                creative_id = self._cached_creative(account_id, key)
+                if creative_id:
+                    logger.info(f"作成済みの広告クリエイティブを再利用: {creative_id} - {ad_creative_name}")
+                else:
+                    creative = self._sdk_create(
+                        account_id, 'creative', '広告クリエイティブ作成',
+                        lambda: account.create_ad_creative(params=creative_data)
+                    )
+                    creative_id = creative['id']
+                    self.creative_cache.put(key, creative_id, account_id)
+                    logger.info(f"広告クリエイティブ作成成功: {creative_id} - {ad_creative_name}")
             
             return {
-                'id': creative['id'],
+                'id': creative_id,
                 'name': ad_creative_name,
                 'headline': headline,
                 'description': description,
@@ -345,17 +569,15 @@ class MetaAdsClient:
     
     def create_ad(self, account_id, ad_set_id, creative_id, ad_name):
         """広告を作成"""
+        from facebook_business.exceptions import FacebookRequestError
+        
         try:
-            account = AdAccount(account_id)
+            account = self._ad_account(account_id)
+            ad_data = self._build_ad_params(ad_set_id, creative_id, ad_name)
             
-            ad_data = {
-                Ad.Field.name: ad_name,
-                Ad.Field.adset_id: ad_set_id,
-                Ad.Field.creative: {'creative_id': creative_id},
-                Ad.Field.status: Config.DEFAULT_AD_STATUS
-            }
-            
-            ad = account.create_ad(params=ad_data)
+            ad = self._sdk_create(
+                account_id, 'ad', '広告作成', lambda: account.create_ad(params=ad_data)
+            )
             logger.info(f"広告作成成功: {ad['id']} - {ad_name}")
             
             return {
@@ -369,3 +591,751 @@ class MetaAdsClient:
         except FacebookRequestError as e:
             logger.error(f"広告作成エラー: {e}")
             raise
+    
+    def _sdk_create(self, account_id, step, description, create):
+        """SDK での作成を、サーキットブレーカーと再試行ポリシーを通して実行
+        
+        個別作成は書き込み台帳と名前での照合を通らないため、一時的なエラー・通信エラーでは
+        作成済みの可能性があり再試行しない。処理前に拒否されるレート制限だけ待って再試行する。
+        """
+        endpoint = STEP_ENDPOINTS[step]
+        if not self.circuit_breaker.allow(account_id, endpoint):
+            raise CircuitOpenError(self._circuit_message(account_id, endpoint), account_id, endpoint)
+        
+        try:
+            result = self.retry_policy.call(create, account_id, description, retry_kinds=(THROTTLED,))
+        except Exception as e:
+            code = e.api_error_code() if hasattr(e, 'api_error_code') else getattr(e, 'code', None)
+            if counts_as_failure(classify_exception(e), code):
+                self.circuit_breaker.record_failure(account_id, endpoint, str(e))
+            else:
+                self.circuit_breaker.release(account_id, endpoint)
+            raise
+        
+        self.circuit_breaker.record_success(account_id, endpoint)
+        return result
+    
+    def _circuit_message(self, account_id, endpoint):
+        """ブレーカーで送信を止めたときのエラーメッセージ"""
+        reason = self.circuit_breaker.reason(account_id, endpoint)
+        message = f"{account_id} の {endpoint} への送信は、連続したエラーのため一時停止中です"
+        return f"{message}（原因: {reason}）" if reason else message
+    
+    def circuit_blocked_reason(self, account_id, steps=None):
+        """ブレーカーで送信を止めているステップがあればその理由を返す（なければ None）
+        
+        試行枠を使わないため、動画転送など作成前の重い処理を省く判断に使う。
+        """
+        for step in steps or STEP_ENDPOINTS:
+            endpoint = STEP_ENDPOINTS[step]
+            if self.circuit_breaker.is_open(account_id, endpoint):
+                return self._circuit_message(account_id, endpoint)
+        return None
+    
+    def launch_chain(self, chain_spec):
+        """キャンペーン→広告セット→クリエイティブ→広告を1回のバッチリクエストで作成
+        
+        chain_spec のキー:
+            account_id, campaign_name, budget_amount, budget_type, start_time, end_time,
+            headline, description, url, video_id, page_id, dataset_id,
+            ad_set_name / creative_name / ad_name（省略時はキャンペーン名から生成）
+            existing_ids（任意）: 作成済みステップのID。途中から再開する場合に指定
+            variants（任意）: 見出し・説明文・URL・動画のリスト。指定するとダイナミッククリエイティブで作成
+            ads（任意）: 広告ごとの headline, description, url, video_id, creative_name, ad_name のリスト。
+                指定すると同じ広告セットにクリエイティブと広告を複数作成する（省略した項目は chain_spec の値）
+        
+        2件目以降の広告は結果・existing_ids で creative_2 / ad_2 ... のステップ名になる。        
+        途中のステップで失敗した場合は作成済みIDを持つ ChainLaunchError を送出する。
+        """
+        result = self.launch_chains([chain_spec])[0]
+        if isinstance(result, ChainLaunchError):
+            raise result
+        return result
+    
+    def launch_dynamic_chain(self, chain_spec, variants):
+        """見出し・説明文・URL・動画のバリエーションを1つのダイナミッククリエイティブにまとめて作成
+        
+        variants のキー: headlines, descriptions, urls, video_ids（いずれも省略時は chain_spec の1件を使う）
+        組み合わせの数に関わらず、キャンペーン・広告セット・クリエイティブ・広告の4件の作成で済み、
+        配信の学習も1つの広告セットに集まる。
+        """
+        return self.launch_chain(dict(chain_spec, variants=variants))
+    
+    def launch_chains(self, chain_specs, validated=False):
+        """複数チェーンを最大50オペレーション単位のバッチにまとめて作成
+        
+        戻り値は chain_specs と同じ順序のリストで、各要素は成功時は作成結果の辞書、
+        失敗時は ChainLaunchError。
+        同じ内容のクリエイティブが作成済みの場合は、新規作成せずそのIDを再利用する。
+        入力誤りのあるチェーン、アカウント内に同じ名前のキャンペーンがある
+        （または同じ呼び出し内で重複する）チェーンは API を呼ばずに失敗とする。
+        validated=True の場合は、呼び出し側で validate_specs 済みとして入力検査を省く。
+        """
+        results = [None] * len(chain_specs)
+        chain_specs = list(chain_specs)
+        
+        # 途中のステップで止まらないよう、全ステップの入力を送信前に検査する
+        for index, errors in ({} if validated else validate_specs(chain_specs)).items():
+            message = ' / '.join(error['message'] for error in errors)
+            logger.error(f"入力エラーのため作成しません ({chain_specs[index].get('campaign_name')}): {message}")
+            results[index] = ChainLaunchError(
+                f"入力エラー: {message}",
+                created=dict(chain_specs[index].get('existing_ids') or {}),
+                error={'fields': [error['field'] for error in errors]}
+            )
+        
+        # ターゲティングの名前は全チェーン分をまとめて検索してからIDに変換する
+        for index, message in self.resolve_targeting(chain_specs).items():
+            if results[index] is None:
+                logger.error(f"ターゲティングを変換できないため作成しません ({chain_specs[index]['campaign_name']}): {message}")
+                results[index] = ChainLaunchError(
+                    message, step='ad_set', created=dict(chain_specs[index].get('existing_ids') or {})
+                )
+        for index, spec in enumerate(chain_specs):
+            if results[index] is None and spec.get('targeting') and not (spec.get('existing_ids') or {}).get('ad_set'):
+                chain_specs[index] = dict(spec, targeting=self.targeting_resolver.resolve(spec['targeting']))
+        
+        # 前回送信したまま結果を確認できなかったチェーンは、作成済みのものを名前で照合して引き継ぐ
+        for index, spec in enumerate(chain_specs):
+            if results[index] is None and self._has_pending_write(spec):
+                chain_specs[index] = self._reconcile_chain(spec)
+        
+        reserved = []
+        for index, spec in enumerate(chain_specs):
+            if results[index] is not None or (spec.get('existing_ids') or {}).get('campaign'):
+                continue
+            self._warm_name_index(spec['account_id'])
+            if self.name_index.reserve(spec['account_id'], spec['campaign_name']):
+                reserved.append(index)
+            else:
+                logger.error(f"同名のキャンペーンが既に存在するため作成しません: {spec['campaign_name']}")
+                results[index] = ChainLaunchError(
+                    f"同じ名前のキャンペーンが既に存在します: {spec['campaign_name']}", step='campaign'
+                )
+        
+        pending = [index for index, result in enumerate(results) if result is None]
+        for index, result in zip(pending, self._launch_chains([chain_specs[index] for index in pending])):
+            results[index] = result
+        
+        # キャンペーンを作成できなかった名前は予約を取り消す
+        for index in reserved:
+            if isinstance(results[index], ChainLaunchError) and not results[index].created.get('campaign'):
+                self.name_index.release(chain_specs[index]['account_id'], chain_specs[index]['campaign_name'])
+        
+        return results
+    
+    def resolve_targeting(self, chain_specs):
+        """全チェーンのターゲティングの名前を重複なしで並列に検索し、変換できない行のエラーを返す
+        
+        戻り値は {chain_specs のインデックス: エラーメッセージ}。検索結果はキャッシュされるため、
+        一括出稿の前に呼んでおけば各行の作成時には検索しない。
+        """
+        names = {
+            index: targeting_names(spec.get('targeting'))
+            for index, spec in enumerate(chain_specs)
+            if spec.get('targeting') and not (spec.get('existing_ids') or {}).get('ad_set')
+        }
+        resolved = self.targeting_resolver.resolve_names(name for row in names.values() for name in row)
+        
+        errors = {}
+        for index, row in names.items():
+            missing = [name for search_type, name in row if resolved.get((search_type, name)) is None]
+            if missing:
+                errors[index] = f"ターゲティングの名前が見つかりません: {', '.join(missing)}"
+        return errors
+    
+    def check_campaign_name(self, account_id, campaign_name):
+        """同じ名前のキャンペーンがアカウントにあれば ChainLaunchError を送出（動画転送などの前の確認用）
+        
+        前回送信したまま結果を確認できなかった名前は、作成時に作成済みのものを照合して引き継ぐため確認しない。
+        """
+        if self.write_ledger.has_pending_campaign(account_id, campaign_name):
+            logger.info(f"結果を確認できていない前回の送信があるため、作成時に照合します: {campaign_name}")
+            return
+        self._ensure_new_campaign_name(account_id, campaign_name)
+    
+    def _ensure_new_campaign_name(self, account_id, campaign_name):
+        """同じ名前のキャンペーンがアカウントにあれば ChainLaunchError を送出"""
+        self._warm_name_index(account_id)
+        if self.name_index.contains(account_id, campaign_name):
+            raise ChainLaunchError(f"同じ名前のキャンペーンが既に存在します: {campaign_name}", step='campaign')
+    
+    def find_duplicate_names(self, chain_specs):
+        """アカウント内の既存キャンペーン、またはリスト内の前の行と名前が重複する行の番号を返す
+        
+        前回送信したまま結果を確認できなかった行は、作成時に照合して引き継ぐためアカウント内の名前とは比べない。
+        """
+        duplicates = []
+        seen = set()
+        for index, spec in enumerate(chain_specs):
+            if (spec.get('existing_ids') or {}).get('campaign'):
+                continue
+            key = (spec['account_id'], spec['campaign_name'].strip())
+            if key in seen:
+                duplicates.append(index)
+            elif not self._has_pending_write(spec):
+                self._warm_name_index(spec['account_id'])
+                if self.name_index.contains(spec['account_id'], spec['campaign_name']):
+                    duplicates.append(index)
+            seen.add(key)
+        return duplicates
+    
+    def _has_pending_write(self, spec):
+        """前回送信したまま結果を確認できていないチェーンか（動画転送前の spec でもキャンペーン名で判定）"""
+        return (self.write_ledger.is_pending(WriteLedger.key_for(spec))
+                or self.write_ledger.has_pending_campaign(spec['account_id'], spec['campaign_name']))
+    
+    def _warm_name_index(self, account_id):
+        """キャンペーン名インデックスを名前のみの一覧取得で構築（構築済みなら何もしない）
+        
+        取得に失敗した場合は、このプロセスで作成・予約した名前だけで確認を続ける。
+        """
+        try:
+            self.name_index.warm(account_id, lambda: [
+                item.get('name') for item in self.transport.get_paged(
+                    f"{account_id}/campaigns", {'fields': 'name', 'limit': 500}, account_id=account_id
+                )
+            ])
+        except Exception as e:
+            logger.warning(f"キャンペーン名一覧の取得エラー ({account_id}): {e}")
+    
+    def _launch_chains(self, chain_specs):
+        """名前の確認を終えたチェーンを、クリエイティブを再利用しながら作成
+        
+        2件目以降の広告のクリエイティブ（creative_2 ...）も内容ごとに再利用・キャッシュする。
+        """
+        results = [None] * len(chain_specs)
+        specs = list(chain_specs)
+        
+        # 未作成のクリエイティブの内容キー（同じキーのクリエイティブは同時に作成しない）
+        keys = {}  # (チェーンのインデックス, クリエイティブのステップ) -> キー
+        for index, spec in enumerate(specs):
+            for step, key in self._creative_cache_keys(spec).items():
+                keys[(index, step)] = key
+        
+        locks = [self.creative_cache.lock_for(key) for key in sorted(set(keys.values()))]
+        for lock in locks:
+            lock.acquire()
+        
+        deferred = set()
+        try:
+            claimed = {}  # キー -> 作成する (インデックス, ステップ)
+            for (index, step), key in keys.items():
+                creative_id = self._cached_creative(specs[index]['account_id'], key)
+                if creative_id:
+                    logger.info(f"作成済みの広告クリエイティブを再利用: {creative_id} - {specs[index]['campaign_name']} ({step})")
+                    existing_ids = dict(specs[index].get('existing_ids') or {})
+                    existing_ids[step] = creative_id
+                    specs[index] = dict(specs[index], existing_ids=existing_ids)
+                elif key in claimed and claimed[key][0] != index:
+                    # 同じ呼び出し内の重複は、最初のチェーンで作成したクリエイティブを後で再利用する
+                    deferred.add(index)
+                else:
+                    claimed.setdefault(key, (index, step))
+            
+            self._launch_chain_batches(specs, results, skip=deferred)
+            
+            for key, (index, step) in claimed.items():
+                if index in deferred:
+                    continue
+                result = results[index]
+                created = result.created if isinstance(result, ChainLaunchError) else {
+                    result_step: item['id'] for result_step, item in result.items()
+                }
+                if created.get(step):
+                    self.creative_cache.put(key, created[step], specs[index]['account_id'])
+        finally:
+            for lock in locks:
+                lock.release()
+        
+        if deferred:
+            deferred = sorted(deferred)
+            for index, result in zip(deferred, self._launch_chains([chain_specs[index] for index in deferred])):
+                results[index] = result
+        
+        return results
+    
+    def _launch_chain_batches(self, chain_specs, results, skip=()):
+        """チェーンをバッチに詰めて実行し、results に結果を格納
+        
+        一時的なエラー・レート制限で失敗したチェーンは、待機後に作成済みのステップを
+        名前で照合してから残りのステップだけを再送する。
+        """
+        pending = [index for index in range(len(chain_specs)) if index not in skip]
+        attempt = 0
+        while pending:
+            self._run_chain_batches(chain_specs, results, pending)
+            
+            retry = [
+                index for index in pending
+                if isinstance(results[index], ChainLaunchError)
+                and self.retry_policy.should_retry(results[index].kind, attempt)
+            ]
+            if not retry:
+                return
+            
+            throttled = [index for index in retry if results[index].kind == THROTTLED]
+            if throttled:
+                self.retry_policy.wait(THROTTLED, attempt, chain_specs[throttled[0]]['account_id'])
+            else:
+                self.retry_policy.wait(RETRYABLE, attempt)
+            
+            for index in retry:
+                spec = chain_specs[index]
+                existing_ids = dict(spec.get('existing_ids') or {})
+                existing_ids.update(results[index].created)
+                chain_specs[index] = self._reconcile_chain(dict(spec, existing_ids=existing_ids))
+            pending = retry
+            attempt += 1
+    
+    def _reconcile_chain(self, spec):
+        """名前で作成済みのオブジェクトを探し、existing_ids に反映した spec を返す
+        
+        送信したが結果が分からない書き込みを再送する前に呼び、重複作成を防ぐ。
+        照合に失敗した場合は existing_ids をそのまま使う。
+        """
+        account_id = spec['account_id']
+        campaign_name = spec['campaign_name']
+        existing_ids = dict(spec.get('existing_ids') or {})
+        
+        def find(path, name, fields='id,name'):
+            params = {
+                'fields': fields,
+                'limit': 100,
+                'filtering': json.dumps([{'field': 'name', 'operator': 'EQUAL', 'value': name}])
+            }
+            for item in self.transport.get_paged(path, params, account_id=account_id):
+                if item.get('name') == name:
+                    return item
+            return None
+        
+        try:
+            if not existing_ids.get('campaign'):
+                campaign = find(f"{account_id}/campaigns", campaign_name)
+                if campaign:
+                    existing_ids['campaign'] = campaign['id']
+            
+            if existing_ids.get('campaign') and not existing_ids.get('ad_set'):
+                ad_set = find(f"{existing_ids['campaign']}/adsets", spec.get('ad_set_name') or campaign_name)
+                if ad_set:
+                    existing_ids['ad_set'] = ad_set['id']
+            
+            for suffix, ad_spec in self._chain_ads(spec):
+                creative_step, ad_step = f"creative{suffix}", f"ad{suffix}"
+                if existing_ids.get('ad_set') and not existing_ids.get(ad_step):
+                    ad = find(f"{existing_ids['ad_set']}/ads", ad_spec['ad_name'], 'id,name,creative{id}')
+                    if ad:
+                        existing_ids[ad_step] = ad['id']
+                        existing_ids.setdefault(creative_step, (ad.get('creative') or {}).get('id'))
+                
+                if not existing_ids.get(creative_step):
+                    creative = find(f"{account_id}/adcreatives", ad_spec['creative_name'])
+                    if creative:
+                        existing_ids[creative_step] = creative['id']
+        except Exception as e:
+            logger.warning(f"作成済みオブジェクトの照合エラー ({campaign_name}): {e}")
+        
+        adopted = {step: object_id for step, object_id in existing_ids.items()
+                   if object_id and (spec.get('existing_ids') or {}).get(step) != object_id}
+        if adopted:
+            logger.info(f"作成済みのオブジェクトを引き継ぎます: {campaign_name} ({', '.join(adopted)})")
+        return dict(spec, existing_ids={step: object_id for step, object_id in existing_ids.items() if object_id})
+    
+    def _run_chain_batches(self, chain_specs, results, indices):
+        """指定したチェーンをバッチに詰めて1回ずつ実行"""
+        batch_ops = []
+        batch_chains = []  # (chain_specsのインデックス, [(step, op_name), ...])
+        
+        for index in indices:
+            spec = chain_specs[index]
+            chain_ops = self._build_chain_operations(spec, prefix=f"c{index}_")
+            if not chain_ops:
+                # すべてのステップが作成済み
+                results[index] = self._parse_chain_responses(spec, [], [])
+                continue
+            
+            # エラーが続いているアカウント・エンドポイントへは送信せずにすぐ失敗させる
+            blocked = self._acquire_circuits(spec, [step for step, _ in chain_ops])
+            if blocked:
+                logger.error(f"チェーン作成エラー ({spec['campaign_name']}): {blocked}")
+                results[index] = ChainLaunchError(
+                    blocked, step=chain_ops[0][0], created=dict(spec.get('existing_ids') or {}), kind=FATAL
+                )
+                continue
+            
+            # 依存関係の参照は同一バッチ内でしか解決できないため、チェーンは分割しない
+            if len(batch_ops) + len(chain_ops) > BATCH_MAX_OPERATIONS:
+                self._execute_chain_batch(chain_specs, batch_ops, batch_chains, results)
+                batch_ops, batch_chains = [], []
+            
+            batch_chains.append((index, [(step, op['name']) for step, op in chain_ops]))
+            batch_ops.extend(op for _, op in chain_ops)
+        
+        if batch_ops:
+            self._execute_chain_batch(chain_specs, batch_ops, batch_chains, results)
+    
+    def _acquire_circuits(self, spec, steps):
+        """チェーンの送信先エンドポイントごとに送信可否を確認し、止めていればその理由を返す
+        
+        複数広告のチェーンは同じエンドポイント（adcreatives, ads）に複数ステップを送るが、
+        半開きのブレーカーの試行枠は1件だけのため、エンドポイントごとに1回だけ確認する。
+        """
+        account_id = spec['account_id']
+        acquired = []
+        for endpoint in chain_endpoints(steps):
+            if not self.circuit_breaker.allow(account_id, endpoint):
+                for acquired_endpoint in acquired:
+                    self.circuit_breaker.release(account_id, acquired_endpoint)
+                return self._circuit_message(account_id, endpoint)
+            acquired.append(endpoint)
+        return None
+    
+    def _release_circuits(self, spec, steps):
+        """結果が判断に使えなかったチェーンの試行枠をエンドポイントごとに返す"""
+        for endpoint in chain_endpoints(steps):
+            self.circuit_breaker.release(spec['account_id'], endpoint)
+    
+    def _record_circuits(self, spec, steps, result):
+        """チェーンの結果をエンドポイントごとにブレーカーへ記録
+        
+        同じエンドポイントのステップのうち1件でも数えるべきエラーがあれば失敗、
+        なければ1件でも成功していれば成功として記録する。
+        """
+        account_id = spec['account_id']
+        failed = result.failed if isinstance(result, ChainLaunchError) else {}
+        outcomes = {endpoint: {'succeeded': False, 'reason': None} for endpoint in chain_endpoints(steps)}
+        for step in steps:
+            outcome = outcomes[STEP_ENDPOINTS[base_step(step)]]
+            if step not in failed:
+                outcome['succeeded'] = True
+                continue
+            
+            # 依存先の失敗で実行されなかったステップ（エラーコードなし）は判断に使えない
+            error = failed[step]
+            kind = classify(error.get('code'), None, error.get('is_transient', False))
+            if counts_as_failure(kind, error.get('code')) and outcome['reason'] is None:
+                outcome['reason'] = error.get('message') or str(result)
+        
+        for endpoint, outcome in outcomes.items():
+            if outcome['reason'] is not None:
+                self.circuit_breaker.record_failure(account_id, endpoint, outcome['reason'])
+            elif outcome['succeeded']:
+                self.circuit_breaker.record_success(account_id, endpoint)
+            else:
+                self.circuit_breaker.release(account_id, endpoint)
+    
+    def _creative_cache_keys(self, spec):
+        """チェーン仕様の未作成のクリエイティブごとに、内容から再利用キャッシュのキーを計算"""
+        existing_ids = spec.get('existing_ids') or {}
+        return {
+            f"creative{suffix}": creative_key(spec['account_id'], self._chain_creative_params(ad_spec))
+            for suffix, ad_spec in self._chain_ads(spec)
+            if not existing_ids.get(f"creative{suffix}")
+        }
+    
+    def _cached_creative(self, account_id, key):
+        """キャッシュ済みのクリエイティブがアカウント上で使用可能ならそのIDを返す"""
+        entry = self.creative_cache.get(key)
+        if not entry:
+            return None
+        
+        if time.time() - entry['verified_at'] < Config.CREATIVE_CACHE_VERIFY_TTL:
+            return entry['creative_id']
+        
+        # 一定時間確認していないものは、削除・別アカウントへの移動がないかアカウント上で確認する
+        try:
+            creative = self.transport.get(
+                entry['creative_id'], {'fields': 'id,account_id,status'}, account_id=account_id
+            )
+        except GraphAPIError as e:
+            logger.warning(f"キャッシュ済みクリエイティブの確認エラー ({entry['creative_id']}): {e}")
+            if e.http_status is not None and not e.is_transient:
+                self.creative_cache.forget(key)
+            return None
+        
+        expected_account = str(account_id)[4:] if str(account_id).startswith('act_') else str(account_id)
+        if str(creative.get('account_id')) != expected_account or creative.get('status') == 'DELETED':
+            logger.info(f"キャッシュ済みクリエイティブは使用できません: {entry['creative_id']}")
+            self.creative_cache.forget(key)
+            return None
+        
+        self.creative_cache.mark_verified(key)
+        return entry['creative_id']
+    
+    def _build_chain_operations(self, spec, prefix):
+        """1チェーン分のバッチオペレーションを構築
+        
+        spec['existing_ids'] に作成済みのステップがあれば、そのステップは送信せず既存IDを参照する。
+        """
+        account_id = spec['account_id']
+        campaign_name = spec['campaign_name']
+        existing_ids = spec.get('existing_ids') or {}
+        operations = []
+        
+        def ref(step):
+            if existing_ids.get(step):
+                return existing_ids[step]
+            return f"{{result={prefix}{step}:$.id}}"
+        
+        if not existing_ids.get('campaign'):
+            campaign_params = self._build_campaign_params(
+                campaign_name, spec['budget_amount'], spec.get('budget_type', 'daily')
+            )
+            operations.append(('campaign', self._batch_operation(
+                'POST', f"{account_id}/campaigns", campaign_params, f"{prefix}campaign"
+            )))
+        
+        if not existing_ids.get('ad_set'):
+            ad_set_params = self._build_ad_set_params(
+                ref('campaign'),
+                spec.get('ad_set_name') or campaign_name,
+                spec['start_time'],
+                spec.get('end_time'),
+                spec.get('dataset_id'),
+                spec.get('targeting'),
+                dynamic_creative=bool(spec.get('variants'))
+            )
+            operations.append(('ad_set', self._batch_operation(
+                'POST', f"{account_id}/adsets", ad_set_params, f"{prefix}ad_set"
+            )))
+        
+        # 同じ広告セットに、広告ごとのクリエイティブと広告を作成
+        for suffix, ad_spec in self._chain_ads(spec):
+            creative_step, ad_step = f"creative{suffix}", f"ad{suffix}"
+            if not existing_ids.get(creative_step):
+                creative_params = self._chain_creative_params(ad_spec)
+                # クリエイティブは広告セットへの参照を持たないため、明示的に依存させて孤立作成を防ぐ
+                depends_on = f"{prefix}ad_set" if not existing_ids.get('ad_set') else None
+                operations.append((creative_step, self._batch_operation(
+                    'POST', f"{account_id}/adcreatives", creative_params, f"{prefix}{creative_step}",
+                    depends_on=depends_on
+                )))
+            
+            if not existing_ids.get(ad_step):
+                ad_params = self._build_ad_params(ref('ad_set'), ref(creative_step), ad_spec['ad_name'])
+                operations.append((ad_step, self._batch_operation(
+                    'POST', f"{account_id}/ads", ad_params, f"{prefix}{ad_step}"
+                )))
+        
+        return operations
+    
+    def _batch_operation(self, method, relative_url, params, name, depends_on=None):
+        """バッチリクエストの1オペレーションを構築"""
+        encoded = {
+            key: json.dumps(value) if isinstance(value, (dict, list, bool)) else value
+            for key, value in params.items()
+        }
+        operation = {
+            'method': method,
+            'relative_url': relative_url,
+            # {result=...} 参照がエスケープされないようにする
+            'body': urlencode(encoded, safe='{}=$:'),
+            'name': name,
+            'omit_response_on_success': False
+        }
+        if depends_on:
+            operation['depends_on'] = depends_on
+        return operation
+    
+    def _post_batch(self, operations, retry=False):
+        """Graph API バッチリクエストを送信
+        
+        作成を含むバッチは結果が分からないまま再送すると重複するため、既定では再試行しない。
+        """
+        return self.transport.post('', {'batch': json.dumps(operations)}, retry=retry)
+    
+    def _execute_chain_batch(self, chain_specs, operations, batch_chains, results):
+        """バッチを実行してチェーンごとの結果に振り分け"""
+        # 利用率が上限に近いアカウントが含まれる場合は送信前に待機
+        for account_id in {chain_specs[index]['account_id'] for index, _ in batch_chains}:
+            self.throttle.acquire(account_id)
+        
+        # 送信前に冪等キーを記録し、応答を確認できたものだけ解決済みにする
+        keys = {index: WriteLedger.key_for(chain_specs[index]) for index, _ in batch_chains}
+        for index, _ in batch_chains:
+            self.write_ledger.begin(keys[index], chain_specs[index]['account_id'], chain_specs[index]['campaign_name'])
+        
+        try:
+            responses = self._post_batch(operations)
+        except Exception as e:
+            logger.error(f"バッチリクエストエラー: {e}")
+            for index, steps in batch_chains:
+                self._release_circuits(chain_specs[index], [step for step, _ in steps])
+                results[index] = ChainLaunchError(
+                    f"バッチリクエストエラー: {e}",
+                    step=steps[0][0],
+                    created=dict(chain_specs[index].get('existing_ids') or {}),
+                    kind=classify_exception(e)
+                )
+            return
+        
+        offset = 0
+        for index, steps in batch_chains:
+            chain_responses = responses[offset:offset + len(steps)]
+            offset += len(steps)
+            results[index] = self._parse_chain_responses(chain_specs[index], steps, chain_responses)
+            # 照合してから送り直したチェーンは、前回の未解決の送信も解決済みにする
+            self.write_ledger.resolve(keys[index])
+            self.write_ledger.resolve_campaign(chain_specs[index]['account_id'], chain_specs[index]['campaign_name'])
+            self._record_circuits(chain_specs[index], [step for step, _ in steps], results[index])
+            if not isinstance(results[index], ChainLaunchError):
+                self.mirror.record_chain(chain_specs[index], results[index])
+    
+    def _parse_chain_responses(self, spec, steps, responses):
+        """1チェーン分のバッチ応答を解析
+        
+        2件目以降の広告のクリエイティブ・広告は前の広告に依存しないため、途中のステップが
+        失敗しても同じバッチ内で作成されていることがある。応答はすべて解析し、
+        成功したステップのIDは失敗時も created に含める。
+        """
+        campaign_name = spec['campaign_name']
+        account_id = spec['account_id']
+        created = {step: object_id for step, object_id in (spec.get('existing_ids') or {}).items() if object_id}
+        failed = {}
+        first_response = None
+        
+        for (step, _), response in zip(steps, responses):
+            if response:
+                self.throttle.record_headers(response.get('headers'), account_id)
+            
+            body = {}
+            if response and response.get('body'):
+                try:
+                    body = json.loads(response['body'])
+                except ValueError:
+                    body = {}
+            
+            if not response or response.get('code') != 200 or 'id' not in body:
+                error = body.get('error', {})
+                self.throttle.record_error(error.get('code'), account_id)
+                logger.error(f"チェーン作成エラー ({campaign_name} / {step}): {error.get('message') or '応答がありません'}")
+                if not failed:
+                    first_response = response
+                failed[step] = error
+                continue
+            
+            created[step] = body['id']
+        
+        if failed:
+            step, error = next(iter(failed.items()))
+            message = f"{step} の作成に失敗しました: {error.get('message') or '応答がありません'}"
+            if len(failed) > 1:
+                message += f"（ほかに失敗したステップ: {', '.join(list(failed)[1:])}）"
+            return ChainLaunchError(
+                message, step=step, created=created, error=error, failed=failed,
+                kind=classify(error.get('code'), first_response.get('code') if first_response else None,
+                              error.get('is_transient', False))
+            )
+        
+        self.throttle.record_success(account_id)
+        logger.info(f"チェーン作成成功: {campaign_name} (キャンペーンID: {created['campaign']})")
+        
+        result = {
+            'campaign': {
+                'id': created['campaign'],
+                'name': campaign_name,
+                'budget': spec['budget_amount'],
+                'budget_type': spec.get('budget_type', 'daily')
+            },
+            'ad_set': {
+                'id': created['ad_set'],
+                'name': spec.get('ad_set_name') or campaign_name
+            }
+        }
+        for suffix, ad_spec in self._chain_ads(spec):
+            result[f"creative{suffix}"] = {'id': created[f"creative{suffix}"], 'name': ad_spec['creative_name']}
+            result[f"ad{suffix}"] = {'id': created[f"ad{suffix}"], 'name': ad_spec['ad_name']}
+        return result
+    
+    def sync_mirror(self, account_ids, launched=None):
+        """ローカルミラーを差分同期し、アカウントごとの取得件数を返す
+        
+        launched（AdLogger の作成履歴）を渡すと、ミラーにない作成済みオブジェクトも取得する。
+        """
+        results = {}
+        for account_id in account_ids:
+            try:
+                results[account_id] = self.mirror.sync_account(self.transport, account_id)
+            except Exception as e:
+                logger.error(f"ミラー同期エラー ({account_id}): {e}")
+                results[account_id] = {'error': str(e)}
+        
+        if launched:
+            try:
+                self.mirror.sync_logged(self.transport, [
+                    item for item in launched if item.get('account_id') in account_ids
+                ])
+            except Exception as e:
+                logger.error(f"作成履歴のミラー同期エラー: {e}")
+        return results
+    
+    def update_statuses(self, targets, status):
+        """作成したキャンペーン・広告セット・広告の配信ステータスを一括変更
+        
+        targets は {'account_id', 'campaign_id', 'ad_set_id', 'ad_id', 'ad_ids'} の辞書のリスト（AdLogger の作成履歴）。
+        ad_ids があれば同じ広告セットの2件目以降の広告も変更する。
+        最大50件ずつのバッチで更新し、オブジェクトIDごとのエラーメッセージ（成功時は None）を返す。
+        有効化は広告→広告セット→キャンペーンの順、停止はキャンペーンから順に行い、
+        途中の段階で一部だけ配信が始まることがないようにする。
+        """
+        if status not in ('ACTIVE', 'PAUSED'):
+            raise ValueError(f"無効なステータスです: {status}")
+        
+        levels = ['ad_id', 'ad_set_id', 'campaign_id']
+        if status == 'PAUSED':
+            levels.reverse()
+        
+        errors = {}
+        for level in levels:
+            updates = list({
+                object_id: target['account_id']
+                for target in targets
+                for object_id in (target.get('ad_ids') if level == 'ad_id' else None) or [target.get(level)]
+                if object_id
+            }.items())
+            for start in range(0, len(updates), BATCH_MAX_OPERATIONS):
+                errors.update(self._update_status_batch(updates[start:start + BATCH_MAX_OPERATIONS], status))
+        
+        self.mirror.set_status([object_id for object_id, error in errors.items() if not error], status)
+        
+        failed = sum(1 for error in errors.values() if error)
+        logger.info(f"ステータス一括変更 ({status}): 成功 {len(errors) - failed}件, エラー {failed}件")
+        return errors
+    
+    def _update_status_batch(self, updates, status):
+        """1バッチ分のステータス更新を実行"""
+        for account_id in {account_id for _, account_id in updates}:
+            self.throttle.acquire(account_id)
+        
+        operations = [
+            self._batch_operation('POST', object_id, {'status': status}, f"status_{i}")
+            for i, (object_id, _) in enumerate(updates)
+        ]
+        try:
+            # ステータス更新は同じ内容を再送しても結果が変わらないため再試行してよい
+            responses = self._post_batch(operations, retry=True)
+        except Exception as e:
+            logger.error(f"ステータス更新バッチエラー: {e}")
+            return {object_id: str(e) for object_id, _ in updates}
+        
+        errors = {}
+        for (object_id, account_id), response in zip(updates, responses):
+            if response:
+                self.throttle.record_headers(response.get('headers'), account_id)
+            
+            body = {}
+            if response and response.get('body'):
+                try:
+                    body = json.loads(response['body'])
+                except ValueError:
+                    body = {}
+            
+            if response and response.get('code') == 200 and body.get('success'):
+                self.throttle.record_success(account_id)
+                errors[object_id] = None
+            else:
+                error = body.get('error', {})
+                self.throttle.record_error(error.get('code'), account_id)
+                errors[object_id] = error.get('message') or '応答がありません'
+                logger.error(f"ステータス更新エラー ({object_id}): {errors[object_id]}")
+        return errors
@@ -0,0 +1,106 @@
+"""
+広告アカウントごとのキャンペーン名インデックス（重複作成の防止）
+"""
+import logging
+import threading
+import time
+from typing import Dict, Optional, Callable, Iterable
+
+from .config import Config
+from .directory_cache import token_fingerprint
+
+logger = logging.getLogger(__name__)
+
+def _normalize_account_id(account_id: str) -> str:
+    """'act_' 接頭辞の有無に関わらず同じキーになるよう正規化"""
+    account_id = str(account_id)
+    return account_id if account_id.startswith('act_') else f"act_{account_id}"
+
+def _normalize_name(name: str) -> str:
+    """前後の空白の違いは同じ名前として扱う"""
+    return (name or '').strip()
+
+class CampaignNameIndex:
+    """広告アカウント内のキャンペーン名を保持し、同じ名前での作成をローカルで弾くインデックス
+
+    アカウントごとに初回だけ名前のみの一覧取得で構築し（有効期限切れで再構築）、
+    以降は作成のたびに名前を追加する。作成前の予約（reserve）で、同時に実行される
+    同名の作成も1件だけに絞る。
+    """
+
+    def __init__(self, ttl: float = None):
+        """初期化"""
+        self.ttl = ttl if ttl is not None else Config.NAME_INDEX_TTL
+        self._lock = threading.Lock()
+        self._account_locks = {}
+        self._names = {}  # account_id -> set(name)
+        self._warmed_at = {}  # account_id -> time
+        self._warming = {}  # 構築中の account_id -> 構築開始後に予約された名前
+
+    def warm(self, account_id: str, loader: Callable[[], Iterable[str]]):
+        """未構築・期限切れのアカウントを loader（名前の一覧）で構築"""
+        account_id = _normalize_account_id(account_id)
+        with self._lock:
+            account_lock = self._account_locks.setdefault(account_id, threading.Lock())
+
+        with account_lock:
+            warmed_at = self._warmed_at.get(account_id)
+            if warmed_at is not None and time.time() - warmed_at < self.ttl:
+                return
+
+            with self._lock:
+                self._warming[account_id] = set()
+            try:
+                names = {_normalize_name(name) for name in loader() if name}
+            finally:
+                with self._lock:
+                    reserved = self._warming.pop(account_id)
+
+            with self._lock:
+                # 一覧で置き換え、削除・名前変更されたキャンペーンの名前を外す。構築中に予約された名前は残す
+                self._names[account_id] = names | reserved
+                self._warmed_at[account_id] = time.time()
+            logger.info(f"キャンペーン名インデックスを構築: {account_id} ({len(names)}件)")
+
+    def contains(self, account_id: str, name: str) -> bool:
+        """同じ名前のキャンペーンがあるか"""
+        with self._lock:
+            return _normalize_name(name) in self._names.get(_normalize_account_id(account_id), set())
+
+    def reserve(self, account_id: str, name: str) -> bool:
+        """名前を予約（既に存在・予約済みなら False）"""
+        account_id, name = _normalize_account_id(account_id), _normalize_name(name)
+        with self._lock:
+            names = self._names.setdefault(account_id, set())
+            if name in names:
+                return False
+            names.add(name)
+            if account_id in self._warming:
+                self._warming[account_id].add(name)
+            return True
+
+    def release(self, account_id: str, name: str):
+        """作成しなかった名前の予約を取り消し"""
+        account_id, name = _normalize_account_id(account_id), _normalize_name(name)
+        with self._lock:
+            self._names.get(account_id, set()).discard(name)
+            self._warming.get(account_id, set()).discard(name)
+
+    def invalidate(self, account_id: Optional[str] = None):
+        """次回の確認時に再構築させる"""
+        with self._lock:
+            if account_id:
+                self._warmed_at.pop(_normalize_account_id(account_id), None)
+            else:
+                self._warmed_at.clear()
+
+_name_indexes: Dict[str, CampaignNameIndex] = {}
+_name_indexes_lock = threading.Lock()
+
+def get_name_index(access_token: str = None) -> CampaignNameIndex:
+    """アクセストークンごとにプロセス全体で共有するインデックスを取得"""
+    fingerprint = token_fingerprint(access_token or Config.META_ACCESS_TOKEN)
+    with _name_indexes_lock:
+        if fingerprint not in _name_indexes:
+            _name_indexes[fingerprint] = CampaignNameIndex()
+        return _name_indexes[fingerprint]
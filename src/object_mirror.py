@@ -0,0 +1,295 @@
+"""
+キャンペーン・広告セット・クリエイティブ・広告のローカルミラー（SQLite）
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable
+
+from .config import Config
+from .directory_cache import token_fingerprint
+
+logger = logging.getLogger(__name__)
+
+IDS_PER_REQUEST = 50  # ?ids= で一度に取得するオブジェクト数
+
+# オブジェクト種別 -> (広告アカウントのエッジ, 取得する項目)
+OBJECT_TYPES = {
+    'campaign': ('campaigns', 'id,name,status,effective_status,objective,daily_budget,lifetime_budget,updated_time'),
+    'ad_set': ('adsets', 'id,name,status,effective_status,campaign_id,daily_budget,start_time,end_time,updated_time'),
+    'ad': ('ads', 'id,name,status,effective_status,campaign_id,adset_id,creative{id},updated_time'),
+    'creative': ('adcreatives', 'id,name,status,object_story_spec')
+}
+
+# updated_time で差分取得できる種別（クリエイティブは広告から参照されたIDで取得する）
+INCREMENTAL_TYPES = ['campaign', 'ad_set', 'ad']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    name TEXT,
+    status TEXT,
+    effective_status TEXT,
+    campaign_id TEXT,
+    ad_set_id TEXT,
+    creative_id TEXT,
+    updated_time REAL,
+    synced_at REAL NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS objects_account_type_name ON objects (account_id, type, name);
+CREATE INDEX IF NOT EXISTS objects_campaign ON objects (campaign_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    last_updated_time REAL NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (account_id, type)
+);
+"""
+
+def _normalize_account_id(account_id: str) -> str:
+    """'act_' 接頭辞の有無に関わらず同じキーになるよう正規化"""
+    account_id = str(account_id)
+    return account_id if account_id.startswith('act_') else f"act_{account_id}"
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """Graph API の日時（例: 2024-01-01T00:00:00+0900）をUNIX時刻に変換"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S%z').timestamp()
+    except ValueError:
+        return None
+
+class ObjectMirror:
+    """広告オブジェクトを広告アカウントごとにローカルの SQLite へ複製するクラス
+
+    同期は updated_time による差分取得と、AdLogger に記録された作成済みIDの取得のみで行い、
+    全件の取り直しはしない。作成直後のオブジェクトは launch 時に直接記録する。
+    """
+
+    def __init__(self, db_path: str):
+        """初期化"""
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+
+    def sync_account(self, transport, account_id: str) -> Dict[str, int]:
+        """前回の同期以降に更新されたオブジェクトだけを取得して反映し、種別ごとの件数を返す"""
+        account_id = _normalize_account_id(account_id)
+        counts = {}
+
+        for object_type in INCREMENTAL_TYPES:
+            edge, fields = OBJECT_TYPES[object_type]
+            since = self._last_updated_time(account_id, object_type)
+            params = {'fields': fields, 'limit': 500}
+            if since:
+                # 同じ秒に更新されたものを取りこぼさないよう1秒前から取得する（反映は上書き）
+                params['filtering'] = json.dumps([
+                    {'field': 'updated_time', 'operator': 'GREATER_THAN', 'value': int(since) - 1}
+                ])
+
+            items = list(transport.get_paged(f"{account_id}/{edge}", params, account_id=account_id))
+            self.upsert(object_type, account_id, items)
+
+            latest = max([_parse_time(item.get('updated_time')) or 0 for item in items] + [since or 0])
+            if latest:
+                self._set_last_updated_time(account_id, object_type, latest)
+            counts[object_type] = len(items)
+
+        # 広告から参照されているがミラーにないクリエイティブを取得
+        counts['creative'] = self.fetch_missing(transport, 'creative', account_id, self._referenced_creative_ids(account_id))
+
+        logger.info(f"ミラー同期完了: {account_id} {counts}")
+        return counts
+
+    def sync_logged(self, transport, launched: Iterable[Dict[str, Any]]) -> int:
+        """AdLogger の作成履歴のうちミラーにないオブジェクトを取得して反映"""
+        missing = {}
+        for item in launched:
+            if not item.get('account_id'):
+                continue
+            account_id = _normalize_account_id(item['account_id'])
+            for object_type, key in (('campaign', 'campaign_id'), ('ad_set', 'ad_set_id'),
+                                     ('creative', 'creative_id'), ('ad', 'ad_id')):
+                # 同じ広告セットの2件目以降のクリエイティブ・広告は creative_ids / ad_ids に入る
+                object_ids = item.get(f"{key}s") or ([item[key]] if item.get(key) else [])
+                missing.setdefault((object_type, account_id), []).extend(object_ids)
+
+        return sum(
+            self.fetch_missing(transport, object_type, account_id, object_ids)
+            for (object_type, account_id), object_ids in missing.items()
+        )
+
+    def fetch_missing(self, transport, object_type: str, account_id: str, object_ids: Iterable[str]) -> int:
+        """ミラーにないIDだけを ?ids= でまとめて取得"""
+        object_ids = list(dict.fromkeys(object_ids))
+        known = self._known_ids(object_ids)
+        missing = [object_id for object_id in object_ids if object_id not in known]
+        fields = OBJECT_TYPES[object_type][1]
+
+        for start in range(0, len(missing), IDS_PER_REQUEST):
+            ids = missing[start:start + IDS_PER_REQUEST]
+            response = transport.get('', {'ids': ','.join(ids), 'fields': fields}, account_id=account_id)
+            self.upsert(object_type, account_id, list(response.values()))
+        return len(missing)
+
+    def record_chain(self, spec: Dict[str, Any], result: Dict[str, Any]):
+        """作成したチェーンを同期を待たずに記録"""
+        account_id = _normalize_account_id(spec['account_id'])
+        campaign_id = result['campaign']['id']
+        ad_set_id = result['ad_set']['id']
+        status = Config.DEFAULT_AD_STATUS
+        self.upsert('campaign', account_id, [{'id': campaign_id, 'name': result['campaign']['name'], 'status': status}])
+        self.upsert('ad_set', account_id, [{
+            'id': ad_set_id, 'name': result['ad_set']['name'], 'status': status, 'campaign_id': campaign_id
+        }])
+        # 2件目以降の広告は creative_2 / ad_2 ... として結果に入る
+        suffixes = [step[2:] for step in result if re.fullmatch(r'ad(_\d+)?', step)]
+        # 再利用したクリエイティブは同期済みの内容を残す
+        self.upsert('creative', account_id, [
+            {'id': result[f"creative{suffix}"]['id'], 'name': result[f"creative{suffix}"]['name']}
+            for suffix in suffixes
+        ], replace=False)
+        self.upsert('ad', account_id, [
+            {
+                'id': result[f"ad{suffix}"]['id'], 'name': result[f"ad{suffix}"]['name'], 'status': status,
+                'campaign_id': campaign_id, 'adset_id': ad_set_id,
+                'creative': {'id': result[f"creative{suffix}"]['id']}
+            }
+            for suffix in suffixes
+        ])
+
+    def upsert(self, object_type: str, account_id: str, items: List[Dict[str, Any]], replace: bool = True):
+        """Graph API の応答をそのまま反映（replace=False の場合は既存の行を残す）"""
+        if not items:
+            return
+        account_id = _normalize_account_id(account_id)
+        now = time.time()
+        rows = [
+            (
+                item['id'], object_type, account_id, item.get('name'), item.get('status'),
+                item.get('effective_status'),
+                item.get('campaign_id') or (item['id'] if object_type == 'campaign' else None),
+                item.get('adset_id') or (item['id'] if object_type == 'ad_set' else None),
+                (item.get('creative') or {}).get('id') or (item['id'] if object_type == 'creative' else None),
+                _parse_time(item.get('updated_time')), now, json.dumps(item, ensure_ascii=False)
+            )
+            for item in items if item.get('id')
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO objects (id, type, account_id, name, status, effective_status, "
+                "campaign_id, ad_set_id, creative_id, updated_time, synced_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def set_status(self, object_ids: Iterable[str], status: str):
+        """ステータス変更の結果を反映"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE objects SET status = ?, effective_status = NULL, synced_at = ? WHERE id = ?",
+                [(status, time.time(), object_id) for object_id in object_ids]
+            )
+
+    def find_by_name(self, account_id: str, object_type: str, name: str) -> List[Dict[str, Any]]:
+        """アカウント内で同じ名前のオブジェクトを検索"""
+        return self._query(
+            "SELECT * FROM objects WHERE account_id = ? AND type = ? AND name = ?",
+            (_normalize_account_id(account_id), object_type, name)
+        )
+
+    def list_objects(self, account_id: str = None, object_type: str = None, status: str = None,
+                     limit: int = 1000) -> List[Dict[str, Any]]:
+        """条件に合うオブジェクトを更新日時の新しい順に取得"""
+        conditions, params = [], []
+        if account_id:
+            conditions.append("account_id = ?")
+            params.append(_normalize_account_id(account_id))
+        if object_type:
+            conditions.append("type = ?")
+            params.append(object_type)
+        if status:
+            conditions.append("COALESCE(effective_status, status) = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(
+            f"SELECT * FROM objects {where} ORDER BY COALESCE(updated_time, synced_at) DESC LIMIT ?",
+            tuple(params) + (limit,)
+        )
+
+    def status_summary(self, account_id: str = None) -> List[Dict[str, Any]]:
+        """種別・配信ステータスごとの件数"""
+        where, params = ("WHERE account_id = ?", (_normalize_account_id(account_id),)) if account_id else ("", ())
+        return self._query(
+            f"SELECT account_id, type, COALESCE(effective_status, status) AS status, COUNT(*) AS count "
+            f"FROM objects {where} GROUP BY account_id, type, COALESCE(effective_status, status) "
+            f"ORDER BY account_id, type, status",
+            params
+        )
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """クエリを実行して辞書のリストを返す"""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def _known_ids(self, object_ids: Iterable[str]) -> set:
+        """ミラーに存在するID"""
+        object_ids = list(object_ids)
+        known = set()
+        for start in range(0, len(object_ids), 500):
+            chunk = object_ids[start:start + 500]
+            rows = self._query(f"SELECT id FROM objects WHERE id IN ({','.join('?' * len(chunk))})", tuple(chunk))
+            known.update(row['id'] for row in rows)
+        return known
+
+    def _referenced_creative_ids(self, account_id: str) -> List[str]:
+        """広告から参照されているクリエイティブID"""
+        rows = self._query(
+            "SELECT DISTINCT creative_id FROM objects WHERE account_id = ? AND type = 'ad' AND creative_id IS NOT NULL",
+            (account_id,)
+        )
+        return [row['creative_id'] for row in rows]
+
+    def _last_updated_time(self, account_id: str, object_type: str) -> Optional[float]:
+        """前回の同期で取得した最新の updated_time"""
+        rows = self._query(
+            "SELECT last_updated_time FROM sync_state WHERE account_id = ? AND type = ?",
+            (account_id, object_type)
+        )
+        return rows[0]['last_updated_time'] if rows else None
+
+    def _set_last_updated_time(self, account_id: str, object_type: str, value: float):
+        """同期済みの最新の updated_time を記録"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (account_id, type, last_updated_time, synced_at) VALUES (?, ?, ?, ?)",
+                (account_id, object_type, value, time.time())
+            )
+
+_mirrors = {}
+_mirrors_lock = threading.Lock()
+
+def get_object_mirror(access_token: str = None) -> ObjectMirror:
+    """アクセストークンごとにプロセス全体で共有するミラーを取得"""
+    fingerprint = token_fingerprint(access_token or Config.META_ACCESS_TOKEN)
+    with _mirrors_lock:
+        if fingerprint not in _mirrors:
+            db_path = os.path.join(Config.CACHE_DIR, f"mirror_{fingerprint}.sqlite3")
+            _mirrors[fingerprint] = ObjectMirror(db_path)
+        return _mirrors[fingerprint]
@@ -0,0 +1,189 @@
+"""
+出稿データの事前検証（API を呼ぶ前にローカルで全行を検査）
+"""
+import re
+from datetime import datetime, date
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+BUDGET_TYPES = {'daily', 'lifetime'}
+
+# ダイナミッククリエイティブ（asset_feed_spec）に指定できるバリエーションの上限
+VARIANT_LIMITS = {
+    'headlines': ('見出し', 5),
+    'descriptions': ('説明文', 5),
+    'urls': ('URL', 5),
+    'video_ids': ('動画', 10)
+}
+
+# 1つの広告セットに作成できる広告の数（キャンペーン・広告セットと、広告ごとのクリエイティブ・広告が
+# バッチリクエスト1回の上限50件に収まる数）
+MAX_ADS_PER_AD_SET = 24
+
+_URL_PATTERN = re.compile(r'^https?://[^\s/?#:]+\.[^\s/?#:]+(:\d+)?([/?#]\S*)?$', re.IGNORECASE)
+_ACCOUNT_PATTERN = re.compile(r'^(act_)?\d+$')
+_ID_PATTERN = re.compile(r'^\d+$')
+_DATE_PATTERN = re.compile(r'^(\d{4})-(\d{2})-(\d{2})')
+
+def _blank(value: Any) -> bool:
+    """未入力か"""
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def _parse_date(value: Any) -> Optional[date]:
+    """'YYYY-MM-DD'（以降に時刻が続いてもよい）を日付に変換（不正なら None）"""
+    match = _DATE_PATTERN.match(str(value).strip())
+    if not match:
+        return None
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+def _compile_rules() -> List[Tuple[str, Callable[[Dict[str, Any], date], Optional[str]]]]:
+    """(項目, 検査関数) の一覧を組み立てる
+
+    検査関数は spec と今日の日付を受け取り、エラーがあればメッセージを返す。
+    正規表現・定数はここで一度だけ解決し、行ごとの検査はこの一覧を順に呼ぶだけにする。
+    """
+    def account_id(spec, today):
+        if not _ACCOUNT_PATTERN.match(str(spec.get('account_id') or '')):
+            return f"広告アカウントIDが不正です: {spec.get('account_id')}"
+
+    def campaign_name(spec, today):
+        if _blank(spec.get('campaign_name')):
+            return "キャンペーン名が未入力です"
+
+    def budget_type(spec, today):
+        if spec.get('budget_type', 'daily') not in BUDGET_TYPES:
+            return f"予算タイプは daily / lifetime のいずれかです: {spec.get('budget_type')}"
+        if spec.get('budget_type') == 'lifetime' and _blank(spec.get('end_time')):
+            return "通算予算の場合は終了日が必要です"
+
+    def budget_amount(spec, today):
+        amount = spec.get('budget_amount')
+        try:
+            if float(amount) <= 0:
+                return f"予算は0より大きい金額にしてください: {amount}"
+        except (TypeError, ValueError):
+            return f"予算が数値ではありません: {amount}"
+
+    def schedule(spec, today):
+        start = _parse_date(spec.get('start_time'))
+        if start is None:
+            return f"開始日の形式が不正です（YYYY-MM-DD）: {spec.get('start_time')}"
+        if start < today:
+            return f"開始日が過去の日付です: {spec.get('start_time')}"
+        if _blank(spec.get('end_time')):
+            return None
+        end = _parse_date(spec.get('end_time'))
+        if end is None:
+            return f"終了日の形式が不正です（YYYY-MM-DD）: {spec.get('end_time')}"
+        if end < start or (end == start and str(spec['end_time']).strip() <= str(spec['start_time']).strip()):
+            return f"終了日が開始日より前です: {spec.get('start_time')} ～ {spec.get('end_time')}"
+
+    def headline(spec, today):
+        if _blank(spec.get('headline')):
+            return "見出しが未入力です"
+
+    def url(spec, today):
+        if not _URL_PATTERN.match(str(spec.get('url') or '').strip()):
+            return f"URLの形式が不正です: {spec.get('url')}"
+
+    def object_ids(spec, today):
+        for key, label in (('page_id', 'FacebookページID'), ('video_id', '動画ID'), ('dataset_id', 'データセットID')):
+            if not _blank(spec.get(key)) and not _ID_PATTERN.match(str(spec[key]).strip()):
+                return f"{label}が不正です: {spec[key]}"
+
+    def variants(spec, today):
+        variants = spec.get('variants')
+        if not variants:
+            return None
+        if not isinstance(variants, dict):
+            return "バリエーションの形式が不正です"
+        for key, (label, limit) in VARIANT_LIMITS.items():
+            items = [item for item in (variants.get(key) or []) if not _blank(item)]
+            if len(set(items)) > limit:
+                return f"ダイナミッククリエイティブの{label}は{limit}件までです（{len(set(items))}件）"
+            if key == 'urls':
+                for item in items:
+                    if not _URL_PATTERN.match(str(item).strip()):
+                        return f"URLの形式が不正です: {item}"
+
+    def ads(spec, today):
+        entries = spec.get('ads')
+        if not entries:
+            return None
+        if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+            return "広告の一覧の形式が不正です"
+        if len(entries) > MAX_ADS_PER_AD_SET:
+            return f"1つの広告セットに作成できる広告は{MAX_ADS_PER_AD_SET}件までです（{len(entries)}件）"
+        for number, entry in enumerate(entries, 1):
+            if not _blank(entry.get('url')) and not _URL_PATTERN.match(str(entry['url']).strip()):
+                return f"{number}件目の広告のURLの形式が不正です: {entry['url']}"
+            if not _blank(entry.get('video_id')) and not _ID_PATTERN.match(str(entry['video_id']).strip()):
+                return f"{number}件目の広告の動画IDが不正です: {entry['video_id']}"
+            if entry.get('headline') is not None and _blank(entry['headline']):
+                return f"{number}件目の広告の見出しが空です"
+
+    def object_names(spec, today):
+        for key, label in (('ad_set_name', '広告セット名'), ('creative_name', 'クリエイティブ名'), ('ad_name', '広告名')):
+            if key in spec and spec[key] is not None and _blank(spec[key]):
+                return f"{label}が空です"
+
+    return [
+        ('account_id', account_id),
+        ('campaign_name', campaign_name),
+        ('budget_type', budget_type),
+        ('budget_amount', budget_amount),
+        ('start_time', schedule),
+        ('headline', headline),
+        ('url', url),
+        ('object_ids', object_ids),
+        ('variants', variants),
+        ('ads', ads),
+        ('object_names', object_names)
+    ]
+
+_RULES = _compile_rules()
+
+def validate_spec(spec: Dict[str, Any], today: date = None) -> List[Dict[str, str]]:
+    """1チェーン分の spec を検査し、エラーの一覧（{'field', 'message'}）を返す
+
+    作成済みのステップ（existing_ids）は送信しないため、その項目は検査しない。
+    """
+    today = today or datetime.now().date()
+    existing_ids = spec.get('existing_ids') or {}
+    errors = []
+    for field, rule in _RULES:
+        if existing_ids.get('campaign') and field in ('campaign_name', 'budget_type', 'budget_amount'):
+            continue
+        if existing_ids.get('ad_set') and field == 'start_time':
+            continue
+        if existing_ids.get('creative') and field in ('headline', 'url', 'variants'):
+            continue
+        message = rule(spec, today)
+        if message:
+            errors.append({'field': field, 'message': message})
+    return errors
+
+def validate_specs(specs: List[Dict[str, Any]], today: date = None) -> Dict[int, List[Dict[str, str]]]:
+    """全行を検査し、エラーのある行だけを {行番号(0始まり): エラーの一覧} で返す"""
+    today = today or datetime.now().date()
+    report = {}
+    for index, spec in enumerate(specs):
+        errors = validate_spec(spec, today)
+        if errors:
+            report[index] = errors
+    return report
+
+def error_table(report: Dict[int, List[Dict[str, str]]], labels: List[str] = None) -> List[Dict[str, Any]]:
+    """検査結果を1エラー1行の一覧表に整形（行番号は1始まり）"""
+    table = []
+    for index in sorted(report):
+        for error in report[index]:
+            table.append({
+                '行': index + 1,
+                'キャンペーン名': labels[index] if labels else '',
+                '項目': error['field'],
+                'エラー': error['message']
+            })
+    return table
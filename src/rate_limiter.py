@@ -0,0 +1,235 @@
+"""
+Meta API 利用率ヘッダーに基づくスロットリング
+"""
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional, Any
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# レート制限を示す Graph API エラーコード
+THROTTLE_ERROR_CODES = {4, 17, 32, 613} | set(range(80000, 80015))
+
+# この秒数より古い利用率は判断に使わない（利用率は直近1時間のローリング値）
+USAGE_STALE_SECONDS = 300
+
+def _normalize_account_id(account_id: Optional[str]) -> Optional[str]:
+    """'act_' 接頭辞の有無に関わらず同じキーになるよう正規化"""
+    if not account_id:
+        return None
+    account_id = str(account_id)
+    return account_id[4:] if account_id.startswith('act_') else account_id
+
+def _usage_pct(usage: Dict[str, Any]) -> float:
+    """利用率ヘッダーの各指標のうち最大値を返す"""
+    values = [
+        usage.get('call_count', 0),
+        usage.get('total_cputime', 0),
+        usage.get('total_time', 0),
+        usage.get('acc_id_util_pct', 0)
+    ]
+    return max(float(value or 0) for value in values)
+
+class UsageThrottle:
+    """X-App-Usage / X-Ad-Account-Usage / X-Business-Use-Case-Usage を追跡して送信ペースを調整するクラス"""
+
+    def __init__(self, slowdown_pct: float = None, pause_pct: float = None, max_delay: float = None):
+        """初期化"""
+        self.slowdown_pct = slowdown_pct if slowdown_pct is not None else Config.THROTTLE_SLOWDOWN_PCT
+        self.pause_pct = pause_pct if pause_pct is not None else Config.THROTTLE_PAUSE_PCT
+        self.max_delay = max_delay if max_delay is not None else Config.THROTTLE_MAX_DELAY
+
+        self._lock = threading.RLock()
+        self._app_usage = None  # {'pct', 'updated_at'}
+        self._account_usage = {}  # account_id -> {'pct', 'regain_seconds', 'updated_at'}
+        self._business_usage = {}  # (object_id, type) -> {'pct', 'regain_seconds', 'updated_at'}
+        self._blocked_until = {}  # account_id（None はアプリ全体）-> 再開時刻
+        self._throttle_strikes = {}  # account_id -> 連続でレート制限エラーになった回数
+        self._last_sent = {}  # account_id -> 最後に送信した時刻
+
+    def record_headers(self, headers, account_id: str = None):
+        """レスポンスヘッダーから利用率を記録
+
+        headers は dict 互換オブジェクト、またはバッチ応答の [{'name', 'value'}] 形式のリスト。
+        """
+        if not headers:
+            return
+
+        if isinstance(headers, list):
+            headers = {item.get('name', ''): item.get('value') for item in headers if item}
+
+        lowered = {str(key).lower(): value for key, value in headers.items()}
+        now = time.time()
+        account_key = _normalize_account_id(account_id)
+
+        app_usage = self._parse_json(lowered.get('x-app-usage'))
+        account_usage = self._parse_json(lowered.get('x-ad-account-usage'))
+        business_usage = self._parse_json(lowered.get('x-business-use-case-usage'))
+
+        with self._lock:
+            if app_usage:
+                self._app_usage = {'pct': _usage_pct(app_usage), 'updated_at': now}
+
+            if account_usage and account_key:
+                self._account_usage[account_key] = {
+                    'pct': _usage_pct(account_usage),
+                    'regain_seconds': float(account_usage.get('reset_time_duration') or 0),
+                    'updated_at': now
+                }
+
+            if business_usage:
+                for object_id, entries in business_usage.items():
+                    for entry in entries or []:
+                        self._business_usage[(str(object_id), entry.get('type', ''))] = {
+                            'pct': _usage_pct(entry),
+                            'regain_seconds': float(entry.get('estimated_time_to_regain_access') or 0) * 60,
+                            'updated_at': now
+                        }
+
+        pct = self.usage_pct(account_id)
+        if pct >= self.slowdown_pct:
+            logger.warning(f"API利用率が高くなっています: {pct:.0f}% (アカウント: {account_id or '-'})")
+
+    def record_error(self, code, account_id: str = None, retry_after: float = None) -> bool:
+        """エラーコードを記録し、レート制限エラーであれば送信を一時停止
+
+        レート制限エラーだった場合は True を返す。
+        """
+        try:
+            code = int(code)
+        except (TypeError, ValueError):
+            return False
+
+        if code not in THROTTLE_ERROR_CODES:
+            return False
+
+        # アプリ単位の制限（コード4）はアプリ全体を止める
+        account_key = None if code == 4 else _normalize_account_id(account_id)
+
+        with self._lock:
+            strikes = self._throttle_strikes.get(account_key, 0) + 1
+            self._throttle_strikes[account_key] = strikes
+            pause = retry_after or min(Config.THROTTLE_PAUSE_SECONDS * (2 ** (strikes - 1)), 3600)
+            self._blocked_until[account_key] = max(self._blocked_until.get(account_key, 0), time.time() + pause)
+
+        logger.warning(f"レート制限エラー (コード {code}) のため {pause:.0f}秒 送信を停止します (アカウント: {account_id or 'アプリ全体'})")
+        return True
+
+    def record_success(self, account_id: str = None):
+        """リクエスト成功を記録してレート制限エラーの連続回数をリセット"""
+        with self._lock:
+            self._throttle_strikes.pop(_normalize_account_id(account_id), None)
+            self._throttle_strikes.pop(None, None)
+
+    def usage_pct(self, account_id: str = None) -> float:
+        """指定アカウントに関係する利用率の最大値"""
+        account_key = _normalize_account_id(account_id)
+        now = time.time()
+
+        with self._lock:
+            candidates = []
+            if self._app_usage:
+                candidates.append(self._app_usage)
+            if account_key and account_key in self._account_usage:
+                candidates.append(self._account_usage[account_key])
+            for (object_id, _), usage in self._business_usage.items():
+                if account_key is None or object_id == account_key:
+                    candidates.append(usage)
+
+            fresh = [usage['pct'] for usage in candidates if now - usage['updated_at'] < USAGE_STALE_SECONDS]
+            return max(fresh) if fresh else 0.0
+
+    def delay_for(self, account_id: str = None) -> float:
+        """次のリクエストを送信するまでに待つべき秒数（0なら即時送信可能）"""
+        account_key = _normalize_account_id(account_id)
+        now = time.time()
+
+        with self._lock:
+            blocked_until = max(self._blocked_until.get(None, 0), self._blocked_until.get(account_key, 0))
+            regain_seconds = 0.0
+            for usage in [self._account_usage.get(account_key)] + [
+                usage for (object_id, _), usage in self._business_usage.items() if object_id == account_key
+            ]:
+                if usage and now - usage['updated_at'] < USAGE_STALE_SECONDS:
+                    regain_seconds = max(regain_seconds, usage['regain_seconds'] - (now - usage['updated_at']))
+
+        if blocked_until > now:
+            return blocked_until - now
+
+        pct = self.usage_pct(account_id)
+        if pct >= self.pause_pct:
+            # 上限目前: 回復見込み時刻まで停止し、再開後の最初の応答で利用率を取り直す
+            pause = max(regain_seconds, Config.THROTTLE_PAUSE_SECONDS)
+            self._pause(account_key, pause)
+            return pause
+        interval = self._pacing_interval(pct)
+        if interval > 0:
+            # 上限に近づくほど送信間隔を広げる
+            return max(0.0, self._last_sent.get(account_key, 0) + interval - now)
+        return 0.0
+
+    def _pacing_interval(self, pct: float) -> float:
+        """利用率に応じた送信間隔（秒）"""
+        if pct < self.slowdown_pct:
+            return 0.0
+        ratio = (pct - self.slowdown_pct) / max(self.pause_pct - self.slowdown_pct, 1)
+        return self.max_delay * min(ratio, 1.0)
+
+    def _pause(self, account_key: Optional[str], seconds: float):
+        """送信を停止し、停止の原因になった利用率を無効化"""
+        with self._lock:
+            self._blocked_until[account_key] = max(self._blocked_until.get(account_key, 0), time.time() + seconds)
+            if self._app_usage and self._app_usage['pct'] >= self.pause_pct:
+                # アプリ全体の利用率が原因ならすべてのアカウントを止める
+                self._blocked_until[None] = self._blocked_until[account_key]
+                self._app_usage['updated_at'] = 0
+            for (object_id, _), usage in list(self._business_usage.items()) + [
+                ((account_key, ''), self._account_usage.get(account_key))
+            ]:
+                if usage and (account_key is None or object_id == account_key) and usage['pct'] >= self.pause_pct:
+                    usage['updated_at'] = 0
+
+    def acquire(self, account_id: str = None):
+        """送信可能になるまで待機し、送信枠を確保"""
+        account_key = _normalize_account_id(account_id)
+
+        while True:
+            delay = self.delay_for(account_id)
+            if delay <= 0:
+                with self._lock:
+                    # 同時に待機していた他スレッドと送信枠が重ならないよう、ロック内で確定する
+                    now = time.time()
+                    next_slot = self._last_sent.get(account_key, 0) + self._pacing_interval(self.usage_pct(account_id))
+                    if next_slot <= now:
+                        self._last_sent[account_key] = now
+                        return
+                    delay = next_slot - now
+
+            logger.info(f"API利用率調整のため {delay:.1f}秒 待機します (アカウント: {account_id or '-'})")
+            time.sleep(delay)
+
+    def _parse_json(self, value) -> Optional[Dict[str, Any]]:
+        """ヘッダー値のJSONを解析"""
+        if not value:
+            return None
+        if isinstance(value, dict):
+            return value
+        try:
+            return json.loads(value)
+        except (TypeError, ValueError):
+            return None
+
+_usage_throttle = None
+_usage_throttle_lock = threading.Lock()
+
+def get_usage_throttle() -> UsageThrottle:
+    """プロセス全体で共有するスロットリングインスタンスを取得"""
+    global _usage_throttle
+    with _usage_throttle_lock:
+        if _usage_throttle is None:
+            _usage_throttle = UsageThrottle()
+        return _usage_throttle
@@ -0,0 +1,104 @@
+"""
+Graph API エラーの分類と再試行ポリシー
+"""
+import logging
+import random
+import threading
+import time
+from typing import Optional, Any, Callable, Tuple
+
+from .config import Config
+from .rate_limiter import THROTTLE_ERROR_CODES, get_usage_throttle
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE = 'retryable'  # 一時的なエラー（待って再試行）
+THROTTLED = 'throttled'  # レート制限（スロットリングの待機後に再試行）
+FATAL = 'fatal'  # 再試行しても成功しないエラー
+
+# 一時的なエラーを示す Graph API エラーコード（1: 不明なエラー, 2: サービス一時停止）
+RETRYABLE_ERROR_CODES = {1, 2}
+
+# レート制限を示すコード（341: アプリケーションの上限に到達）
+THROTTLED_ERROR_CODES = THROTTLE_ERROR_CODES | {341}
+
+def classify(code: Any = None, http_status: Optional[int] = None, is_transient: bool = False) -> str:
+    """エラーコード・HTTPステータスから再試行の可否を分類
+
+    http_status も code もない場合は通信エラー（応答を受け取れなかった）として再試行可能とする。
+    """
+    try:
+        code = int(code) if code is not None else None
+    except (TypeError, ValueError):
+        code = None
+
+    if code in THROTTLED_ERROR_CODES or http_status == 429:
+        return THROTTLED
+    if is_transient or code in RETRYABLE_ERROR_CODES:
+        return RETRYABLE
+    if http_status is not None and http_status >= 500:
+        return RETRYABLE
+    if http_status is None and code is None:
+        return RETRYABLE
+    return FATAL
+
+def classify_exception(error: Exception) -> str:
+    """GraphAPIError / FacebookRequestError などの例外を分類"""
+    if hasattr(error, 'api_error_code'):
+        # facebook_business の FacebookRequestError
+        return classify(error.api_error_code(), error.http_status(), error.api_transient_error())
+    if hasattr(error, 'http_status') and hasattr(error, 'code'):
+        return classify(error.code, error.http_status, getattr(error, 'is_transient', False))
+    return FATAL
+
+class RetryPolicy:
+    """分類に応じて、ジッター付き指数バックオフで再試行するポリシー"""
+
+    def __init__(self, max_attempts: int = None, base_delay: float = None, max_delay: float = None):
+        """初期化"""
+        self.max_attempts = max(1, max_attempts or Config.RETRY_MAX_ATTEMPTS)
+        self.base_delay = base_delay if base_delay is not None else Config.RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else Config.RETRY_MAX_DELAY
+        self.throttle = get_usage_throttle()
+
+    def should_retry(self, kind: str, attempt: int) -> bool:
+        """attempt 回目（0始まり）の失敗のあとに再試行するか"""
+        return kind != FATAL and attempt + 1 < self.max_attempts
+
+    def wait(self, kind: str, attempt: int, account_id: str = None):
+        """再試行前の待機（フルジッター付き指数バックオフ。レート制限時はスロットリングの停止明けまで待つ）"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        logger.info(f"{delay:.1f}秒後に再試行します ({attempt + 1}/{self.max_attempts - 1}, {kind})")
+        time.sleep(delay)
+        if kind == THROTTLED:
+            self.throttle.acquire(account_id)
+
+    def call(self, func: Callable[[], Any], account_id: str = None, description: str = 'リクエスト',
+             retry_kinds: Tuple[str, ...] = (RETRYABLE, THROTTLED)) -> Any:
+        """func を実行し、retry_kinds に分類されるエラーなら待って再試行
+
+        一時的なエラー（RETRYABLE）は作成が済んでいる場合があるため、冪等でない書き込みは
+        retry_kinds=(THROTTLED,) としてレート制限で拒否されたときだけ再試行すること。
+        """
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                kind = classify_exception(e)
+                if kind not in retry_kinds or not self.should_retry(kind, attempt):
+                    raise
+                logger.warning(f"{description}で一時的なエラー: {e}")
+                self.wait(kind, attempt, account_id)
+                attempt += 1
+
+_retry_policy = None
+_retry_policy_lock = threading.Lock()
+
+def get_retry_policy() -> RetryPolicy:
+    """プロセス全体で共有する再試行ポリシーを取得"""
+    global _retry_policy
+    with _retry_policy_lock:
+        if _retry_policy is None:
+            _retry_policy = RetryPolicy()
+        return _retry_policy
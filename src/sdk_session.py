@@ -0,0 +1,56 @@
+"""
+外部SDKの共有初期化（Meta Business SDK / Google サービスアカウント認証情報）
+
+重いSDKは初めて使われる時点で読み込み、初期化はプロセス全体で1回だけ行う。
+"""
+import threading
+from typing import List
+
+from .config import Config
+
+# 利用側ごとの認証情報のスコープ（Google Drive は動画の読み取りだけなので読み取り専用）
+GOOGLE_DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
+GOOGLE_SHEETS_SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+_lock = threading.Lock()
+_facebook_api = None
+_google_credentials = {}
+
+def init_facebook_api():
+    """Meta Business SDK を初期化して共有の FacebookAdsApi を返す
+
+    SDK経由の呼び出しも GRAPH_API_URL の接続先・バージョンに揃える。
+    """
+    global _facebook_api
+    with _lock:
+        if _facebook_api is None:
+            from facebook_business import FacebookAdsApi
+            from facebook_business.session import FacebookSession
+
+            graph_host, _, api_version = Config.GRAPH_API_URL.rstrip('/').rpartition('/')
+            FacebookSession.GRAPH = graph_host
+            _facebook_api = FacebookAdsApi.init(
+                app_id=Config.APP_ID,
+                app_secret=Config.APP_SECRET,
+                access_token=Config.META_ACCESS_TOKEN,
+                api_version=api_version
+            )
+        return _facebook_api
+
+def get_google_credentials(credentials_file: str, scopes: List[str]):
+    """サービスアカウントの認証情報を取得
+
+    認証ファイルはファイルごとに1回だけ読み込み、利用側ごとのスコープは with_scopes で付け替える。
+    """
+    key = (credentials_file, tuple(scopes))
+    with _lock:
+        if key not in _google_credentials:
+            if credentials_file not in _google_credentials:
+                from google.oauth2.service_account import Credentials
+
+                _google_credentials[credentials_file] = Credentials.from_service_account_file(credentials_file)
+            _google_credentials[key] = _google_credentials[credentials_file].with_scopes(list(scopes))
+        return _google_credentials[key]
@@ -0,0 +1,187 @@
+"""
+ターゲティングの名前（興味・関心、行動、地域）を Graph API のIDに変換
+"""
+import copy
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+from .config import Config
+from .directory_cache import AccountDirectory, token_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# テンプレートのターゲティングで名前を書ける項目と検索の種類
+NAME_FIELDS = {
+    'interests': 'adinterest',
+    'behaviors': 'behavior',
+    'locations': 'adgeolocation'
+}
+
+# 地域の検索対象と、geo_locations での指定先（国は国コードで指定する）
+LOCATION_TYPES = ['country', 'region', 'city']
+GEO_FIELDS = {'region': 'regions', 'city': 'cities'}
+
+class TargetingResolutionError(Exception):
+    """ターゲティングの名前をIDに変換できなかったことを表す例外"""
+
+    def __init__(self, message, unresolved=None):
+        super().__init__(message)
+        self.unresolved = unresolved or []  # [(項目, 名前), ...]
+
+def _name_of(item: Any) -> Optional[str]:
+    """'名前' または {'name': ...}（id なし）から名前を取り出す（ID指定済みなら None）"""
+    if isinstance(item, str):
+        return item.strip() or None
+    if isinstance(item, dict) and not item.get('id') and not item.get('key'):
+        return (item.get('name') or '').strip() or None
+    return None
+
+def targeting_names(targeting: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """ターゲティング内の、IDに変換が必要な (検索の種類, 名前) の一覧"""
+    names = []
+    for field, search_type in NAME_FIELDS.items():
+        for item in (targeting or {}).get(field) or []:
+            name = _name_of(item)
+            if name:
+                names.append((search_type, name))
+    return names
+
+class TargetingResolver:
+    """興味・関心、行動、地域の名前を /search で検索してIDに変換するクラス
+
+    検索結果は TTL 付きでディスクにキャッシュする（見つからなかった名前も短い TTL で保存し、
+    毎回検索し直さない）。一括出稿では全行の名前を重複なしで集めて並列に一度だけ検索し、
+    各行はキャッシュから変換する。
+    """
+
+    def __init__(self, transport, cache: AccountDirectory, max_workers: int = None):
+        """初期化"""
+        self.transport = transport
+        self.cache = cache
+        self.max_workers = max_workers or Config.TARGETING_MAX_WORKERS
+        self.locale = Config.TARGETING_LOCALE
+
+    def resolve_names(self, names: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+        """(検索の種類, 名前) をまとめて検索し、見つからなかったものは None にした辞書を返す"""
+        names = list(dict.fromkeys(names))
+        resolved = self._resolve_all(names)
+        if names:
+            found = sum(1 for value in resolved.values() if value is not None)
+            logger.info(f"ターゲティング名を変換: {found}/{len(names)}件")
+        return resolved
+
+    def _resolve_all(self, names: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+        """未キャッシュの名前を並列に検索（検索エラーは見つからなかった扱い）"""
+        def resolve(name):
+            try:
+                return name, self._lookup(*name)
+            except Exception as e:
+                logger.warning(f"ターゲティング検索エラー ({name[0]}: {name[1]}): {e}")
+                return name, None
+
+        if len(names) <= 1:
+            return dict(resolve(name) for name in names)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names))) as executor:
+            return dict(executor.map(resolve, names))
+
+    def resolve(self, targeting: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """名前を含むターゲティングを Graph API の targeting に変換
+
+        interests / behaviors は flexible_spec にまとめ、locations を指定した場合は
+        geo_locations をその地域で置き換える。変換できない名前があれば TargetingResolutionError。
+        """
+        if not targeting:
+            return targeting
+
+        resolved = self._resolve_all(list(dict.fromkeys(targeting_names(targeting))))
+        unresolved = [name for name, value in resolved.items() if value is None]
+        if unresolved:
+            raise TargetingResolutionError(
+                "ターゲティングの名前が見つかりません: " + ', '.join(name for _, name in unresolved),
+                unresolved
+            )
+
+        result = copy.deepcopy(targeting)
+        flexible = {}
+        for field in ('interests', 'behaviors'):
+            items = result.pop(field, None) or []
+            converted = []
+            for item in items:
+                name = _name_of(item)
+                value = resolved[(NAME_FIELDS[field], name)] if name else item
+                converted.append({'id': str(value['id']), 'name': value.get('name')})
+            if converted:
+                flexible[field] = converted
+        if flexible:
+            result.setdefault('flexible_spec', []).append(flexible)
+
+        locations = result.pop('locations', None) or []
+        if locations:
+            geo_locations = {}
+            for item in locations:
+                name = _name_of(item)
+                value = resolved[('adgeolocation', name)] if name else item
+                if value.get('type') == 'country':
+                    geo_locations.setdefault('countries', []).append(value.get('country_code') or value['key'])
+                else:
+                    field = GEO_FIELDS.get(value.get('type'), 'regions')
+                    geo_locations.setdefault(field, []).append({'key': str(value['key'])})
+            result['geo_locations'] = geo_locations
+        return result
+
+    def _lookup(self, search_type: str, name: str) -> Optional[Dict[str, Any]]:
+        """1件の名前をキャッシュ経由で検索"""
+        if search_type == 'behavior':
+            behaviors = self.cache.get(f"behavior:{self.locale}", self._fetch_behaviors)
+            return self._best_match(behaviors, name, exact=True)
+
+        key = f"{search_type}:{self.locale}:{name.lower()}"
+        return self.cache.get(key, lambda: self._search(search_type, name))
+
+    def _search(self, search_type: str, name: str) -> Optional[Dict[str, Any]]:
+        """/search で名前を検索し、最も一致するものを返す"""
+        params = {'type': search_type, 'q': name, 'limit': 25, 'locale': self.locale}
+        if search_type == 'adgeolocation':
+            params['location_types'] = json.dumps(LOCATION_TYPES)
+
+        response = self.transport.get('search', params)
+        match = self._best_match(response.get('data', []), name)
+        if match is None:
+            return None
+        fields = ('id', 'name') if search_type != 'adgeolocation' else ('key', 'name', 'type', 'country_code')
+        return {field: match.get(field) for field in fields}
+
+    def _fetch_behaviors(self) -> List[Dict[str, Any]]:
+        """行動カテゴリの一覧（名前での検索ができないため一覧ごとキャッシュする）"""
+        response = self.transport.get('search', {
+            'type': 'adTargetingCategory', 'class': 'behaviors', 'locale': self.locale
+        })
+        return [{'id': item.get('id'), 'name': item.get('name')} for item in response.get('data', [])]
+
+    def _best_match(self, candidates: List[Dict[str, Any]], name: str, exact: bool = False) -> Optional[Dict[str, Any]]:
+        """名前が完全一致（大文字小文字は区別しない）する候補、なければ検索結果の先頭の候補"""
+        lowered = name.lower()
+        for candidate in candidates:
+            if (candidate.get('name') or '').lower() == lowered:
+                return candidate
+        return candidates[0] if candidates and not exact else None
+
+_resolvers = {}
+_resolvers_lock = threading.Lock()
+
+def get_targeting_resolver(transport, access_token: str = None) -> TargetingResolver:
+    """アクセストークンごとにプロセス全体で共有するリゾルバーを取得"""
+    fingerprint = token_fingerprint(access_token or Config.META_ACCESS_TOKEN)
+    with _resolvers_lock:
+        if fingerprint not in _resolvers:
+            cache_file = os.path.join(Config.CACHE_DIR, f"targeting_{fingerprint}.json")
+            _resolvers[fingerprint] = TargetingResolver(
+                transport, AccountDirectory(
+                    cache_file, ttl=Config.TARGETING_CACHE_TTL, empty_ttl=Config.TARGETING_NOT_FOUND_TTL
+                )
+            )
+        return _resolvers[fingerprint]
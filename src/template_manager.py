@@ -67,7 +67,8 @@ class TemplateManager:
                 "auto_optimize": True,
                 "auto_bid": True,
                 "auto_schedule": True,
-                "auto_audience": True
+                "auto_audience": True,
+                "default_interests": []  # 例: ["Marketing", "Advertising"]（空なら興味・関心で絞り込まない）
             }
         }
     
@@ -198,8 +199,15 @@ class TemplateManager:
                 else:
                     self._replace_variables(value, variables, depth + 1, max_depth)
         elif isinstance(obj, list):
-            for item in obj:
-                self._replace_variables(item, variables, depth + 1, max_depth)
+            for index, item in enumerate(obj):
+                if isinstance(item, str) and '{' in item:
+                    # バリエーションのリストなど、リスト内の文字列も置換する
+                    try:
+                        obj[index] = item.format(**variables)
+                    except KeyError:
+                        pass
+                else:
+                    self._replace_variables(item, variables, depth + 1, max_depth)
     
     def _apply_auto_settings(self, template: Dict[str, Any]):
         """自動設定を適用"""
@@ -226,13 +234,89 @@ class TemplateManager:
             ad_set['bidding_strategy'] = 'LOWEST_COST_WITHOUT_CAP'
         
         if auto_settings.get('auto_audience'):
-            # デフォルトオーディエンス設定
-            if not ad_set['targeting'].get('interests'):
-                ad_set['targeting']['interests'] = [
-                    {'name': 'Marketing', 'id': '6003107902433'},
-                    {'name': 'Advertising', 'id': '6003348634581'}
-                ]
+            # デフォルトオーディエンス設定（名前は出稿時に TargetingResolver でIDに変換する）
+            # 配信対象を絞り込むため、default_interests を明示したテンプレートだけに適用する
+            default_interests = auto_settings.get('default_interests') or []
+            if default_interests and not ad_set['targeting'].get('interests'):
+                ad_set['targeting']['interests'] = list(default_interests)
+    
+    def build_chain_spec(self, account_id: str, template_data: Dict[str, Any]) -> Dict[str, Any]:
+        """適用済みテンプレートを MetaAdsClient.launch_chain 用のチェーン仕様に変換"""
+        ad_set = template_data['ad_set']
+        creative = template_data['creative']
+
+        return {
+            'account_id': account_id,
+            'campaign_name': template_data['campaign']['name_template'],
+            'budget_amount': ad_set['budget'],
+            'budget_type': ad_set.get('budget_type', 'daily'),
+            'ad_set_name': ad_set['name_template'],
+            'start_time': ad_set['start_time'],
+            'end_time': ad_set.get('end_time'),
+            'targeting': ad_set.get('targeting'),
+            'creative_name': creative['name_template'],
+            'headline': creative['headline_template'],
+            'description': creative['description_template'],
+            'url': creative['url_template'],
+            'video_id': creative.get('video_id'),
+            'variants': creative.get('variants'),
+            'ad_name': template_data['ad']['name_template']
+        }
+
+    def build_dynamic_spec(self, account_id: str, template_datas: List[Dict[str, Any]],
+                           campaign_name: str = None) -> Dict[str, Any]:
+        """複数の適用済みテンプレートの見出し・説明文・URLを、1つのダイナミッククリエイティブのチェーン仕様にまとめる
+        
+        先頭のテンプレートの予算・期間・ターゲティングを使い、各テンプレートの文言（と宣言済みの
+        バリエーション）を重複なしで variants に集める。
+        """
+        if not template_datas:
+            raise ValueError("バリエーションにするテンプレートがありません")
+        
+        variants = {'headlines': [], 'descriptions': [], 'urls': [], 'video_ids': []}
+        for template_data in template_datas:
+            creative = template_data['creative']
+            declared = creative.get('variants') or {}
+            variants['headlines'] += [creative['headline_template']] + list(declared.get('headlines') or [])
+            variants['descriptions'] += [creative['description_template']] + list(declared.get('descriptions') or [])
+            variants['urls'] += [creative['url_template']] + list(declared.get('urls') or [])
+            variants['video_ids'] += [creative.get('video_id')] + list(declared.get('video_ids') or [])
+        
+        spec = self.build_chain_spec(account_id, template_datas[0])
+        if campaign_name:
+            spec.update({
+                'campaign_name': campaign_name,
+                'ad_set_name': campaign_name,
+                'creative_name': f"{campaign_name}_Creative",
+                'ad_name': f"{campaign_name}_1"
+            })
+        spec['variants'] = {
+            key: list(dict.fromkeys(value for value in values if value)) for key, values in variants.items()
+        }
+        return spec
     
+    def build_fanout_tasks(self, template_name: str, account_ids: List[str], variables: Dict[str, str] = None,
+                           template_data: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """1つのテンプレートを複数の広告アカウントに展開する一括出稿タスクを構築
+        
+        template_data（適用・カスタマイズ済みのテンプレート）を渡した場合はそれを使い、
+        省略時は variables でテンプレートを適用する。重複したアカウントIDは1回だけ展開する。
+        """
+        if template_data is None:
+            template_data = self.apply_template(template_name, variables)
+            if not template_data:
+                raise ValueError(f"テンプレート '{template_name}' を適用できません")
+        
+        campaign_name = template_data['campaign']['name_template']
+        return [
+            {
+                'label': f"{campaign_name} ({account_id})",
+                'template_name': template_name,
+                'spec': self.build_chain_spec(account_id, template_data)
+            }
+            for account_id in dict.fromkeys(account_ids)
+        ]
+
     def create_template_from_campaign(self, campaign_data: Dict[str, Any], template_name: str) -> bool:
         """既存のキャンペーンデータからテンプレートを作成"""
         try:
@@ -0,0 +1,104 @@
+"""
+Google Drive の動画内容と Meta の動画IDの対応表
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Any
+
+from .config import Config
+from .directory_cache import token_fingerprint
+
+logger = logging.getLogger(__name__)
+
+def _normalize_account_id(account_id: str) -> str:
+    """'act_' 接頭辞の有無に関わらず同じキーになるよう正規化"""
+    account_id = str(account_id)
+    return account_id if account_id.startswith('act_') else f"act_{account_id}"
+
+class VideoIndex:
+    """Drive の md5Checksum と広告アカウントから、アップロード済みの Meta 動画を引く対応表
+
+    ファイル名やファイルIDではなく内容のチェックサムをキーにするため、
+    名前を変えたりコピーしたりした同じ動画もアップロードし直さずに済む。
+    エントリは {'video_id', 'status', 'drive_file_id', 'updated_at'}。
+    """
+
+    def __init__(self, index_file: str):
+        """初期化"""
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    @staticmethod
+    def key_for(md5_checksum: str, account_id: str) -> str:
+        """対応表のキー"""
+        return f"{_normalize_account_id(account_id)}:{md5_checksum}"
+
+    def get(self, md5_checksum: str, account_id: str) -> Optional[Dict[str, Any]]:
+        """アップロード済みの動画を取得"""
+        with self._lock:
+            entry = self._entries.get(self.key_for(md5_checksum, account_id))
+            return dict(entry) if entry else None
+
+    def put(self, md5_checksum: str, account_id: str, video_id: str, status: str = 'processing',
+            drive_file_id: str = None):
+        """アップロードした動画を記録"""
+        with self._lock:
+            self._entries[self.key_for(md5_checksum, account_id)] = {
+                'video_id': video_id,
+                'status': status,
+                'drive_file_id': drive_file_id,
+                'updated_at': time.time()
+            }
+            self._save()
+
+    def update_status(self, md5_checksum: str, account_id: str, status: str):
+        """Meta 上で確認した動画の処理状況を記録"""
+        with self._lock:
+            entry = self._entries.get(self.key_for(md5_checksum, account_id))
+            if entry:
+                entry['status'] = status
+                entry['updated_at'] = time.time()
+                self._save()
+
+    def forget(self, md5_checksum: str, account_id: str):
+        """使えなくなった動画を破棄"""
+        with self._lock:
+            if self._entries.pop(self.key_for(md5_checksum, account_id), None) is not None:
+                self._save()
+
+    def _load(self) -> Dict[str, Any]:
+        """ディスクから対応表を読み込み"""
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"動画対応表の読み込みエラー: {e}")
+        return {}
+
+    def _save(self):
+        """ディスクに対応表を書き込み（呼び出し側でロックを保持）"""
+        try:
+            os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+            tmp_file = f"{self.index_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            logger.warning(f"動画対応表の書き込みエラー: {e}")
+
+_video_indexes = {}
+_video_indexes_lock = threading.Lock()
+
+def get_video_index(access_token: str = None) -> VideoIndex:
+    """アクセストークンごとにプロセス全体で共有する動画対応表を取得"""
+    fingerprint = token_fingerprint(access_token or Config.META_ACCESS_TOKEN)
+    with _video_indexes_lock:
+        if fingerprint not in _video_indexes:
+            index_file = os.path.join(Config.CACHE_DIR, f"videos_{fingerprint}.json")
+            _video_indexes[fingerprint] = VideoIndex(index_file)
+        return _video_indexes[fingerprint]
@@ -0,0 +1,296 @@
+"""
+Google Drive から Meta への動画ストリーミング転送
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Any
+
+from .config import Config
+from .http_transport import get_transport, GraphAPIError
+from .video_index import get_video_index
+
+logger = logging.getLogger(__name__)
+
+class VideoTransferError(Exception):
+    """動画転送に失敗したことを表す例外"""
+
+class VideoTransfer:
+    """Google Drive の動画を Meta の分割アップロードセッション（start/transfer/finish）へ転送するクラス
+
+    Drive からは Meta が指定する範囲だけを Range 指定で読み、メモリ上に置くのは
+    送信中のチャンクと先読み中のチャンクのみ。チャンクごとにセッション状態を
+    ディスクへ保存するため、途中で止まった転送は最後に受理されたオフセットから再開できる。
+    アップロード済みの動画は md5Checksum と広告アカウントで対応表に記録し、再利用する。
+    """
+
+    def __init__(self, drive_manager, transport=None, state_dir: str = None, prefetch_chunks: int = None,
+                 video_index=None):
+        """初期化"""
+        self.drive_manager = drive_manager
+        self.transport = transport or get_transport()
+        self.state_dir = state_dir or Config.VIDEO_UPLOAD_STATE_DIR
+        self.prefetch_chunks = max(1, prefetch_chunks or Config.VIDEO_PREFETCH_CHUNKS)
+        self.video_index = video_index or get_video_index()
+
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        # Google Drive クライアントはスレッドセーフでないため、ファイル情報の取得は直列化してキャッシュする
+        self._drive_lock = threading.Lock()
+        self._metadata = {}
+
+    def transfer(self, drive_file_id: str, account_id: str, title: str = None) -> str:
+        """Drive の動画を広告アカウントにアップロードして Meta の動画IDを返す
+
+        同じ内容の動画がそのアカウントにアップロード済みならアップロードせずに再利用し、
+        同じ内容・同じアカウントの同時転送はまとめて1回だけ行う。
+        処理中の動画はクリエイティブに使えないため、Meta 側の処理が終わるまで待ってから返す。
+        """
+        metadata = self._get_metadata(drive_file_id)
+        md5_checksum = metadata.get('md5Checksum')
+
+        key = (md5_checksum or drive_file_id, account_id)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if md5_checksum:
+                video_id = self._reusable_video(md5_checksum, account_id)
+                # 確認中に対応表から外れた場合はアップロードし直す
+                entry = self.video_index.get(md5_checksum, account_id) if video_id else None
+                if entry:
+                    logger.info(f"アップロード済みの動画を再利用: {metadata['name']} (動画ID: {video_id})")
+                    if entry['status'] != 'ready':
+                        self._wait_until_ready(video_id, account_id, md5_checksum)
+                    return video_id
+
+            video_id = self._transfer(drive_file_id, account_id, metadata, title)
+            if md5_checksum:
+                self.video_index.put(md5_checksum, account_id, video_id, 'processing', drive_file_id)
+            self._wait_until_ready(video_id, account_id, md5_checksum)
+            return video_id
+
+    def _wait_until_ready(self, video_id: str, account_id: str, md5_checksum: str = None):
+        """動画の処理（status.video_status）が ready になるまで間隔を広げながら待機
+
+        処理に失敗した・制限時間内に終わらない場合は VideoTransferError。
+        """
+        deadline = time.monotonic() + Config.VIDEO_READY_TIMEOUT
+        interval = Config.VIDEO_READY_POLL_INTERVAL
+        while True:
+            video = self.transport.get(video_id, {'fields': 'id,status'}, account_id=account_id)
+            status = (video.get('status') or {}).get('video_status', 'processing')
+            if status == 'ready':
+                if md5_checksum:
+                    self.video_index.update_status(md5_checksum, account_id, status)
+                return
+            if status == 'error':
+                if md5_checksum:
+                    self.video_index.forget(md5_checksum, account_id)
+                raise VideoTransferError(f"Meta 側で動画の処理に失敗しました: {video_id}")
+
+            if time.monotonic() + interval > deadline:
+                raise VideoTransferError(f"動画の処理が制限時間内に完了しませんでした: {video_id} ({status})")
+
+            logger.info(f"動画の処理待ち: {video_id} ({status})")
+            time.sleep(interval)
+            interval = min(interval * 2, Config.VIDEO_READY_MAX_POLL_INTERVAL)
+
+    def _get_metadata(self, drive_file_id: str) -> Dict[str, Any]:
+        """Drive のファイル情報を取得"""
+        if not self.drive_manager:
+            raise VideoTransferError("Google Drive が設定されていません")
+
+        with self._drive_lock:
+            if drive_file_id not in self._metadata:
+                metadata = self.drive_manager.get_file_metadata(drive_file_id)
+                if not metadata or not metadata['size']:
+                    raise VideoTransferError(f"Google Drive の動画情報を取得できません: {drive_file_id}")
+                self._metadata[drive_file_id] = metadata
+            return self._metadata[drive_file_id]
+
+    def _reusable_video(self, md5_checksum: str, account_id: str) -> Optional[str]:
+        """対応表にある動画がアカウント上で使用可能ならその動画IDを返す"""
+        entry = self.video_index.get(md5_checksum, account_id)
+        if not entry:
+            return None
+
+        if entry['status'] == 'ready' and time.time() - entry['updated_at'] < Config.VIDEO_INDEX_VERIFY_TTL:
+            return entry['video_id']
+
+        # 処理中のもの・一定時間確認していないものは Meta 上の状態を確認する
+        try:
+            video = self.transport.get(entry['video_id'], {'fields': 'id,status'}, account_id=account_id)
+        except GraphAPIError as e:
+            if e.http_status is not None and not e.is_transient:
+                logger.info(f"アップロード済みの動画が使用できないため再アップロードします: {entry['video_id']} ({e})")
+                self.video_index.forget(md5_checksum, account_id)
+                return None
+            return entry['video_id']
+
+        status = (video.get('status') or {}).get('video_status', 'processing')
+        if status == 'error':
+            logger.info(f"アップロード済みの動画の処理に失敗しているため再アップロードします: {entry['video_id']}")
+            self.video_index.forget(md5_checksum, account_id)
+            return None
+
+        self.video_index.update_status(md5_checksum, account_id, status)
+        return entry['video_id']
+
+    def _transfer(self, drive_file_id: str, account_id: str, metadata: Dict[str, Any], title: str = None) -> str:
+        """アップロードセッションを開始（または再開）して転送を完了させる"""
+        state_file = os.path.join(self.state_dir, f"{account_id}_{drive_file_id}.json")
+        state = self._load_state(state_file)
+
+        if state and (state['file_size'] != metadata['size'] or state.get('md5') != metadata.get('md5Checksum')):
+            logger.info(f"Drive 上の動画が更新されたため新しいセッションで転送します: {metadata['name']}")
+            state = None
+
+        if state:
+            logger.info(f"中断した動画転送を再開します: {metadata['name']} ({state['start_offset']}/{state['file_size']} バイト)")
+            try:
+                self._upload_chunks(state, state_file)
+            except GraphAPIError as e:
+                if e.http_status is None or e.is_transient:
+                    raise
+                # セッションの期限切れなどで再開できない場合は最初からやり直す
+                logger.warning(f"アップロードセッションを再開できないため最初から転送します: {e}")
+                state = None
+
+        if not state:
+            state = self._start(drive_file_id, account_id, metadata)
+            self._save_state(state_file, state)
+            self._upload_chunks(state, state_file)
+
+        self._finish(state, title or metadata['name'])
+        self._remove_state(state_file)
+
+        logger.info(f"動画転送完了: {metadata['name']} (動画ID: {state['video_id']})")
+        return state['video_id']
+
+    def _start(self, drive_file_id: str, account_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """アップロードセッションを開始"""
+        response = self.transport.post(
+            self._upload_url(account_id),
+            {'upload_phase': 'start', 'file_size': metadata['size']},
+            account_id=account_id
+        )
+        return {
+            'drive_file_id': drive_file_id,
+            'account_id': account_id,
+            'file_size': metadata['size'],
+            'md5': metadata.get('md5Checksum'),
+            'upload_session_id': response['upload_session_id'],
+            'video_id': response['video_id'],
+            'start_offset': int(response['start_offset']),
+            'end_offset': int(response['end_offset'])
+        }
+
+    def _upload_chunks(self, state: Dict[str, Any], state_file: str):
+        """Meta が指定する範囲を順に送信し、送信中に次の範囲を Drive から先読みする"""
+        drive_file_id = state['drive_file_id']
+        file_size = state['file_size']
+        executor = ThreadPoolExecutor(max_workers=self.prefetch_chunks)
+        prefetched = {}  # (start, end) -> Future
+
+        def read(start, end):
+            return self.drive_manager.read_range(drive_file_id, start, end)
+
+        try:
+            while state['start_offset'] < state['end_offset']:
+                start, end = state['start_offset'], state['end_offset']
+                future = prefetched.pop((start, end), None) or executor.submit(read, start, end)
+
+                # 次のチャンクも同じ大きさで続くと見込んで先読みする
+                chunk_size = end - start
+                for i in range(self.prefetch_chunks):
+                    next_start = end + i * chunk_size
+                    if next_start >= file_size:
+                        break
+                    next_range = (next_start, min(next_start + chunk_size, file_size))
+                    if next_range not in prefetched:
+                        prefetched[next_range] = executor.submit(read, *next_range)
+
+                response = self.transport.post(
+                    self._upload_url(state['account_id']),
+                    {
+                        'upload_phase': 'transfer',
+                        'upload_session_id': state['upload_session_id'],
+                        'start_offset': start
+                    },
+                    files={'video_file_chunk': ('chunk', future.result(), 'application/octet-stream')},
+                    account_id=state['account_id'],
+                    timeout=Config.VIDEO_CHUNK_TIMEOUT,
+                    retry=True  # 同じオフセットのチャンクは再送しても重複しない
+                )
+
+                state['start_offset'] = int(response['start_offset'])
+                state['end_offset'] = int(response['end_offset'])
+                self._save_state(state_file, state)
+                logger.info(f"動画転送中: {state['start_offset'] * 100 // file_size}% ({state['start_offset']}/{file_size} バイト)")
+
+                # 見込みと異なる範囲の先読みは破棄してメモリを解放する
+                for stale in [key for key in prefetched if key[0] < state['start_offset']]:
+                    prefetched.pop(stale).cancel()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, state: Dict[str, Any], title: str):
+        """アップロードセッションを完了"""
+        response = self.transport.post(
+            self._upload_url(state['account_id']),
+            {
+                'upload_phase': 'finish',
+                'upload_session_id': state['upload_session_id'],
+                'title': title
+            },
+            account_id=state['account_id']
+        )
+        if not response.get('success'):
+            raise VideoTransferError(f"動画アップロードを完了できませんでした: {response}")
+
+    def _upload_url(self, account_id: str) -> str:
+        """動画アップロード用エンドポイント"""
+        return f"{Config.GRAPH_VIDEO_URL.rstrip('/')}/{account_id}/advideos"
+
+    def _load_state(self, state_file: str) -> Optional[Dict[str, Any]]:
+        """保存されたセッション状態を読み込み"""
+        try:
+            if os.path.exists(state_file):
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"アップロードセッション状態の読み込みエラー: {e}")
+        return None
+
+    def _save_state(self, state_file: str, state: Dict[str, Any]):
+        """セッション状態を書き込み（書き込み途中で止まっても壊れないよう置き換える）"""
+        os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        tmp_file = f"{state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_file, state_file)
+
+    def _remove_state(self, state_file: str):
+        """完了したセッション状態を削除"""
+        try:
+            os.remove(state_file)
+        except FileNotFoundError:
+            pass
+
+_video_transfers = {}
+_video_transfers_lock = threading.Lock()
+
+def get_video_transfer(drive_manager) -> VideoTransfer:
+    """Google Drive マネージャーごとにプロセス全体で共有する転送クラスを取得
+
+    同じ動画の同時転送をまとめるロックは転送クラスごとに持つため、呼び出し元で共有する。
+    """
+    with _video_transfers_lock:
+        key = id(drive_manager)
+        if key not in _video_transfers or _video_transfers[key].drive_manager is not drive_manager:
+            _video_transfers[key] = VideoTransfer(drive_manager)
+        return _video_transfers[key]
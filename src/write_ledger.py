@@ -0,0 +1,132 @@
+"""
+書き込みリクエストの冪等キー台帳
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Any
+
+from .config import Config
+from .directory_cache import token_fingerprint
+
+logger = logging.getLogger(__name__)
+
+def _normalize_account_id(account_id: str) -> str:
+    """'act_' 接頭辞の有無に関わらず同じキーになるよう正規化"""
+    account_id = str(account_id)
+    return account_id if account_id.startswith('act_') else f"act_{account_id}"
+
+class WriteLedger:
+    """作成リクエストを送信する前に冪等キーを記録し、応答を確認できたら解決済みにする台帳
+
+    送信後に応答を受け取れないまま通信エラーやプロセス停止が起きた書き込みはキーが未解決のまま残る。
+    同じ内容を再送する前に未解決かどうかを確認し、未解決なら作成済みのオブジェクトを
+    名前で照合してから残りだけを送ることで、再試行による重複作成を防ぐ。
+    """
+
+    def __init__(self, ledger_file: str):
+        """初期化"""
+        self.ledger_file = ledger_file
+        os.makedirs(os.path.dirname(os.path.abspath(ledger_file)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> 送信時の記録
+        self._replay()
+
+    @staticmethod
+    def key_for(spec: Dict[str, Any]) -> str:
+        """作成内容から決まる冪等キー（作成済みIDの違いは無視する）"""
+        content = {key: value for key, value in spec.items() if key != 'existing_ids'}
+        payload = json.dumps(content, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+    def begin(self, key: str, account_id: str, campaign_name: str = None):
+        """送信前にキーを記録"""
+        with self._lock:
+            record = {'type': 'begin', 'key': key, 'account_id': account_id, 'campaign_name': campaign_name}
+            self._pending[key] = record
+            self._append(record)
+
+    def resolve(self, key: str):
+        """応答を確認できたキーを解決済みにする"""
+        with self._lock:
+            if self._pending.pop(key, None) is not None:
+                self._append({'type': 'resolved', 'key': key})
+
+    def is_pending(self, key: str) -> bool:
+        """送信したが結果を確認できていないキーか"""
+        with self._lock:
+            return key in self._pending
+
+    def has_pending_campaign(self, account_id: str, campaign_name: str) -> bool:
+        """同じアカウント・キャンペーン名で、結果を確認できていない書き込みがあるか
+
+        動画の転送前など、送信時と spec が異なりキーが一致しない段階での確認に使う。
+        """
+        with self._lock:
+            return bool(self._pending_keys(account_id, campaign_name))
+
+    def resolve_campaign(self, account_id: str, campaign_name: str):
+        """同じアカウント・キャンペーン名の未解決のキーをすべて解決済みにする（照合して送り直した後に呼ぶ）"""
+        with self._lock:
+            for key in self._pending_keys(account_id, campaign_name):
+                del self._pending[key]
+                self._append({'type': 'resolved', 'key': key})
+
+    def _pending_keys(self, account_id: str, campaign_name: str) -> List[str]:
+        """同じアカウント・キャンペーン名の未解決のキー（呼び出し側でロックを保持）"""
+        account_id, campaign_name = _normalize_account_id(account_id), (campaign_name or '').strip()
+        return [
+            key for key, record in self._pending.items()
+            if record.get('campaign_name') is not None
+            and _normalize_account_id(record.get('account_id')) == account_id
+            and record['campaign_name'].strip() == campaign_name
+        ]
+
+    def _append(self, record: Dict[str, Any]):
+        """レコードを追記してディスクに同期（呼び出し側でロックを保持）"""
+        record['timestamp'] = datetime.now().isoformat()
+        with open(self.ledger_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replay(self):
+        """既存の台帳から未解決のキーを復元し、解決済みの記録を取り除いて書き直す"""
+        if not os.path.exists(self.ledger_file):
+            return
+
+        with open(self.ledger_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('type') == 'begin':
+                    self._pending[record['key']] = record
+                elif record.get('type') == 'resolved':
+                    self._pending.pop(record.get('key'), None)
+
+        tmp_file = f"{self.ledger_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for record in self._pending.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.ledger_file)
+
+        if self._pending:
+            logger.info(f"結果を確認できていない書き込みが {len(self._pending)}件 あります（再送前に作成済みか照合します）")
+
+_write_ledgers = {}
+_write_ledgers_lock = threading.Lock()
+
+def get_write_ledger(access_token: str = None) -> WriteLedger:
+    """アクセストークンごとにプロセス全体で共有する台帳を取得"""
+    fingerprint = token_fingerprint(access_token or Config.META_ACCESS_TOKEN)
+    with _write_ledgers_lock:
+        if fingerprint not in _write_ledgers:
+            ledger_file = os.path.join(Config.CACHE_DIR, f"writes_{fingerprint}.jsonl")
+            _write_ledgers[fingerprint] = WriteLedger(ledger_file)
+        return _write_ledgers[fingerprint]
@@ -0,0 +1,94 @@
+"""
+テスト共通のフィクスチャ（擬似 Graph API トランスポートと MetaAdsClient）
+"""
+import itertools
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.circuit_breaker import CircuitBreaker
+from src.creative_cache import CreativeCache
+from src.directory_cache import AccountDirectory
+from src.meta_client import MetaAdsClient
+from src.name_index import CampaignNameIndex
+from src.object_mirror import ObjectMirror
+from src.rate_limiter import UsageThrottle
+from src.retry_policy import RetryPolicy
+from src.targeting_resolver import TargetingResolver
+from src.write_ledger import WriteLedger
+
+class FakeTransport:
+    """バッチ作成とキャンペーン・広告セット・広告の名前での一覧取得だけに応答する擬似トランスポート"""
+
+    def __init__(self):
+        self._ids = itertools.count(1000)
+        self.objects = {}  # (親のパス, 名前) -> {'id', 'name'}
+        self.batches = []
+
+    def add(self, path, name):
+        """作成済みのオブジェクトを登録"""
+        item = {'id': str(next(self._ids)), 'name': name}
+        self.objects[(path, name)] = item
+        return item['id']
+
+    def get_paged(self, path, params, account_id=None):
+        filtering = json.loads(params['filtering']) if params.get('filtering') else []
+        names = {rule['value'] for rule in filtering if rule.get('field') == 'name'}
+        for (parent, name), item in self.objects.items():
+            if parent == path and (not names or name in names):
+                yield dict(item)
+
+    def get(self, path, params=None, account_id=None):
+        return {}
+
+    def post(self, path, params, retry=False):
+        operations = json.loads(params['batch'])
+        self.batches.append(operations)
+        return [
+            {'code': 200, 'headers': [], 'body': json.dumps({'id': str(next(self._ids))})}
+            for _ in operations
+        ]
+
+@pytest.fixture
+def transport():
+    return FakeTransport()
+
+@pytest.fixture
+def client(tmp_path, transport):
+    """設定の検証・共有インスタンスを使わずに、一時ディレクトリの状態で MetaAdsClient を構築"""
+    client = MetaAdsClient.__new__(MetaAdsClient)
+    client._business = None
+    client.transport = transport
+    client.throttle = UsageThrottle()
+    client.creative_cache = CreativeCache(str(tmp_path / 'creatives.json'))
+    client.mirror = ObjectMirror(str(tmp_path / 'mirror.db'))
+    client.name_index = CampaignNameIndex()
+    client.retry_policy = RetryPolicy(max_attempts=1)
+    client.write_ledger = WriteLedger(str(tmp_path / 'ledger.jsonl'))
+    client.circuit_breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+    client.targeting_resolver = TargetingResolver(transport, AccountDirectory(str(tmp_path / 'targeting.json')))
+    return client
+
+@pytest.fixture
+def chain_spec():
+    """2件の広告を同じ広告セットに作成するチェーン"""
+    start = datetime.now() + timedelta(days=1)
+    return {
+        'account_id': 'act_1',
+        'campaign_name': 'テストキャンペーン',
+        'budget_amount': 1000,
+        'budget_type': 'daily',
+        'start_time': start.strftime('%Y-%m-%d'),
+        'end_time': (start + timedelta(days=7)).strftime('%Y-%m-%d'),
+        'headline': '見出し',
+        'description': '説明文',
+        'url': 'https://example.com',
+        'video_id': '111',
+        'page_id': '222',
+        'ads': [{}, {'headline': '見出し2', 'video_id': '333'}]
+    }
@@ -0,0 +1,44 @@
+"""
+一括出稿エンジンのチェーンのまとめ送信
+"""
+from src.bulk_launcher import BulkLauncher, row_to_task
+
+def _rows(count):
+    return [
+        {'キャンペーン名': f"一括{i}", '予算(円/日)': '1,000', '見出し': f"見出し{i}", '説明文': '説明文',
+         'URL': 'https://example.com'}
+        for i in range(count)
+    ]
+
+def test_rows_of_an_account_are_packed_into_one_batch(client, transport):
+    """同じ広告アカウントの行は、1回のバッチリクエストに複数チェーンを詰めて作成する"""
+    tasks = [row_to_task(row, 'act_1') for row in _rows(5)]
+
+    results = list(BulkLauncher(client).run(tasks))
+
+    assert all(result['success'] for result in results)
+    assert len(transport.batches) == 1
+    assert len(transport.batches[0]) == 5 * 4
+
+def test_groups_are_limited_by_chains_per_request(client, transport):
+    """まとめる行数の上限を超えた分は別のリクエストで作成する"""
+    tasks = [row_to_task(row, 'act_1') for row in _rows(5)]
+
+    results = list(BulkLauncher(client, chains_per_request=2).run(tasks))
+
+    assert sorted(result['index'] for result in results) == list(range(5))
+    assert all(result['success'] for result in results)
+    assert sorted(len(batch) // 4 for batch in transport.batches) == [1, 2, 2]
+
+def test_preflight_report_is_not_validated_again(client, transport, monkeypatch):
+    """呼び出し側の事前検証の結果を渡すと、その結果で行を弾き、検査は繰り返さない"""
+    tasks = [row_to_task(row, 'act_1') for row in _rows(3)]
+    preflight = {1: [{'field': 'url', 'message': '事前検証のエラー'}]}
+    monkeypatch.setattr('src.bulk_launcher.validate_specs', None)
+    monkeypatch.setattr('src.meta_client.validate_specs', None)
+
+    results = {result['index']: result for result in BulkLauncher(client).run(tasks, preflight=preflight)}
+
+    assert results[1]['error'] == '事前検証のエラー'
+    assert results[0]['success'] and results[2]['success']
+    assert len(transport.batches[0]) == 2 * 4
@@ -0,0 +1,34 @@
+"""
+チェーン作成とサーキットブレーカーの連携
+"""
+from src.circuit_breaker import HALF_OPEN
+
+def _open(breaker, account_id, endpoint):
+    """しきい値1回の失敗でブレーカーを開き、クールダウン0秒で次の確認時に半開きにする"""
+    breaker.record_failure(account_id, endpoint, 'テスト用のエラー')
+
+def test_multi_ad_chain_can_probe_half_open_circuit(client, transport, chain_spec):
+    """広告2件のチェーンでも、半開きのエンドポイントの試行として送信でき、成功すれば閉じる"""
+    breaker = client.circuit_breaker
+    for endpoint in ('adcreatives', 'ads'):
+        _open(breaker, 'act_1', endpoint)
+
+    result = client.launch_chain(chain_spec)
+
+    assert {'creative', 'creative_2', 'ad', 'ad_2'} <= set(result)
+    assert len(transport.batches) == 1
+    assert breaker.open_circuits() == {}
+
+def test_half_open_endpoint_is_acquired_once_per_chain(client, chain_spec):
+    """半開きのエンドポイントは、同じエンドポイントのステップが複数あっても1回だけ試行枠を取る"""
+    breaker = client.circuit_breaker
+    _open(breaker, 'act_1', 'ads')
+
+    steps = ['campaign', 'ad_set', 'creative', 'ad', 'creative_2', 'ad_2']
+    assert client._acquire_circuits(chain_spec, steps) is None
+    assert breaker._circuits[('act_1', 'ads')]['state'] == HALF_OPEN
+
+    # 試行中は別のチェーンを通さない
+    assert client._acquire_circuits(chain_spec, steps) is not None
+    client._release_circuits(chain_spec, steps)
+    assert client._acquire_circuits(chain_spec, steps) is None
@@ -0,0 +1,42 @@
+"""
+キャンペーン名の重複確認と、結果を確認できなかった送信の引き継ぎ
+"""
+import pytest
+
+from src.meta_client import ChainLaunchError
+from src.write_ledger import WriteLedger
+
+def _crash_after_send(client, transport, spec):
+    """キャンペーンと広告セットの作成後、応答を確認する前に止まった状態を再現"""
+    campaign_id = transport.add('act_1/campaigns', spec['campaign_name'])
+    ad_set_id = transport.add(f"{campaign_id}/adsets", spec['campaign_name'])
+    # 送信時は動画転送後の spec のため、転送前の spec とはキーが一致しない
+    sent = dict(spec, video_id='999')
+    client.write_ledger.begin(WriteLedger.key_for(sent), 'act_1', spec['campaign_name'])
+    return campaign_id, ad_set_id
+
+def test_existing_name_is_duplicate(client, transport, chain_spec):
+    """未解決の送信がなければ、アカウントにある名前は重複として弾く"""
+    transport.add('act_1/campaigns', chain_spec['campaign_name'])
+
+    assert client.find_duplicate_names([chain_spec]) == [0]
+    with pytest.raises(ChainLaunchError):
+        client.check_campaign_name('act_1', chain_spec['campaign_name'])
+
+def test_pending_write_is_reconciled_instead_of_rejected(client, transport, chain_spec):
+    """前回の送信が未解決の行は重複として弾かず、作成済みのキャンペーン・広告セットを引き継いで残りを作成する"""
+    campaign_id, ad_set_id = _crash_after_send(client, transport, chain_spec)
+
+    assert client.find_duplicate_names([chain_spec, dict(chain_spec)]) == [1]
+    client.check_campaign_name('act_1', chain_spec['campaign_name'])
+
+    result = client.launch_chain(chain_spec)
+
+    assert result['campaign']['id'] == campaign_id
+    assert result['ad_set']['id'] == ad_set_id
+    sent_urls = [operation['relative_url'] for operation in transport.batches[-1]]
+    assert 'act_1/campaigns' not in sent_urls and 'act_1/adsets' not in sent_urls
+    assert not client.write_ledger.has_pending_campaign('act_1', chain_spec['campaign_name'])
+
+    # 解決後は通常どおり重複として弾く
+    assert client.find_duplicate_names([chain_spec]) == [0]
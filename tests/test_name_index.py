@@ -0,0 +1,27 @@
+"""
+キャンペーン名インデックスの再構築
+"""
+from src.name_index import CampaignNameIndex
+
+def test_rewarm_drops_names_missing_from_listing():
+    """再構築では一覧で置き換え、削除・名前変更されたキャンペーンの名前を外す"""
+    index = CampaignNameIndex(ttl=0)
+    index.warm('act_1', lambda: ['A', 'B'])
+    assert index.contains('1', 'B')
+
+    index.warm('act_1', lambda: ['A'])
+    assert index.contains('act_1', 'A')
+    assert not index.contains('act_1', 'B')
+
+def test_rewarm_keeps_names_reserved_while_loading():
+    """一覧の取得中に予約された名前は、一覧になくても残す"""
+    index = CampaignNameIndex(ttl=0)
+    index.warm('act_1', lambda: ['A'])
+
+    def loader():
+        assert index.reserve('act_1', 'C')
+        return ['A']
+
+    index.warm('act_1', loader)
+    assert index.contains('act_1', 'C')
+    assert not index.reserve('act_1', 'C')
@@ -0,0 +1,36 @@
+"""
+ターゲティング名の検索結果のキャッシュ
+"""
+from src.directory_cache import AccountDirectory
+from src.targeting_resolver import TargetingResolver
+
+class SearchTransport:
+    """/search の呼び出し回数を数え、登録した名前だけを返す擬似トランスポート"""
+
+    def __init__(self, known=()):
+        self.known = set(known)
+        self.calls = 0
+
+    def get(self, path, params=None, account_id=None):
+        self.calls += 1
+        if params['q'] in self.known:
+            return {'data': [{'id': '6003', 'name': params['q']}]}
+        return {'data': []}
+
+def test_unresolved_name_is_cached_until_empty_ttl(tmp_path):
+    """見つからなかった名前も保存して検索し直さず、短い有効期限が切れたら検索し直す"""
+    transport = SearchTransport()
+    cache = AccountDirectory(str(tmp_path / 'targeting.json'), ttl=3600, empty_ttl=60)
+    resolver = TargetingResolver(transport, cache)
+    name = ('adinterest', '存在しない興味')
+
+    assert resolver.resolve_names([name]) == {name: None}
+    assert resolver.resolve_names([name]) == {name: None}
+    assert transport.calls == 1
+
+    # 有効期限切れ（見つかるようになった名前）は次の取得時に検索し直す
+    for entry in cache._entries.values():
+        entry['fetched_at'] -= 61
+    transport.known.add(name[1])
+    assert resolver.resolve_names([name])[name]['id'] == '6003'
+    assert transport.calls == 2
@@ -0,0 +1,23 @@
+"""
+動画転送の再利用と処理待ち
+"""
+from src.video_index import VideoIndex
+from src.video_transfer import VideoTransfer
+
+class FakeDrive:
+    def get_file_metadata(self, file_id):
+        return {'id': file_id, 'name': 'video.mp4', 'size': 10, 'md5Checksum': 'abc'}
+
+class ReadyTransport:
+    def get(self, path, params=None, account_id=None):
+        return {'id': path, 'status': {'video_status': 'ready'}}
+
+def test_missing_index_entry_falls_back_to_upload(tmp_path, monkeypatch):
+    """再利用の確認中に対応表のエントリがなくなった場合は、例外にせずアップロードし直す"""
+    transfer = VideoTransfer(FakeDrive(), transport=ReadyTransport(), state_dir=str(tmp_path),
+                             video_index=VideoIndex(str(tmp_path / 'videos.json')))
+    monkeypatch.setattr(transfer, '_reusable_video', lambda md5_checksum, account_id: 'old')
+    monkeypatch.setattr(transfer, '_transfer', lambda *args: 'new')
+
+    assert transfer.transfer('file', 'act_1') == 'new'
+    assert transfer.video_index.get('abc', 'act_1')['status'] == 'ready'
@@ -6,7 +6,6 @@ import streamlit as st
 import sys
 import os
 from datetime import datetime, timedelta
-import pandas as pd
 from dotenv import load_dotenv
 
 # .envファイルを読み込み
@@ -15,10 +14,14 @@ load_dotenv()
 # プロジェクトルートをパスに追加
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.meta_client import MetaAdsClient
+from src.meta_client import MetaAdsClient, chain_object_ids
 from src.template_manager import TemplateManager
 from src.google_drive_manager import GoogleDriveManager
 from src.logger import AdLogger
+from src.bulk_launcher import BulkLauncher, row_to_task, account_result_table
+from src.preflight import validate_specs, error_table
+from src.launch_journal import LaunchJournal
+from src.video_transfer import get_video_transfer
 
 # ページ設定
 st.set_page_config(
@@ -37,8 +40,8 @@ if 'drive_manager' not in st.session_state:
     st.session_state.drive_manager = None
 if 'logger' not in st.session_state:
     st.session_state.logger = None
-if 'selected_video' not in st.session_state:
-    st.session_state.selected_video = None
+if 'selected_videos' not in st.session_state:
+    st.session_state.selected_videos = []  # 選択順。2本目以降は同じ広告セットに広告を追加
 if 'video_search_results' not in st.session_state:
     st.session_state.video_search_results = []
 
@@ -73,6 +76,13 @@ def main():
                 else:
                     st.error("❌ サービス初期化に失敗しました")
         
+        if st.session_state.meta_client is not None:
+            if st.button("🔄 アカウント・ページ一覧を更新"):
+                with st.spinner("アカウント・ページ一覧を取得中..."):
+                    st.session_state.meta_client.directory.invalidate()
+                    st.session_state.meta_client.get_ad_accounts(refresh=True)
+                    st.success("✅ アカウント・ページ一覧を更新しました")
+        
         # サービス状態表示
         st.subheader("📊 サービス状態")
         services_status = {
@@ -165,8 +175,10 @@ def video_search_section():
                 st.write(f"サイズ: {video['size']} | 作成日: {video['created_time'][:10]}")
             
             with col2:
-                if st.button(f"選択", key=f"select_video_{i}"):
-                    st.session_state.selected_video = video
+                selected_ids = [selected['id'] for selected in st.session_state.selected_videos]
+                label = "選択" if not selected_ids else "追加"
+                if video['id'] not in selected_ids and st.button(label, key=f"select_video_{i}"):
+                    st.session_state.selected_videos.append(video)
                     st.success(f"✅ 選択しました: {video['name']}")
                     st.rerun()
             
@@ -175,10 +187,13 @@ def video_search_section():
                     st.info(f"プレビュー: {video['web_view_link']}")
     
     # 選択された動画の表示
-    if st.session_state.selected_video:
-        st.success(f"🎬 選択中の動画: **{st.session_state.selected_video['name']}**")
+    if st.session_state.selected_videos:
+        names = ', '.join(f"**{video['name']}**" for video in st.session_state.selected_videos)
+        st.success(f"🎬 選択中の動画: {names}")
+        if len(st.session_state.selected_videos) > 1:
+            st.info("💡 同じ広告セットに、動画ごとの広告を作成します")
         if st.button("❌ 選択を解除"):
-            st.session_state.selected_video = None
+            st.session_state.selected_videos = []
             st.rerun()
 
 def single_campaign_form():
@@ -319,9 +334,9 @@ def single_campaign_form():
         # 動画選択状況の表示
         st.subheader("🎬 動画選択状況")
         
-        if st.session_state.selected_video:
-            st.success(f"✅ 選択済み: {st.session_state.selected_video['name']}")
-            video_id = st.session_state.selected_video['id']
+        if st.session_state.selected_videos:
+            st.success(f"✅ 選択済み: {', '.join(video['name'] for video in st.session_state.selected_videos)}")
+            video_id = st.session_state.selected_videos[0]['id']
         else:
             st.info("💡 上記の動画検索セクションで動画を選択してください")
             video_id = None
@@ -381,8 +396,8 @@ def single_campaign_form():
                 return
             
             # 広告名の自動生成（動画名を使用）
-            if st.session_state.selected_video:
-                ad_name = st.session_state.selected_video['name']  # 動画名を広告名に使用
+            if st.session_state.selected_videos:
+                ad_name = st.session_state.selected_videos[0]['name']  # 動画名を広告名に使用
             else:
                 ad_name = f"{campaign_name}_1"  # 動画がない場合はキャンペーン名_1
             
@@ -400,7 +415,8 @@ def single_campaign_form():
                 video_id=video_id,
                 dataset_id=dataset_id,
                 page_id=page_id,
-                ad_name=ad_name
+                ad_name=ad_name,
+                extra_videos=st.session_state.selected_videos[1:]
             )
 
 def batch_campaign_form():
@@ -578,61 +594,41 @@ def multi_campaign_form():
                 })
     
     # 一括作成実行
+    resume = st.checkbox("前回の中断から再開する", value=True, key="multi_resume",
+                         help="同じ内容で中断した一括作成があれば、完了済みの行をスキップし途中の行は作成済みのステップから再開します")
     if st.button("🚀 複数キャンペーンを同時作成", type="primary", disabled=len(campaigns_data) == 0):
         if len(campaigns_data) == 0:
             st.warning("⚠️ 少なくとも1つのキャンペーン名を入力してください")
             return
         
+        tasks = []
+        for campaign_data in campaigns_data:
+            tasks.append({
+                'label': campaign_data['campaign_name'],
+                'spec': {
+                    'account_id': account_id,
+                    'campaign_name': campaign_data['campaign_name'],
+                    'budget_amount': campaign_data['budget'],
+                    'budget_type': 'daily',
+                    'ad_set_name': campaign_data['campaign_name'],
+                    'start_time': campaign_data['start_date'],
+                    'end_time': campaign_data['end_date'],
+                    'creative_name': f"{campaign_data['campaign_name']}_Creative",
+                    'headline': campaign_data['headline'],
+                    'description': campaign_data['description'],
+                    'url': campaign_data['url'],
+                    'drive_file_id': campaign_data['video_id'],
+                    'ad_name': f"{campaign_data['campaign_name']}_1"
+                }
+            })
+        
         with st.spinner("複数キャンペーンを作成中..."):
-            success_count = 0
-            error_count = 0
-            created_campaigns = []
-            
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            for i, campaign_data in enumerate(campaigns_data):
-                status_text.text(f"処理中: {campaign_data['campaign_name']} ({i+1}/{len(campaigns_data)})")
-                
-                try:
-                    success = create_campaign(
-                        account_id=account_id,
-                        campaign_name=campaign_data['campaign_name'],
-                        objective=campaign_data['objective'],
-                        budget=campaign_data['budget'],
-                        start_date=campaign_data['start_date'],
-                        end_date=campaign_data['end_date'],
-                        headline=campaign_data['headline'],
-                        description=campaign_data['description'],
-                        url=campaign_data['url'],
-                        video_id=campaign_data['video_id'],
-                        show_success=False
-                    )
-                    
-                    if success:
-                        success_count += 1
-                        created_campaigns.append(campaign_data['campaign_name'])
-                    else:
-                        error_count += 1
-                        
-                except Exception as e:
-                    st.error(f"エラー: {campaign_data['campaign_name']} - {e}")
-                    error_count += 1
-                
-                progress_bar.progress((i + 1) / len(campaigns_data))
-            
-            status_text.text("完了")
-            
-            # 結果表示
-            st.success(f"✅ 一括作成完了: 成功 {success_count}件, エラー {error_count}件")
-            
-            if created_campaigns:
-                st.subheader("📋 作成されたキャンペーン")
-                for campaign_name in created_campaigns:
-                    st.success(f"✅ {campaign_name}")
+            run_bulk_launch(tasks, resume=resume)
 
 def csv_batch_form():
     """CSV一括作成フォーム"""
+    import pandas as pd  # CSV を扱う画面でのみ読み込む（初回表示を速くするため）
+    
     st.info("💡 CSVファイルで一括作成できます")
     
     # サンプルCSVダウンロード
@@ -646,7 +642,8 @@ def csv_batch_form():
         '見出し': ['【商品A】特別価格！', '【商品B】限定セール！', '【商品C】新商品登場！'],
         '説明文': ['お得な情報をお見逃しなく！', '数量限定！今すぐチェック！', '今だけの特別価格でお試しください！'],
         'URL': ['https://example.com/product-a', 'https://example.com/product-b', 'https://example.com/product-c'],
-        '動画名': ['商品A動画', '商品B動画', '']
+        '動画名': ['商品A動画', '商品B動画', ''],
+        '動画名2': ['商品A動画_縦型', '', '']  # 2本目以降の動画は同じ広告セットに広告を追加
     }
     
     sample_df = pd.DataFrame(sample_data)
@@ -690,60 +687,14 @@ def csv_batch_form():
                 return
             
             # 一括作成実行
+            resume = st.checkbox("前回の中断から再開する", value=True, key="csv_resume",
+                                 help="同じ内容で中断した一括作成があれば、完了済みの行をスキップし途中の行は作成済みのステップから再開します")
             if st.button("🚀 CSV一括作成を実行", type="primary"):
+                rows = df.astype(object).where(pd.notna(df), None).to_dict('records')
+                tasks = [row_to_task(row, account_id) for row in rows]
+                
                 with st.spinner("一括作成中..."):
-                    success_count = 0
-                    error_count = 0
-                    created_campaigns = []
-                    
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    for i, row in df.iterrows():
-                        status_text.text(f"処理中: {row['キャンペーン名']} ({i+1}/{len(df)})")
-                        
-                        try:
-                            # 動画検索
-                            video_id = None
-                            if row.get('動画名') and pd.notna(row['動画名']):
-                                videos = st.session_state.drive_manager.search_videos_by_name(str(row['動画名']))
-                                if videos:
-                                    video_id = videos[0]['id']
-                            
-                            # キャンペーン作成
-                            success = create_campaign(
-                                account_id=account_id,
-                                campaign_name=row['キャンペーン名'],
-                                objective=row['目的'],
-                                budget=float(row['予算(円/日)']),
-                                start_date=row['開始日'],
-                                end_date=row['終了日'],
-                                headline=row['見出し'],
-                                description=row['説明文'],
-                                url=row['URL'],
-                                video_id=video_id,
-                                show_success=False
-                            )
-                            
-                            if success:
-                                success_count += 1
-                                created_campaigns.append(row['キャンペーン名'])
-                            else:
-                                error_count += 1
-                                
-                        except Exception as e:
-                            st.error(f"エラー: {row['キャンペーン名']} - {e}")
-                            error_count += 1
-                        
-                        progress_bar.progress((i + 1) / len(df))
-                    
-                    status_text.text("完了")
-                    st.success(f"✅ 一括作成完了: 成功 {success_count}件, エラー {error_count}件")
-                    
-                    if created_campaigns:
-                        st.subheader("📋 作成されたキャンペーン")
-                        for campaign_name in created_campaigns:
-                            st.success(f"✅ {campaign_name}")
+                    run_bulk_launch(tasks, resume=resume)
                     
         except Exception as e:
             st.error(f"CSV読み込みエラー: {e}")
@@ -833,58 +784,56 @@ def template_batch_form():
                 product_names.append(f"商品{i+1}")
         
         # 一括作成実行
+        dynamic = st.checkbox(
+            "🧪 A/Bテスト: 1つの広告セットのダイナミッククリエイティブにまとめる",
+            help="商品ごとの見出し・説明文・URLをバリエーションとして1つのクリエイティブに入れ、"
+                 "キャンペーン・広告セット・クリエイティブ・広告を1件ずつだけ作成します（見出し・説明文は5件まで）"
+        )
+        resume = st.checkbox("前回の中断から再開する", value=True, key="template_resume",
+                             help="同じ内容で中断した一括作成があれば、完了済みの行をスキップし途中の行は作成済みのステップから再開します")
         if st.button("🚀 テンプレート一括作成を実行", type="primary"):
-            with st.spinner("テンプレート一括作成中..."):
-                success_count = 0
-                error_count = 0
-                created_campaigns = []
+            tasks = []
+            applied_templates = []
+            for i in range(num_campaigns):
+                product_name = product_names[i] if i < len(product_names) else f"商品{i+1}"
+                campaign_name = f"{product_name}_キャンペーン_{datetime.now().strftime('%Y%m%d')}"
                 
-                progress_bar = st.progress(0)
-                status_text = st.empty()
+                # テンプレート適用
+                variables = {
+                    'campaign_name': campaign_name,
+                    'product_name': product_name,
+                    'current_date': datetime.now().strftime('%Y-%m-%d')
+                }
                 
-                for i in range(num_campaigns):
-                    product_name = product_names[i] if i < len(product_names) else f"商品{i+1}"
-                    campaign_name = f"{product_name}_キャンペーン_{datetime.now().strftime('%Y%m%d')}"
-                    
-                    status_text.text(f"処理中: {campaign_name} ({i+1}/{num_campaigns})")
-                    
-                    try:
-                        # テンプレート適用
-                        variables = {
-                            'campaign_name': campaign_name,
-                            'product_name': product_name,
-                            'current_date': datetime.now().strftime('%Y-%m-%d')
-                        }
-                        
-                        applied_template = st.session_state.template_manager.apply_template(selected_template, variables)
-                        
-                        # カスタマイズ値を適用
-                        applied_template['ad_set']['budget'] = common_budget
-                        applied_template['ad_set']['start_time'] = common_start_date.strftime('%Y-%m-%d')
-                        applied_template['ad_set']['end_time'] = common_end_date.strftime('%Y-%m-%d')
-                        
-                        # キャンペーン作成実行
-                        success = create_campaign_from_template(account_id, applied_template, show_success=False)
-                        
-                        if success:
-                            success_count += 1
-                            created_campaigns.append(campaign_name)
-                        else:
-                            error_count += 1
-                            
-                    except Exception as e:
-                        st.error(f"エラー: {campaign_name} - {e}")
-                        error_count += 1
-                    
-                    progress_bar.progress((i + 1) / num_campaigns)
+                applied_template = st.session_state.template_manager.apply_template(selected_template, variables)
+                if not applied_template:
+                    st.error(f"エラー: {campaign_name} - テンプレートを適用できません")
+                    continue
                 
-                status_text.text("完了")
-                st.success(f"✅ テンプレート一括作成完了: 成功 {success_count}件, エラー {error_count}件")
+                # カスタマイズ値を適用
+                applied_template['ad_set']['budget'] = common_budget
+                applied_template['ad_set']['start_time'] = common_start_date.strftime('%Y-%m-%d')
+                applied_template['ad_set']['end_time'] = common_end_date.strftime('%Y-%m-%d')
+                applied_templates.append(applied_template)
                 
-                if created_campaigns:
-                    st.subheader("📋 作成されたキャンペーン")
-                    for campaign_name in created_campaigns:
-                        st.success(f"✅ {campaign_name}")
+                tasks.append({
+                    'label': campaign_name,
+                    'template_name': selected_template,
+                    'spec': st.session_state.template_manager.build_chain_spec(account_id, applied_template)
+                })
+            
+            if dynamic and applied_templates:
+                campaign_name = f"{selected_template}_ABテスト_{datetime.now().strftime('%Y%m%d')}"
+                tasks = [{
+                    'label': campaign_name,
+                    'template_name': selected_template,
+                    'spec': st.session_state.template_manager.build_dynamic_spec(
+                        account_id, applied_templates, campaign_name
+                    )
+                }]
+            
+            with st.spinner("テンプレート一括作成中..."):
+                run_bulk_launch(tasks, title="テンプレート一括作成", resume=resume)
     
     except Exception as e:
         st.error(f"テンプレート取得エラー: {e}")
@@ -945,6 +894,12 @@ def template_campaign_form():
                         help="Business Manager配下の広告アカウントから選択"
                     )
                     account_id = account_options[selected_account]
+                    
+                    fanout_accounts = st.multiselect(
+                        "追加の展開先アカウント（任意）",
+                        options=[name for name in account_options if name != selected_account],
+                        help="選択したアカウントすべてに同じテンプレートのキャンペーンを並列作成"
+                    )
                 except Exception as e:
                     st.error(f"アカウント取得エラー: {e}")
                     return
@@ -1000,7 +955,17 @@ def template_campaign_form():
                     applied_template['ad_set']['end_time'] = custom_end_date.strftime('%Y-%m-%d')
                     
                     # キャンペーン作成実行
-                    create_campaign_from_template(account_id, applied_template)
+                    if fanout_accounts:
+                        account_ids = [account_id] + [account_options[name] for name in fanout_accounts]
+                        tasks = st.session_state.template_manager.build_fanout_tasks(
+                            selected_template, account_ids, template_data=applied_template
+                        )
+                        results = run_bulk_launch(tasks, title="複数アカウント展開")
+                        if results:
+                            st.subheader("📊 アカウント別の結果")
+                            st.dataframe(account_result_table(results), use_container_width=True)
+                    else:
+                        create_campaign_from_template(account_id, applied_template)
                     
                 except Exception as e:
                     st.error(f"テンプレート適用エラー: {e}")
@@ -1008,52 +973,129 @@ def template_campaign_form():
     except Exception as e:
         st.error(f"テンプレート取得エラー: {e}")
 
+def run_bulk_launch(tasks, title="一括作成", resume=True):
+    """一括出稿エンジンでタスクを並列実行し、完了順に進捗を表示
+    
+    resume=True の場合は同じ内容のジョブのジャーナルを引き継いで再開する。
+    """
+    if not tasks:
+        st.warning("⚠️ 作成対象のキャンペーンがありません")
+        return []
+    
+    # 入力誤りは API を呼ぶ前に全行まとめて表示する（該当行は作成しない）
+    report = validate_specs([task['spec'] for task in tasks])
+    if report:
+        st.warning(f"⚠️ {len(report)}件の行に入力エラーがあります（これらの行は作成しません）")
+        st.dataframe(error_table(report, [task['label'] for task in tasks]), use_container_width=True)
+    
+    launcher = BulkLauncher(
+        st.session_state.meta_client,
+        logger=st.session_state.logger,
+        drive_manager=st.session_state.drive_manager
+    )
+    
+    job_id = LaunchJournal.job_id_for([task['spec'] for task in tasks])
+    if not resume:
+        job_id = f"{job_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    journal = LaunchJournal(job_id)
+    
+    summary = journal.summary()
+    if summary['done'] or summary['partial']:
+        st.info(f"🔁 前回のジョブを再開します: 完了済み {summary['done']}件, 途中 {summary['partial']}件")
+    
+    success_count = 0
+    skipped_count = 0
+    error_count = 0
+    created_campaigns = []
+    results = []
+    
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    for completed, result in enumerate(launcher.run(tasks, journal=journal, preflight=report), 1):
+        results.append(result)
+        if result['skipped']:
+            skipped_count += 1
+        elif result['success']:
+            success_count += 1
+            created_campaigns.append(result['label'])
+        else:
+            error_count += 1
+            # 入力エラーの行は上の一覧で表示済み
+            if result['index'] not in report:
+                st.error(f"エラー: {result['label']} - {result['error']}")
+        
+        status_text.text(f"完了: {result['label']} ({completed}/{len(tasks)})")
+        progress_bar.progress(completed / len(tasks))
+    
+    status_text.text("完了")
+    st.success(f"✅ {title}完了: 成功 {success_count}件, スキップ {skipped_count}件, エラー {error_count}件")
+    if error_count:
+        st.info("💡 同じ内容で再実行すると、失敗した行だけを作成済みのステップから再開します")
+    
+    if created_campaigns:
+        st.subheader("📋 作成されたキャンペーン")
+        for campaign_name in created_campaigns:
+            st.success(f"✅ {campaign_name}")
+    
+    return results
+
 def create_campaign(account_id, campaign_name, budget_amount, budget_type, start_date, end_date, 
-                   headline, description, url, video_id=None, dataset_id=None, page_id=None, ad_name=None, show_success=True):
-    """キャンペーン作成（新しい設定対応）"""
+                   headline, description, url, video_id=None, dataset_id=None, page_id=None, ad_name=None, show_success=True,
+                   extra_videos=None):
+    """キャンペーン作成（新しい設定対応）
+    
+    extra_videos（Google Drive の動画 {'id', 'name'} のリスト）を渡すと、同じ広告セットに動画ごとの広告を追加する。
+    """
     try:
         with st.spinner("キャンペーンを作成中..."):
-            # キャンペーン作成（売上目的固定）
-            campaign = st.session_state.meta_client.create_campaign(
-                account_id, campaign_name, budget_amount, budget_type
-            )
-            
-            # 広告セット作成（固定設定多数）
-            ad_set_name = campaign_name  # キャンペーン名と同じ
-            ad_set = st.session_state.meta_client.create_ad_set(
-                account_id, campaign['id'], ad_set_name,
-                budget_amount, start_date, end_date, dataset_id
-            )
-            
-            # クリエイティブ作成
-            creative = st.session_state.meta_client.create_ad_creative(
-                account_id, f"{campaign_name}_Creative",
-                headline, description, url, video_id, page_id
-            )
-            
-            # 広告作成（自動生成された名前を使用）
-            if ad_name is None:
-                ad_name = f"{campaign_name}_1"
-            
-            ad = st.session_state.meta_client.create_ad(
-                account_id, ad_set['id'], creative['id'], ad_name
-            )
+            # 同名のキャンペーンがあれば動画転送の前に中止する
+            st.session_state.meta_client.check_campaign_name(account_id, campaign_name)
+            
+            # Google Drive の動画を Meta にアップロードして広告用の動画IDに置き換える
+            transfer = get_video_transfer(st.session_state.drive_manager)
+            if video_id:
+                video_id = transfer.transfer(video_id, account_id)
+            ads = None
+            if extra_videos:
+                ads = [{'video_id': video_id, 'ad_name': ad_name}] + [
+                    {'video_id': transfer.transfer(video['id'], account_id), 'ad_name': video['name']}
+                    for video in extra_videos
+                ]
+            
+            # キャンペーン→広告セット→クリエイティブ→広告を1回のバッチで作成
+            result = st.session_state.meta_client.launch_chain({
+                'account_id': account_id,
+                'campaign_name': campaign_name,
+                'budget_amount': budget_amount,
+                'budget_type': budget_type,
+                'ad_set_name': campaign_name,  # キャンペーン名と同じ
+                'start_time': start_date,
+                'end_time': end_date,
+                'dataset_id': dataset_id,
+                'creative_name': f"{campaign_name}_Creative",
+                'headline': headline,
+                'description': description,
+                'url': url,
+                'video_id': video_id,
+                'page_id': page_id,
+                'ad_name': ad_name or f"{campaign_name}_1",  # 自動生成された名前を使用
+                'ads': ads
+            })
             
             # ログ記録
+            object_ids = chain_object_ids(result)
             st.session_state.logger.log_campaign_creation({
                 'account_id': account_id,
-                'campaign_id': campaign['id'],
-                'ad_set_id': ad_set['id'],
-                'creative_id': creative['id'],
-                'ad_id': ad['id']
+                **object_ids
             }, True)
             
             if show_success:
                 st.success("🎉 キャンペーン作成が完了しました！")
-                st.info(f"📊 キャンペーンID: {campaign['id']}")
-                st.info(f"📊 広告セットID: {ad_set['id']}")
-                st.info(f"📊 広告ID: {ad['id']}")
-                st.warning("⚠️ 広告は一時停止状態で作成されました。配信開始には手動で有効化が必要です。")
+                st.info(f"📊 キャンペーンID: {result['campaign']['id']}")
+                st.info(f"📊 広告セットID: {result['ad_set']['id']}")
+                st.info(f"📊 広告ID: {', '.join(object_ids['ad_ids'])}")
+                st.warning("⚠️ 広告は一時停止状態で作成されました。配信開始は「ログ・履歴」タブの配信ステータス一括変更で有効化できます。")
             
             return True
             
@@ -1065,105 +1107,29 @@ def create_campaign(account_id, campaign_name, budget_amount, budget_type, start
 def create_campaign_from_template(account_id, template_data, show_success=True):
     """テンプレートからキャンペーン作成"""
     try:
+        chain_spec = st.session_state.template_manager.build_chain_spec(account_id, template_data)
+        
         if show_success:
             with st.spinner("テンプレートからキャンペーンを作成中..."):
-                # キャンペーン作成
-                campaign = st.session_state.meta_client.create_campaign(
-                    account_id,
-                    template_data['campaign']['name_template'],
-                    template_data['campaign']['objective']
-                )
-                
-                # 広告セット作成
-                ad_set = st.session_state.meta_client.create_ad_set(
-                    account_id,
-                    campaign['id'],
-                    template_data['ad_set']['name_template'],
-                    template_data['ad_set']['budget'],
-                    template_data['ad_set']['start_time'],
-                    template_data['ad_set']['end_time']
-                )
-                
-                # クリエイティブ作成
-                creative = st.session_state.meta_client.create_ad_creative(
-                    account_id,
-                    template_data['creative']['name_template'],
-                    template_data['creative']['headline_template'],
-                    template_data['creative']['description_template'],
-                    template_data['creative']['url_template'],
-                    template_data['creative'].get('video_id')
-                )
-                
-                # 広告作成
-                ad = st.session_state.meta_client.create_ad(
-                    account_id,
-                    ad_set['id'],
-                    creative['id'],
-                    template_data['ad']['name_template']
-                )
-                
-                # ログ記録
-                st.session_state.logger.log_campaign_creation({
-                    'account_id': account_id,
-                    'campaign_id': campaign['id'],
-                    'ad_set_id': ad_set['id'],
-                    'creative_id': creative['id'],
-                    'ad_id': ad['id'],
-                    'template_used': template_data.get('template_name', 'Unknown')
-                }, True)
-                
-                st.success("🎉 テンプレートからキャンペーン作成が完了しました！")
-                st.info(f"📊 キャンペーンID: {campaign['id']}")
-                st.info(f"📊 広告ID: {ad['id']}")
-                st.warning("⚠️ 広告は一時停止状態で作成されました。配信開始には手動で有効化が必要です。")
+                result = st.session_state.meta_client.launch_chain(chain_spec)
         else:
             # サイレントモード（一括作成用）
-            # キャンペーン作成
-            campaign = st.session_state.meta_client.create_campaign(
-                account_id,
-                template_data['campaign']['name_template'],
-                template_data['campaign']['objective']
-            )
-            
-            # 広告セット作成
-            ad_set = st.session_state.meta_client.create_ad_set(
-                account_id,
-                campaign['id'],
-                template_data['ad_set']['name_template'],
-                template_data['ad_set']['budget'],
-                template_data['ad_set']['start_time'],
-                template_data['ad_set']['end_time']
-            )
-            
-            # クリエイティブ作成
-            creative = st.session_state.meta_client.create_ad_creative(
-                account_id,
-                template_data['creative']['name_template'],
-                template_data['creative']['headline_template'],
-                template_data['creative']['description_template'],
-                template_data['creative']['url_template'],
-                template_data['creative'].get('video_id')
-            )
-            
-            # 広告作成
-            ad = st.session_state.meta_client.create_ad(
-                account_id,
-                ad_set['id'],
-                creative['id'],
-                template_data['ad']['name_template']
-            )
-            
-            # ログ記録
-            st.session_state.logger.log_campaign_creation({
-                'account_id': account_id,
-                'campaign_id': campaign['id'],
-                'ad_set_id': ad_set['id'],
-                'creative_id': creative['id'],
-                'ad_id': ad['id'],
-                'template_used': template_data.get('template_name', 'Unknown')
-            }, True)
-            
-            return True
+            result = st.session_state.meta_client.launch_chain(chain_spec)
+        
+        # ログ記録
+        st.session_state.logger.log_campaign_creation({
+            'account_id': account_id,
+            **chain_object_ids(result),
+            'template_used': template_data.get('template_name', 'Unknown')
+        }, True)
+        
+        if show_success:
+            st.success("🎉 テンプレートからキャンペーン作成が完了しました！")
+            st.info(f"📊 キャンペーンID: {result['campaign']['id']}")
+            st.info(f"📊 広告ID: {result['ad']['id']}")
+            st.warning("⚠️ 広告は一時停止状態で作成されました。配信開始は「ログ・履歴」タブの配信ステータス一括変更で有効化できます。")
+        
+        return True
             
     except Exception as e:
         if show_success:
@@ -1413,6 +1379,77 @@ def logs_tab():
                 st.info("ログが見つかりません")
         except Exception as e:
             st.error(f"ログ取得エラー: {e}")
+    
+    bulk_status_section()
+    mirror_section()
+
+def mirror_section():
+    """ローカルミラーの同期とステータス別の件数"""
+    st.subheader("🗄️ ローカルミラー")
+    
+    if st.session_state.meta_client is None:
+        return
+    
+    mirror = st.session_state.meta_client.mirror
+    if st.button("🔄 ミラーを差分同期"):
+        try:
+            account_ids = [account['id'] for account in st.session_state.meta_client.get_ad_accounts()]
+            with st.spinner("前回以降に更新されたオブジェクトを取得中..."):
+                results = st.session_state.meta_client.sync_mirror(
+                    account_ids, launched=st.session_state.logger.get_launched_objects()
+                )
+            errors = {account_id: counts['error'] for account_id, counts in results.items() if 'error' in counts}
+            for account_id, error in errors.items():
+                st.error(f"同期エラー: {account_id} - {error}")
+            st.success(f"✅ {len(results) - len(errors)}件のアカウントを同期しました")
+        except Exception as e:
+            st.error(f"ミラー同期エラー: {e}")
+    
+    summary = mirror.status_summary()
+    if summary:
+        st.dataframe(summary, use_container_width=True)
+    else:
+        st.info("ミラーにデータがありません。差分同期を実行してください")
+
+def bulk_status_section():
+    """作成履歴からの配信ステータス一括変更"""
+    st.subheader("🔁 配信ステータス一括変更")
+    
+    if st.session_state.meta_client is None:
+        st.warning("⚠️ Meta APIクライアントが初期化されていません")
+        return
+    
+    launched = st.session_state.logger.get_launched_objects()
+    if not launched:
+        st.info("作成済みのキャンペーンが見つかりません")
+        return
+    
+    options = {
+        f"{item['timestamp'][:19]} - {item['account_id']} / キャンペーンID: {item['campaign_id']}": item
+        for item in launched
+    }
+    selected = st.multiselect(
+        "対象のキャンペーン",
+        options=list(options.keys()),
+        help="キャンペーン・広告セット・広告をまとめて変更します"
+    )
+    status = st.radio("変更後のステータス", ["ACTIVE", "PAUSED"], horizontal=True)
+    
+    if st.button("🔁 ステータスを一括変更", disabled=not selected):
+        targets = [options[label] for label in selected]
+        with st.spinner(f"{len(targets)}件のキャンペーンを {status} に変更中..."):
+            errors = st.session_state.meta_client.update_statuses(targets, status)
+        
+        failed = {object_id: error for object_id, error in errors.items() if error}
+        st.session_state.logger.log_status_change({
+            'status': status,
+            'campaign_ids': [item['campaign_id'] for item in targets],
+            'failed_ids': list(failed)
+        }, not failed, f"{len(failed)}件の更新に失敗" if failed else None)
+        
+        for object_id, error in failed.items():
+            st.error(f"エラー: {object_id} - {error}")
+        st.success(f"✅ ステータス変更完了: 成功 {len(errors) - len(failed)}件, エラー {len(failed)}件")
 
 if __name__ == "__main__":
     main()